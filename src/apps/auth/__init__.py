@@ -1,5 +1,7 @@
+from .endpoints.jwks import jwks  # noqa
 from .endpoints.login import login  # noqa
 from .endpoints.organization import get_organizations  # noqa
+from .endpoints.tokens import introspect_tokens  # noqa
 from .endpoints.user import create  # noqa
 from .orm.mappers import start_mappers
 
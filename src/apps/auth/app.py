@@ -1,3 +1,101 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
 
-app = FastAPI()
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from loguru import logger
+
+from src.lib_auth.password import (
+    set_password_executor,
+    set_password_hash_parameters,
+    warm_password_executor,
+)
+from src.lib_db.engine import get_engine_registry
+from src.lib_utils.limiter import ConcurrencyLimitExceededError
+from src.lib_utils.rate_limit import RateLimitExceededError, retry_after_header
+
+from .config import get_config
+from .dependencies import (
+    AUTH_ENGINE_NAME,
+    async_sql_engine,
+    build_password_executor,
+    get_replica_router,
+    get_token_revocation_list,
+    jwt_signing_service,
+    password_hash_parameters,
+    password_hashing_workers,
+    session_maker,
+)
+from .revocation import TokenRevocationSync
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # create the pooled engine up front so that it is shared by every request.
+    async_sql_engine()
+    # and decrypt the signing key before the first login pays for it.
+    jwt_signing_service()
+    # fails early when argon2id is configured without argon2-cffi installed
+    set_password_hash_parameters(password_hash_parameters())
+    # password hashes run on their own bounded pool, so that a login burst
+    # neither blocks the event loop nor takes the default executor.
+    password_executor = build_password_executor()
+    password_workers = password_hashing_workers()
+    password_config = get_config().password_hashing
+    set_password_executor(
+        password_executor,
+        max_pending=password_workers + password_config.queue_size,
+        max_waiting=password_config.max_waiting,
+    )
+    await warm_password_executor(password_executor, password_workers)
+
+    revocation_config = get_config().token_revocation
+    revocation_sync = TokenRevocationSync(
+        get_token_revocation_list(),
+        session_maker(async_sql_engine()),
+        sync_interval_seconds=revocation_config.sync_interval_seconds,
+        prune_interval_seconds=revocation_config.prune_interval_seconds,
+        sync_overlap_seconds=revocation_config.sync_overlap_seconds,
+    )
+    try:
+        await revocation_sync.sync()
+    except Exception as e:
+        logger.warning(f"Could not load the token revocation list: {e!r}")
+    revocation_sync_task = asyncio.create_task(revocation_sync.run())
+
+    yield
+
+    revocation_sync_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await revocation_sync_task
+    password_executor = set_password_executor(None)
+    if password_executor:
+        password_executor.shutdown(wait=False, cancel_futures=True)
+    for engine_name in [AUTH_ENGINE_NAME, *get_replica_router().replica_names]:
+        await get_engine_registry().dispose(engine_name)
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+# sheds password hashing work under bursts, e.g. credential stuffing,
+# rather than letting the queue and its latency grow without bound.
+@app.exception_handler(ConcurrencyLimitExceededError)
+async def concurrency_limit_exceeded_handler(
+    request: Request, exc: ConcurrencyLimitExceededError
+):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"error": "Service is overloaded, retry later"},
+        headers={"Retry-After": str(get_config().password_hashing.retry_after_seconds)},
+    )
+
+
+@app.exception_handler(RateLimitExceededError)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceededError):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"error": "Too many attempts, retry later"},
+        headers={"Retry-After": retry_after_header(exc.retry_after_seconds)},
+    )
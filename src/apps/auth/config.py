@@ -1,12 +1,29 @@
+from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, IPvAnyNetwork
 
+from src.lib_auth.jwt import JWTAlgorithm
+from src.lib_auth.password import (
+    Argon2Parameters,
+    PasswordHashAlgorithm,
+    PasswordHashingBackend,
+    ScryptParameters,
+)
 from src.lib_config.config import get_config as lib_config_get_config
 
 
 class DatabaseConfig(BaseModel):
     url: str
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    use_null_pool: bool = False
+    connect_timeout_seconds: float | None = None
+    replica_urls: List[str] = []
+    replica_unhealthy_cooldown_seconds: float = 30
 
 
 class PrivateKeyConfig(BaseModel):
@@ -16,6 +33,12 @@ class PrivateKeyConfig(BaseModel):
 
 class PublicKeyConfig(BaseModel):
     key: str
+    # defaults to the RFC 7638 thumbprint of the key
+    kid: Optional[str] = None
+    # defaults to jwt_algorithm
+    algorithm: Optional[JWTAlgorithm] = None
+    # end of the overlap window of a retired key
+    not_after: Optional[datetime] = None
 
 
 class AuthDomainConfig(BaseModel):
@@ -24,11 +47,86 @@ class AuthDomainConfig(BaseModel):
     cookie_is_secure: bool
 
 
+class VerifiedClaimCacheConfig(BaseModel):
+    enabled: bool = True
+    max_entries: int = 10_000
+    ttl_seconds: float = 300
+
+
+class TokenRevocationConfig(BaseModel):
+    sync_interval_seconds: float = 10
+    prune_interval_seconds: float = 300
+    # revocations are loaded again this far back, to catch those committed
+    # out of order, it must exceed the longest revoking transaction
+    sync_overlap_seconds: float = 60
+    bloom_filter_capacity: int = 100_000
+    bloom_filter_error_rate: float = 0.001
+
+
+class RefreshTokenConfig(BaseModel):
+    enabled: bool = False
+    expire_seconds: int = 30 * 24 * 60 * 60
+    # lifetime of the access tokens issued with a refresh token,
+    # renewing them costs a lookup instead of a password verification
+    access_token_expire_seconds: int = 15 * 60
+
+
+class PasswordHashingConfig(BaseModel):
+    # processes hash on every core, threads only as far as scrypt runs
+    # without the GIL
+    backend: PasswordHashingBackend = PasswordHashingBackend.THREAD
+    # workers that hash and verify passwords, defaults to the number of cpus
+    max_workers: Optional[int] = None
+    # hashes queued in the executor behind the busy workers,
+    # further callers wait outside of it
+    queue_size: int = 64
+    # callers that may wait for the executor, further ones get a 503
+    max_waiting: int = 256
+    retry_after_seconds: int = 1
+    # new hashes use this algorithm and its parameters below, hashes made
+    # otherwise are replaced on the next successful login
+    algorithm: PasswordHashAlgorithm = PasswordHashAlgorithm.SCRYPT
+    scrypt: ScryptParameters = ScryptParameters()
+    # argon2id needs the argon2-cffi package, from the argon2 extra
+    argon2: Argon2Parameters = Argon2Parameters()
+
+
+class LoginRateLimitConfig(BaseModel):
+    enabled: bool = True
+    # password attempts per email, whichever client makes them
+    email_limit: int = 10
+    email_window_seconds: float = 60
+    # password attempts per client ip, whichever emails they are for
+    ip_limit: int = 100
+    ip_window_seconds: float = 60
+    # emails and ips tracked at once, the least recently seen are dropped beyond it
+    max_keys: int = 100_000
+    # addresses or networks of the reverse proxies in front of the server.
+    # the client ip of their requests is read from X-Forwarded-For, otherwise
+    # every client behind them would share the ip limit of the proxy.
+    trusted_proxies: List[IPvAnyNetwork] = []
+
+
 class Config(BaseModel):
     database: DatabaseConfig
     private_key: Optional[PrivateKeyConfig] = None
     public_key: Optional[PublicKeyConfig] = None
+    # keys that verify tokens without signing new ones,
+    # e.g. the previous key during a rotation
+    verification_keys: List[PublicKeyConfig] = []
     domains: Optional[List[AuthDomainConfig]] = None
+    # the private and public keys must be keys for this algorithm
+    jwt_algorithm: JWTAlgorithm = JWTAlgorithm.RS256
+    # issue tokens in the compact claim format, only once every service
+    # that reads the claims accepts it
+    compact_claims: bool = False
+    verified_claim_cache: VerifiedClaimCacheConfig = VerifiedClaimCacheConfig()
+    token_revocation: TokenRevocationConfig = TokenRevocationConfig()
+    refresh_tokens: RefreshTokenConfig = RefreshTokenConfig()
+    password_hashing: PasswordHashingConfig = PasswordHashingConfig()
+    login_rate_limit: LoginRateLimitConfig = LoginRateLimitConfig()
+    # how long gateways may serve /.well-known/jwks.json without revalidating
+    jwks_max_age_seconds: int = 300
 
 
 _config: Optional[Config] = None
@@ -46,6 +144,21 @@ def get_config() -> Config:
         database=config["config"]["apps"]["auth"]["database"],
         private_key=config["config"]["apps"]["auth"]["private_key"],
         public_key=config["config"]["apps"]["auth"]["public_key"],
+        verification_keys=config["config"]["apps"]["auth"].get("verification_keys", []),
         domains=config["config"]["apps"]["auth"]["domains"],
+        jwt_algorithm=config["config"]["apps"]["auth"].get(
+            "jwt_algorithm", JWTAlgorithm.RS256
+        ),
+        compact_claims=config["config"]["apps"]["auth"].get("compact_claims", False),
+        verified_claim_cache=config["config"]["apps"]["auth"].get(
+            "verified_claim_cache", {}
+        ),
+        token_revocation=config["config"]["apps"]["auth"].get("token_revocation", {}),
+        refresh_tokens=config["config"]["apps"]["auth"].get("refresh_tokens", {}),
+        password_hashing=config["config"]["apps"]["auth"].get("password_hashing", {}),
+        login_rate_limit=config["config"]["apps"]["auth"].get("login_rate_limit", {}),
+        jwks_max_age_seconds=config["config"]["apps"]["auth"].get(
+            "jwks_max_age_seconds", 300
+        ),
     )
     return _config
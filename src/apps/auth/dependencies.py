@@ -1,34 +1,98 @@
+import os
+from concurrent.futures import Executor
 from typing import Annotated, AsyncGenerator, List
 
 from fastapi import Depends, HTTPException
-from sqlalchemy.ext.asyncio import (
-    AsyncEngine,
-    AsyncSession,
-    async_sessionmaker,
-    create_async_engine,
-)
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from src.apps.auth.models.user import User
 from src.apps.auth.repository.organizations import (
     OrganizationsRepository,
     SQLOrganizationsRepository,
 )
+from src.apps.auth.repository.refresh_tokens import (
+    RefreshTokensRepository,
+    SQLRefreshTokensRepository,
+)
+from src.apps.auth.repository.revoked_tokens import (
+    RevokedTokensRepository,
+    SQLRevokedTokensRepository,
+)
 from src.apps.auth.repository.users import SQLUserRepository, UserRepository
+from src.lib_auth.claim_cache import VerifiedClaimCache
+from src.lib_auth.introspection import TokenVerifier
+from src.lib_auth.jwks import JWKSDocument
 from src.lib_auth.jwt import (
     JWTClaim,
     JWTDecodeService,
     JWTSigningService,
-    RSA256JWTDecodeService,
-    RSA256JWTSigningService,
+    jwk_thumbprint,
+    make_jwt_decode_service,
+    make_jwt_signing_service,
 )
+from src.lib_auth.jwt_keys import JWTKeySet, JWTVerificationKey
+from src.lib_auth.password import (
+    PasswordHashAlgorithm,
+    PasswordHashParameters,
+    make_password_executor,
+)
+from src.lib_auth.revocation import TokenRevocationList
 from src.lib_auth.roles import OrganizationRole
+from src.lib_db.engine import create_pooled_async_engine, get_engine_registry
+from src.lib_db.replicas import ReplicaRouter, open_replica_session
 from src.lib_fastapi.auth import build_claim_authenticator
+from src.lib_utils.rate_limit import InMemoryRateLimitBackend, RateLimiter
+
+from .config import AuthDomainConfig, PublicKeyConfig, get_config
 
-from .config import AuthDomainConfig, get_config
+AUTH_ENGINE_NAME = "auth"
+AUTH_REPLICA_ENGINE_NAME_PREFIX = "auth-replica-"
+
+
+def build_async_sql_engine(url: str | None = None) -> AsyncEngine:
+    database_config = get_config().database
+    return create_pooled_async_engine(
+        url=url or database_config.url,
+        pool_size=database_config.pool_size,
+        max_overflow=database_config.max_overflow,
+        pool_timeout=database_config.pool_timeout,
+        pool_recycle=database_config.pool_recycle,
+        pool_pre_ping=database_config.pool_pre_ping,
+        use_null_pool=database_config.use_null_pool,
+        connect_timeout=database_config.connect_timeout_seconds,
+    )
 
 
 def async_sql_engine() -> AsyncEngine:
-    return create_async_engine(get_config().database.url)
+    return get_engine_registry().get_or_create(AUTH_ENGINE_NAME, build_async_sql_engine)
+
+
+def replica_engine(replica_name: str) -> AsyncEngine:
+    replica_index = int(replica_name.removeprefix(AUTH_REPLICA_ENGINE_NAME_PREFIX))
+    replica_url = get_config().database.replica_urls[replica_index]
+    return get_engine_registry().get_or_create(
+        replica_name, lambda: build_async_sql_engine(replica_url), required=False
+    )
+
+
+_replica_router: ReplicaRouter | None = None
+
+
+def get_replica_router() -> ReplicaRouter:
+    global _replica_router
+
+    if _replica_router is not None:
+        return _replica_router
+
+    database_config = get_config().database
+    _replica_router = ReplicaRouter(
+        replica_names=[
+            f"{AUTH_REPLICA_ENGINE_NAME_PREFIX}{index}"
+            for index in range(len(database_config.replica_urls))
+        ],
+        cooldown_seconds=database_config.replica_unhealthy_cooldown_seconds,
+    )
+    return _replica_router
 
 
 def session_maker(
@@ -44,29 +108,214 @@ async def async_session(
         yield session
 
 
+async def async_read_session(
+    session: Annotated[AsyncSession, Depends(async_session)]
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    A session for read-only work. It is bound to a replica when one is reachable,
+    and falls back to the primary session of the request otherwise.
+    Never use it for writes or to read back something written in the same request.
+    """
+    replica_session = await open_replica_session(get_replica_router(), replica_engine)
+    if replica_session is None:
+        yield session
+        return
+
+    async with replica_session:
+        yield replica_session
+
+
 def user_repository(
     session: Annotated[AsyncSession, Depends(async_session)]
 ) -> UserRepository:
     return SQLUserRepository(session)
 
 
+def read_user_repository(
+    session: Annotated[AsyncSession, Depends(async_read_session)]
+) -> UserRepository:
+    return SQLUserRepository(session)
+
+
 def organizations_repository(
     session: Annotated[AsyncSession, Depends(async_session)]
 ) -> OrganizationsRepository:
     return SQLOrganizationsRepository(session)
 
 
-def jwt_signing_service() -> JWTSigningService:
-    private_key_config = get_config().private_key
-    return RSA256JWTSigningService(
-        private_key_pem=private_key_config.key,  # type:ignore
-        private_key_password=private_key_config.password,  # type:ignore
+def read_organizations_repository(
+    session: Annotated[AsyncSession, Depends(async_read_session)]
+) -> OrganizationsRepository:
+    return SQLOrganizationsRepository(session)
+
+
+def build_jwt_verification_key(key_config: PublicKeyConfig) -> JWTVerificationKey:
+    decode_service = make_jwt_decode_service(
+        algorithm=key_config.algorithm or get_config().jwt_algorithm,
+        public_key_pem=key_config.key,
+    )
+    return JWTVerificationKey(
+        kid=key_config.kid or jwk_thumbprint(decode_service.to_jwk()),
+        decode_service=decode_service,
+        not_after=key_config.not_after.timestamp() if key_config.not_after else None,
+    )
+
+
+_jwt_key_set: JWTKeySet | None = None
+
+
+def get_jwt_key_set() -> JWTKeySet:
+    global _jwt_key_set
+
+    if _jwt_key_set is not None:
+        return _jwt_key_set
+
+    # the primary public key pairs with the private key. tokens issued
+    # before kids were stamped were all signed by it.
+    primary_key = build_jwt_verification_key(get_config().public_key)  # type: ignore
+    _jwt_key_set = JWTKeySet(
+        verification_keys=[
+            primary_key,
+            *map(build_jwt_verification_key, get_config().verification_keys),
+        ],
+        legacy_kid=primary_key.kid,
+    )
+    return _jwt_key_set
+
+
+_jwks_document: JWKSDocument | None = None
+
+
+def get_jwks_document() -> JWKSDocument:
+    global _jwks_document
+
+    if _jwks_document is None:
+        _jwks_document = JWKSDocument(get_jwt_key_set())
+    return _jwks_document
+
+
+def build_jwt_signing_service() -> JWTSigningService:
+    config = get_config()
+    return make_jwt_signing_service(
+        algorithm=config.public_key.algorithm or config.jwt_algorithm,  # type: ignore
+        private_key_pem=config.private_key.key,  # type:ignore
+        private_key_password=config.private_key.password,  # type:ignore
     )
 
 
+def jwt_signing_service() -> JWTSigningService:
+    key_set = get_jwt_key_set()
+
+    # decrypting the private key runs the PEM's KDF,
+    # so it is done once per process and not on every login.
+    if key_set.signing_kid is None:
+        key_set.set_signing_key(key_set.legacy_kid, build_jwt_signing_service())  # type: ignore[arg-type]
+    return key_set
+
+
 def jwt_decode_service() -> JWTDecodeService:
-    public_key_config = get_config().public_key
-    return RSA256JWTDecodeService(public_key_pem=public_key_config.key)  # type: ignore
+    return get_jwt_key_set()
+
+
+_verified_claim_cache: VerifiedClaimCache | None = None
+
+
+def get_verified_claim_cache() -> VerifiedClaimCache | None:
+    global _verified_claim_cache
+
+    cache_config = get_config().verified_claim_cache
+    if not cache_config.enabled:
+        return None
+
+    if _verified_claim_cache is None:
+        _verified_claim_cache = VerifiedClaimCache(
+            max_entries=cache_config.max_entries,
+            ttl_seconds=cache_config.ttl_seconds,
+        )
+        # verifications made with a replaced or removed key must not be served
+        get_jwt_key_set().subscribe(_verified_claim_cache.clear)
+    return _verified_claim_cache
+
+
+_token_revocation_list: TokenRevocationList | None = None
+
+
+def get_token_revocation_list() -> TokenRevocationList:
+    global _token_revocation_list
+
+    if _token_revocation_list is None:
+        revocation_config = get_config().token_revocation
+        _token_revocation_list = TokenRevocationList(
+            capacity=revocation_config.bloom_filter_capacity,
+            error_rate=revocation_config.bloom_filter_error_rate,
+        )
+    return _token_revocation_list
+
+
+def revoked_tokens_repository(
+    session: Annotated[AsyncSession, Depends(async_session)]
+) -> RevokedTokensRepository:
+    return SQLRevokedTokensRepository(session)
+
+
+_token_verifier: TokenVerifier | None = None
+
+
+def get_token_verifier() -> TokenVerifier:
+    global _token_verifier
+
+    if _token_verifier is None:
+        _token_verifier = TokenVerifier(
+            jwt_decode_service(),
+            claim_cache=get_verified_claim_cache(),
+            key_not_after=get_jwt_key_set().key_not_after,
+            revocation_list=get_token_revocation_list(),
+        )
+    return _token_verifier
+
+
+def refresh_tokens_repository(
+    session: Annotated[AsyncSession, Depends(async_session)]
+) -> RefreshTokensRepository:
+    return SQLRefreshTokensRepository(session)
+
+
+def password_hashing_workers() -> int:
+    return get_config().password_hashing.max_workers or os.cpu_count() or 1
+
+
+def build_password_executor() -> Executor:
+    return make_password_executor(
+        get_config().password_hashing.backend, password_hashing_workers()
+    )
+
+
+def password_hash_parameters() -> PasswordHashParameters:
+    config = get_config().password_hashing
+    if config.algorithm == PasswordHashAlgorithm.ARGON2ID:
+        return config.argon2
+    return config.scrypt
+
+
+_login_rate_limiter: RateLimiter | None = None
+
+
+def get_login_rate_limiter() -> RateLimiter | None:
+    """
+    The counters are kept in the process, each node of a multi-node deployment
+    limits on its own unless this is overridden with a shared RateLimitBackend.
+    """
+    global _login_rate_limiter
+
+    rate_limit_config = get_config().login_rate_limit
+    if not rate_limit_config.enabled:
+        return None
+
+    if _login_rate_limiter is None:
+        _login_rate_limiter = RateLimiter(
+            InMemoryRateLimitBackend(max_keys=rate_limit_config.max_keys)
+        )
+    return _login_rate_limiter
 
 
 def get_authentication_domains() -> List[AuthDomainConfig] | None:
@@ -75,9 +324,17 @@ def get_authentication_domains() -> List[AuthDomainConfig] | None:
 
 async def get_authenticated_user(
     verified_claim: Annotated[
-        JWTClaim, Depends(build_claim_authenticator(jwt_decode_service()))
+        JWTClaim,
+        Depends(
+            build_claim_authenticator(
+                jwt_decode_service(),
+                claim_cache=get_verified_claim_cache(),
+                key_not_after=get_jwt_key_set().key_not_after,
+                revocation_list=get_token_revocation_list(),
+            )
+        ),
     ],
-    user_repository: Annotated[UserRepository, Depends(user_repository)],
+    user_repository: Annotated[UserRepository, Depends(read_user_repository)],
 ) -> User:
     user_id = verified_claim.custom_claims.user_id
     user = await user_repository.get_user_by_id(user_id)
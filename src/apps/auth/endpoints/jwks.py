@@ -0,0 +1,31 @@
+from typing import Annotated
+
+from fastapi import Depends, Header, Response
+
+from src.lib_auth.jwks import JWKSDocument
+
+from ..app import app
+from ..config import get_config
+from ..dependencies import get_jwks_document
+
+
+def __matches(if_none_match: str, etag: str) -> bool:
+    return any(
+        candidate.strip() in (etag, "*") for candidate in if_none_match.split(",")
+    )
+
+
+# lets other services verify tokens locally instead of calling /v1/me.
+@app.get("/.well-known/jwks.json")
+async def jwks(
+    jwks_document: Annotated[JWKSDocument, Depends(get_jwks_document)],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    body, etag = jwks_document.get()
+    max_age = jwks_document.max_age(get_config().jwks_max_age_seconds)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    if if_none_match and __matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
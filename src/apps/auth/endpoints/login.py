@@ -1,21 +1,52 @@
-from typing import Annotated, Any, List, Literal, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Any, List, Literal, Optional, Tuple, Type, TypeVar
 
-from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi import BackgroundTasks, Depends, Header, HTTPException, Request, status
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-
-from src.apps.auth.config import AuthDomainConfig
-from src.lib_auth.jwt import JWTSigningService, build_jwt_claim, create_jwt_token
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.apps.auth.config import AuthDomainConfig, get_config
+from src.lib_auth.claim_cache import VerifiedClaimCache
+from src.lib_auth.jwt import (
+    JWTDecodeService,
+    JWTException,
+    JWTSigningService,
+    build_jwt_claim,
+    create_jwt_token,
+    decode_and_verify_jwt_token,
+)
+from src.lib_auth.password import async_hash_password
+from src.lib_auth.refresh_token import generate_refresh_token, hash_refresh_token
+from src.lib_fastapi.auth import get_authorization_token
+from src.lib_fastapi.request import cancel_on_disconnect, get_client_ip
+from src.lib_utils.rate_limit import RateLimit, RateLimiter
 
 from ..app import app
 from ..dependencies import (
     get_authenticated_user,
     get_authentication_domains,
+    get_login_rate_limiter,
+    get_token_revocation_list,
+    get_verified_claim_cache,
+    jwt_decode_service,
     jwt_signing_service,
+    refresh_tokens_repository,
+    revoked_tokens_repository,
+    session_maker,
     user_repository,
 )
 from ..models.user import AuthenticationException, SensitiveUser, User
-from ..repository.users import UserRepository
+from ..repository.refresh_tokens import (
+    InvalidRefreshTokenError,
+    RefreshTokenReusedError,
+    RefreshTokensRepository,
+)
+from ..repository.revoked_tokens import RevokedTokensRepository
+from ..repository.users import SQLUserRepository, UserRepository
+
+GrantRequest = TypeVar("GrantRequest", bound=BaseModel)
 
 
 class OAuth2Request(BaseModel):
@@ -25,6 +56,7 @@ class OAuth2Request(BaseModel):
     password: Optional[str] = None
     client_id: Optional[str] = None
     client_secret: Optional[str] = None
+    refresh_token: Optional[str] = None
 
 
 class OAuth2PasswordRequest(BaseModel):
@@ -41,9 +73,21 @@ class OAuth2ClientCredentialsRequest(BaseModel):
     client_secret: str
 
 
+class OAuth2RefreshTokenRequest(BaseModel):
+    grant_type: Literal["refresh_token"]
+    scopes: Optional[str] = None
+    refresh_token: str
+
+
 class AccessTokenResponse(BaseModel):
     access_token: str
     token_type: Literal["bearer"]
+    expires_in: Optional[int] = None
+    refresh_token: Optional[str] = None
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
 
 
 class SimpleSuccessResponse(BaseModel):
@@ -91,48 +135,198 @@ def get_cookie_domain(
     return None
 
 
-@app.post("/v1/login")
+def __parse_grant_request(
+    grant_request_type: Type[GrantRequest], request: OAuth2Request
+) -> GrantRequest:
+    try:
+        return grant_request_type(**request.model_dump())
+    except ValidationError as e:
+        # e.g. a refresh_token grant without its refresh_token
+        missing = ", ".join(str(error["loc"][0]) for error in e.errors())
+        raise HTTPException(status_code=400, detail=f"invalid_request: {missing}")
+
+
+def __create_access_token(
+    user: User, expire_in_seconds: int, jwt_signing_service: JWTSigningService
+) -> str:
+    return create_jwt_token(
+        payload=build_jwt_claim(
+            user_id=user.id,  # type: ignore
+            role=user.role,
+            issuer="oly-auth-silo-1",
+            organization_id=user.organization.id if user.organization else None,
+            organization_role=user.organization.role if user.organization else None,
+            expire_in_seconds=expire_in_seconds,
+        ),
+        signing_service=jwt_signing_service,
+        compact=get_config().compact_claims,
+    )
+
+
+def __refresh_token_expires_at() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(
+        seconds=get_config().refresh_tokens.expire_seconds
+    )
+
+
+async def __refresh(
+    request: OAuth2Request,
+    user_repository: UserRepository,
+    refresh_tokens_repository: RefreshTokensRepository,
+    jwt_signing_service: JWTSigningService,
+) -> AccessTokenResponse:
+    refresh_request = __parse_grant_request(OAuth2RefreshTokenRequest, request)
+    refresh_token = generate_refresh_token()
+
+    try:
+        user_id = await refresh_tokens_repository.rotate(
+            hash_refresh_token(refresh_request.refresh_token),
+            new_token_hash=hash_refresh_token(refresh_token),
+            expires_at=__refresh_token_expires_at(),
+        )
+    except RefreshTokenReusedError:
+        logger.warning("Refresh token reused, its family has been revoked")
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    except InvalidRefreshTokenError:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    user = await user_repository.get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    if not user.is_activated:
+        raise AuthenticationException("User is not activated")
+
+    if not user.is_confirmed:
+        raise AuthenticationException("User is not confirmed")
+
+    expiry_in_seconds = get_config().refresh_tokens.access_token_expire_seconds
+    return AccessTokenResponse(
+        access_token=__create_access_token(
+            user, expiry_in_seconds, jwt_signing_service
+        ),
+        token_type="bearer",
+        expires_in=expiry_in_seconds,
+        refresh_token=refresh_token,
+    )
+
+
+def __login_rate_limits(
+    email: str, http_request: Request
+) -> List[Tuple[str, RateLimit]]:
+    config = get_config().login_rate_limit
+    client_ip = get_client_ip(http_request, config.trusted_proxies) or "unknown"
+    return [
+        (f"login:ip:{client_ip}", RateLimit(config.ip_limit, config.ip_window_seconds)),
+        (
+            f"login:email:{email.lower()}",
+            RateLimit(config.email_limit, config.email_window_seconds),
+        ),
+    ]
+
+
+async def __rehash_password(
+    make_session: async_sessionmaker[AsyncSession],
+    user_id: str,
+    password: str,
+    hashed_password: str,
+) -> None:
+    # runs after the response is sent, the session of the request is closed by then
+    try:
+        new_hashed_password = await async_hash_password(password)
+        async with make_session() as session:
+            await SQLUserRepository(session).replace_hashed_password(
+                user_id, hashed_password, new_hashed_password
+            )
+    except Exception as e:
+        # the old hash still verifies, the next login tries again
+        logger.warning(f"Could not rehash the password of user {user_id}: {e!r}")
+
+
+@app.post("/v1/login", response_model_exclude_none=True)
 async def login(
     request: OAuth2Request,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
     user_repository: Annotated[UserRepository, Depends(user_repository)],
+    make_session: Annotated[async_sessionmaker[AsyncSession], Depends(session_maker)],
+    refresh_tokens_repository: Annotated[
+        RefreshTokensRepository, Depends(refresh_tokens_repository)
+    ],
     jwt_signing_service: Annotated[JWTSigningService, Depends(jwt_signing_service)],
     allowed_cookie_domains: Annotated[
         List[AuthDomainConfig], Depends(get_authentication_domains)
     ],
+    rate_limiter: Annotated[RateLimiter | None, Depends(get_login_rate_limiter)],
     as_cookie: bool = False,
     http_origin: Annotated[str, Header(alias="Origin")] = "",
 ) -> AccessTokenResponse | SimpleSuccessResponse | Any:
     user: SensitiveUser | None = None
     password_request: OAuth2PasswordRequest | None = None
+    refresh_config = get_config().refresh_tokens
+
+    # renewing with a refresh token skips the password hash,
+    # it costs one indexed lookup and one signature.
+    if request.grant_type == "refresh_token" and refresh_config.enabled:
+        return await __refresh(
+            request, user_repository, refresh_tokens_repository, jwt_signing_service
+        )
 
     if request.grant_type != "password":
         raise HTTPException(
             status_code=400, detail=f"Unsupported grant type: {request.grant_type}"
         )
 
-    password_request = OAuth2PasswordRequest(**request.model_dump())
+    password_request = __parse_grant_request(OAuth2PasswordRequest, request)
+
+    # before the user lookup and the password hash, which guessing makes costly
+    if rate_limiter:
+        await rate_limiter.hit(
+            __login_rate_limits(password_request.username, http_request)
+        )
+
     user = await user_repository.get_sensitive_user_by_email(password_request.username)
 
     if not user:
         raise HTTPException(status_code=401, detail="Incorrect username or password")
 
-    user.authenticate(password_request.password)
+    await cancel_on_disconnect(
+        http_request, user.async_authenticate(password_request.password)
+    )
+
+    if user.password_needs_rehash():
+        background_tasks.add_task(
+            __rehash_password,
+            make_session,
+            user.id,  # type: ignore
+            password_request.password,
+            user.hashed_password,  # type: ignore
+        )
 
     twenty_four_hours = 24
     seconds_in_an_hour = 60 * 60
     days = 2
     expiry_in_seconds = twenty_four_hours * seconds_in_an_hour * days
-    token = create_jwt_token(
-        payload=build_jwt_claim(
+
+    # cookie sessions have no refresh token, they keep the long-lived token
+    if refresh_config.enabled and not as_cookie:
+        refresh_token = generate_refresh_token()
+        await refresh_tokens_repository.create(
+            hash_refresh_token(refresh_token),
             user_id=user.id,  # type: ignore
-            role=user.role,
-            issuer="oly-auth-silo-1",
-            organization_id=user.organization.id if user.organization else None,
-            organization_role=user.organization.role if user.organization else None,
-            expire_in_seconds=expiry_in_seconds,
-        ),
-        signing_service=jwt_signing_service,
-    )
+            expires_at=__refresh_token_expires_at(),
+        )
+        expiry_in_seconds = refresh_config.access_token_expire_seconds
+        return AccessTokenResponse(
+            access_token=__create_access_token(
+                user, expiry_in_seconds, jwt_signing_service
+            ),
+            token_type="bearer",
+            expires_in=expiry_in_seconds,
+            refresh_token=refresh_token,
+        )
+
+    token = __create_access_token(user, expiry_in_seconds, jwt_signing_service)
 
     if as_cookie:
         cookie_domain_config = get_cookie_domain(http_origin, allowed_cookie_domains)
@@ -154,7 +348,29 @@ async def login(
         )
         return response
 
-    return AccessTokenResponse(access_token=token, token_type="bearer")
+    return AccessTokenResponse(
+        access_token=token, token_type="bearer", expires_in=expiry_in_seconds
+    )
+
+
+async def __revoke(
+    jwt_access_token: str,
+    jwt_decode_service: JWTDecodeService,
+    revoked_tokens_repository: RevokedTokensRepository,
+    claim_cache: VerifiedClaimCache | None,
+):
+    try:
+        claim = decode_and_verify_jwt_token(jwt_access_token, jwt_decode_service)
+    except JWTException:
+        # an invalid or expired token cannot be used anyway
+        return
+
+    await revoked_tokens_repository.revoke(
+        claim.jti, datetime.fromtimestamp(claim.exp, timezone.utc)
+    )
+    get_token_revocation_list().add(claim.jti, claim.exp)
+    if claim_cache:
+        claim_cache.invalidate_jti(claim.jti)
 
 
 @app.post("/v1/logout")
@@ -162,8 +378,36 @@ async def logout(
     allowed_cookie_domains: Annotated[
         List[AuthDomainConfig], Depends(get_authentication_domains)
     ],
+    jwt_access_token: Annotated[str | None, Depends(get_authorization_token)],
+    jwt_decode_service: Annotated[JWTDecodeService, Depends(jwt_decode_service)],
+    revoked_tokens_repository: Annotated[
+        RevokedTokensRepository, Depends(revoked_tokens_repository)
+    ],
+    refresh_tokens_repository: Annotated[
+        RefreshTokensRepository, Depends(refresh_tokens_repository)
+    ],
+    claim_cache: Annotated[
+        VerifiedClaimCache | None, Depends(get_verified_claim_cache)
+    ],
+    request: Optional[LogoutRequest] = None,
     http_origin: Annotated[str, Header(alias="Origin")] = "",
 ) -> SimpleSuccessResponse | Any:
+    # the token is revoked server side, deleting the cookie alone
+    # would leave a copied token valid until it expires.
+    if jwt_access_token:
+        await __revoke(
+            jwt_access_token,
+            jwt_decode_service,
+            revoked_tokens_repository,
+            claim_cache,
+        )
+
+    # the session could otherwise mint new access tokens after the logout
+    if request and request.refresh_token:
+        await refresh_tokens_repository.revoke_family_of(
+            hash_refresh_token(request.refresh_token)
+        )
+
     response = JSONResponse(content=SimpleSuccessResponse(status="ok").model_dump())
     cookie_domain_config = get_cookie_domain(http_origin, allowed_cookie_domains)
     if not cookie_domain_config:
@@ -1,6 +1,6 @@
 from typing import Annotated, List, Optional
 
-from fastapi import Depends, Request
+from fastapi import Depends, Request, Response
 from fastapi import status as HTTPStatus
 from fastapi import status as http_status
 from fastapi.exceptions import HTTPException
@@ -11,6 +11,7 @@ from src.apps.auth.dependencies import (
     get_authenticated_platform_owner,
     get_authenticated_user,
     organizations_repository,
+    read_organizations_repository,
 )
 from src.apps.auth.models.organization import Organization
 from src.apps.auth.models.user import User
@@ -20,6 +21,12 @@ from src.apps.auth.repository.organizations import (
     OrganizationsRepository,
 )
 from src.lib_auth.roles import OrganizationRole
+from src.lib_fastapi.pagination import (
+    get_keyset_cursor,
+    get_page_size,
+    set_next_cursor_header,
+)
+from src.lib_utils.pagination import DEFAULT_PAGE_SIZE, KeysetCursor
 
 from ..app import app
 
@@ -110,12 +117,12 @@ async def delete_organization():
 
 class OrganizationsSearchParams(BaseModel):
     name_contains: Optional[str] = None
-    limit: Optional[int] = None
+    limit: int = DEFAULT_PAGE_SIZE
     offset: Optional[int] = None
 
 
 def get_organization_search_params(
-    limit: int | None = None,
+    limit: Annotated[int, Depends(get_page_size)],
     offset: int | None = None,
     name_contains: str | None = None,
 ):
@@ -125,19 +132,24 @@ def get_organization_search_params(
 
 
 # get organizations
+# pages are walked with the cursor returned in the X-Next-Cursor header.
+# offset is still accepted for older clients.
 @app.get("/v1/organizations")
 async def get_organizations(
+    response: Response,
     authenticated_platform_owner: Annotated[
         User, Depends(get_authenticated_platform_owner)
     ],
     organizations_repository: Annotated[
-        OrganizationsRepository, Depends(organizations_repository)
+        OrganizationsRepository, Depends(read_organizations_repository)
     ],
+    after: Annotated[KeysetCursor | None, Depends(get_keyset_cursor)],
     params: OrganizationsSearchParams = Depends(get_organization_search_params),
 ) -> List[Organization]:
     organizations = await organizations_repository.get_organizations(
-        **params.model_dump()
+        **params.model_dump(), after=after
     )
+    set_next_cursor_header(response, organizations, params.limit)
     return organizations
 
 
@@ -146,7 +158,7 @@ async def get_organizations(
 async def get_organization_by_id(
     authenticated_user: Annotated[User, Depends(get_authenticated_user)],
     organizations_repository: Annotated[
-        OrganizationsRepository, Depends(organizations_repository)
+        OrganizationsRepository, Depends(read_organizations_repository)
     ],
     organization_id: str,
 ) -> Organization:
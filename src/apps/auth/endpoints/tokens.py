@@ -0,0 +1,59 @@
+import asyncio
+from typing import Annotated, List
+
+from fastapi import Depends
+from pydantic import BaseModel, Field
+
+from src.config import get_config as get_global_config
+from src.lib_auth.introspection import TokenVerifier
+from src.lib_fastapi.auth import make_api_key_checker
+
+from ..app import app
+from ..dependencies import get_token_verifier
+
+MAX_INTROSPECTED_TOKENS = 1000
+
+
+class IntrospectTokensRequest(BaseModel):
+    tokens: List[str] = Field(min_length=1, max_length=MAX_INTROSPECTED_TOKENS)
+
+
+class TokenIntrospectionResult(BaseModel):
+    active: bool
+    claims: dict | None = None
+
+
+class IntrospectTokensResponse(BaseModel):
+    results: List[TokenIntrospectionResult]
+
+
+# lets gateways validate the tokens of many upstream requests in one call
+@app.post(
+    "/v1/tokens/introspect",
+    dependencies=[
+        Depends(
+            make_api_key_checker(
+                get_global_config().security.api_keys,
+                app="auth",
+                method="POST",
+                endpoint="/v1/tokens/introspect",
+            )
+        )
+    ],
+)
+async def introspect_tokens(
+    request: IntrospectTokensRequest,
+    token_verifier: Annotated[TokenVerifier, Depends(get_token_verifier)],
+) -> IntrospectTokensResponse:
+    # signature checks are CPU work, a large batch must not stall the event loop
+    introspections = await asyncio.to_thread(token_verifier.introspect, request.tokens)
+
+    return IntrospectTokensResponse(
+        results=[
+            TokenIntrospectionResult(
+                active=introspection.active,
+                claims=introspection.claim.as_dict() if introspection.claim else None,
+            )
+            for introspection in introspections
+        ]
+    )
@@ -1,27 +1,37 @@
+import asyncio
+import os
+from datetime import datetime
+from enum import StrEnum
 from typing import Annotated, List, Optional
 
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Response
 from fastapi.security import OAuth2PasswordBearer
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from src.apps.auth.models.organization import Organization
-from src.apps.auth.repository.organizations import OrganizationsRepository
 from src.lib_auth.roles import UserRole
+from src.lib_fastapi.pagination import (
+    get_keyset_cursor,
+    get_page_size,
+    set_next_cursor_header,
+)
+from src.lib_utils.pagination import DEFAULT_PAGE_SIZE, KeysetCursor
 
 from ..app import app
 from ..dependencies import (
     get_authenticated_platform_owner,
     get_authenticated_user,
-    organizations_repository,
+    read_user_repository,
     user_repository,
 )
 from ..models.user import (
     InvalidEmailException,
     PasswordNotStrongException,
+    SensitiveUser,
     User,
-    build_new_user,
+    async_build_new_user,
 )
-from ..repository.users import UserRepository
+from ..repository.organizations import OrganizationNotFoundError
+from ..repository.users import UserChanges, UserExistsError, UserRepository
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/login")
 
@@ -47,66 +57,216 @@ async def create(
         User, Depends(get_authenticated_platform_owner)
     ],
 ):
-    existing_user = await user_repository.get_user_by_email(request.email)
-    if existing_user:
-        raise HTTPException(status_code=400, detail="User already exists")
-
     if request.password != request.confirm_password:
         raise HTTPException(status_code=400, detail="Passwords do not match")
 
+    # a taken email is turned away before the password is hashed, which
+    # would cost a scrypt hash and a slot of the password hashing limiter.
+    if await user_repository.get_user_by_email(request.email):
+        raise HTTPException(status_code=400, detail="User already exists")
+
     try:
-        user = build_new_user(
+        user = await async_build_new_user(
             email=request.email,
             password=request.password,
             role=UserRole.USER,
             first_name=request.first_name,
             last_name=request.last_name,
         )
-        await user_repository.save_user(user)
     except (PasswordNotStrongException, InvalidEmailException) as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    # the insert checks again in the same statement,
+    # so concurrent signups with the same email cannot both succeed.
+    if not await user_repository.create_user_if_absent(user):
+        raise HTTPException(status_code=400, detail="User already exists")
+
     # TODO : send email confirmation
 
     return SimpleSuccessResponse(email=request.email)
 
 
+# limits the work one request can queue behind the password hashing.
+MAX_BATCH_USERS = 1000
+
+
+class BatchCreateUsersRequest(BaseModel):
+    users: List[CreateUserRequest] = Field(min_length=1, max_length=MAX_BATCH_USERS)
+
+
+class BatchUserStatus(StrEnum):
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+    INVALID = "invalid"
+
+
+class BatchUserResult(BaseModel):
+    email: str
+    status: BatchUserStatus
+    detail: str | None = None
+
+
+class BatchCreateUsersResponse(BaseModel):
+    results: List[BatchUserResult]
+
+
+async def __build_new_users(
+    requests: List[CreateUserRequest],
+) -> List[SensitiveUser | PasswordNotStrongException | InvalidEmailException]:
+    # the hashes run on the shared password executor. the semaphore keeps
+    # one batch from queueing all of its hashes ahead of concurrent logins.
+    semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+    async def build(
+        request: CreateUserRequest,
+    ) -> SensitiveUser | PasswordNotStrongException | InvalidEmailException:
+        async with semaphore:
+            try:
+                return await async_build_new_user(
+                    email=request.email,
+                    password=request.password,
+                    role=UserRole.USER,
+                    first_name=request.first_name,
+                    last_name=request.last_name,
+                )
+            except (PasswordNotStrongException, InvalidEmailException) as e:
+                return e
+
+    # a ConcurrencyLimitExceededError fails the whole batch, the other items
+    # are cancelled then rather than hashed for a response that is a 503.
+    tasks = [asyncio.ensure_future(build(request)) for request in requests]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+@app.post("/v1/users/batch")
+async def create_batch(
+    request: BatchCreateUsersRequest,
+    user_repository: Annotated[UserRepository, Depends(user_repository)],
+    authenticated_platform_owner: Annotated[
+        User, Depends(get_authenticated_platform_owner)
+    ],
+) -> BatchCreateUsersResponse:
+    """
+    Creates the users that do not exist yet, and reports a status per item.
+
+    No confirmation email is sent, as for a single create: the created
+    users cannot log in until a platform owner confirms them with
+    PUT /v1/user/{user_id}.
+    """
+    results: List[BatchUserResult | None] = [None] * len(request.users)
+    to_build: dict[int, CreateUserRequest] = {}
+
+    # cheap checks first, so rejected items are never hashed
+    for index, item in enumerate(request.users):
+        if item.password != item.confirm_password:
+            results[index] = BatchUserResult(
+                email=item.email,
+                status=BatchUserStatus.INVALID,
+                detail="Passwords do not match",
+            )
+        else:
+            to_build[index] = item
+
+    built = await __build_new_users([*to_build.values()])
+
+    # duplicates are only told apart once built, an invalid first item for
+    # an email must not hide a valid one later in the batch.
+    new_users: dict[int, SensitiveUser] = {}
+    seen_emails: set[str] = set()
+    for index, user_or_error in zip(to_build, built):
+        if not isinstance(user_or_error, SensitiveUser):
+            results[index] = BatchUserResult(
+                email=to_build[index].email,
+                status=BatchUserStatus.INVALID,
+                detail=str(user_or_error),
+            )
+        elif to_build[index].email in seen_emails:
+            results[index] = BatchUserResult(
+                email=to_build[index].email, status=BatchUserStatus.DUPLICATE
+            )
+        else:
+            seen_emails.add(to_build[index].email)
+            new_users[index] = user_or_error
+
+    created_ids = await user_repository.create_users_if_absent([*new_users.values()])
+
+    for index, user in new_users.items():
+        results[index] = BatchUserResult(
+            email=to_build[index].email,
+            status=(
+                BatchUserStatus.CREATED
+                if user.id in created_ids
+                else BatchUserStatus.DUPLICATE
+            ),
+        )
+
+    return BatchCreateUsersResponse(results=[r for r in results if r is not None])
+
+
 class UserSearchParams(BaseModel):
     username_contains: Optional[str] = None
     organization_id: Optional[str] = None
-    limit: Optional[int] = None
+    role: Optional[UserRole] = None
+    is_activated: Optional[bool] = None
+    is_confirmed: Optional[bool] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    limit: int = DEFAULT_PAGE_SIZE
     offset: Optional[int] = None
 
 
 def get_user_search_params(
+    limit: Annotated[int, Depends(get_page_size)],
     username_contains: str | None = None,
     organization_id: str | None = None,
-    limit: int | None = None,
+    role: UserRole | None = None,
+    is_activated: bool | None = None,
+    is_confirmed: bool | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
     offset: int | None = None,
 ):
     return UserSearchParams(
         username_contains=username_contains,
         organization_id=organization_id,
+        role=role,
+        is_activated=is_activated,
+        is_confirmed=is_confirmed,
+        created_after=created_after,
+        created_before=created_before,
         limit=limit,
         offset=offset,
     )
 
 
+# pages are walked with the cursor returned in the X-Next-Cursor header.
+# offset is still accepted for older clients.
 @app.get("/v1/users")
 async def list(
-    user_repository: Annotated[UserRepository, Depends(user_repository)],
+    response: Response,
+    user_repository: Annotated[UserRepository, Depends(read_user_repository)],
     authenticated_platform_owner: Annotated[
         User, Depends(get_authenticated_platform_owner)
     ],
+    after: Annotated[KeysetCursor | None, Depends(get_keyset_cursor)],
     user_search_params: UserSearchParams = Depends(get_user_search_params),
 ) -> List[User]:
-    users = await user_repository.get_users(**user_search_params.model_dump())
+    users = await user_repository.get_users(
+        **user_search_params.model_dump(), after=after
+    )
+    set_next_cursor_header(response, users, user_search_params.limit)
     return users
 
 
 @app.get("/v1/user/{user_id}")
 async def get(
-    user_repository: Annotated[UserRepository, Depends(user_repository)],
+    user_repository: Annotated[UserRepository, Depends(read_user_repository)],
     authenticated_platform_owner: Annotated[
         User, Depends(get_authenticated_platform_owner)
     ],
@@ -128,12 +288,10 @@ class UpdateUserRequest(BaseModel):
     organization_id: str = ""
 
 
+# edits are written and read back in one statement on the primary.
 @app.put("/v1/user/{user_id}")
 async def update(
     user_repository: Annotated[UserRepository, Depends(user_repository)],
-    organizations_repository: Annotated[
-        OrganizationsRepository, Depends(organizations_repository)
-    ],
     authenticated_user: Annotated[User, Depends(get_authenticated_user)],
     user_id: str,
     request: UpdateUserRequest,
@@ -141,7 +299,6 @@ async def update(
     if authenticated_user.is_platform_owner():
         return await __update_as_platform_owner(
             user_repository,
-            organizations_repository,
             authenticated_user,
             user_id,
             request,
@@ -154,7 +311,6 @@ async def update(
 
 async def __update_as_platform_owner(
     user_repository: UserRepository,
-    organizations_repository: OrganizationsRepository,
     authenticated_user: User,
     user_id: str,
     request: UpdateUserRequest,
@@ -162,31 +318,27 @@ async def __update_as_platform_owner(
     if not authenticated_user.is_platform_owner():
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    user_to_edit = await user_repository.get_user_by_id(user_id)
-    if not user_to_edit:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    organization: Organization | None = None
-    if request.organization_id:
-        organizaton = await organizations_repository.get_organization(
-            request.organization_id
+    try:
+        updated_user = await user_repository.update_user(
+            user_id,
+            UserChanges(
+                email=request.email,
+                first_name=request.first_name,
+                last_name=request.last_name,
+                role=request.role,
+                organization_id=request.organization_id or None,
+                is_activated=request.is_activated,
+                is_confirmed=request.is_confirmed,
+            ),
         )
-        if not organizaton:
-            raise HTTPException(status_code=404, detail="Organization not found")
-
-    user_to_edit.email = request.email
-    user_to_edit.first_name = request.first_name
-    user_to_edit.last_name = request.last_name
-    user_to_edit.role = request.role
-    user_to_edit.organization = organization
-    user_to_edit.is_activated = request.is_activated
-    user_to_edit.is_confirmed = request.is_confirmed
+    except UserExistsError:
+        raise HTTPException(status_code=400, detail="User already exists")
+    except OrganizationNotFoundError:
+        raise HTTPException(status_code=404, detail="Organization not found")
 
-    await user_repository.save_user(user_to_edit)
-    user_to_return = await user_repository.get_user_by_id(user_id)
-    if not user_to_return:
-        raise HTTPException(status_code=404, detail="Failed to fetch user after update")
-    return user_to_return
+    if not updated_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return updated_user
 
 
 async def __update_as_platform_user(
@@ -198,18 +350,19 @@ async def __update_as_platform_user(
     if authenticated_user.id != user_id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    user_to_edit = await user_repository.get_user_by_id(user_id)
-    if not user_to_edit:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    user_to_edit.email = request.email
-    user_to_edit.first_name = request.first_name
-    user_to_edit.last_name = request.last_name
-    # do not allow to change role, organization, self-activate, or self-confirm
-
-    await user_repository.save_user(user_to_edit)
+    try:
+        # do not allow to change role, organization, self-activate, or self-confirm
+        updated_user = await user_repository.update_user(
+            user_id,
+            UserChanges(
+                email=request.email,
+                first_name=request.first_name,
+                last_name=request.last_name,
+            ),
+        )
+    except UserExistsError:
+        raise HTTPException(status_code=400, detail="User already exists")
 
-    user_to_return = await user_repository.get_user_by_id(user_id)
-    if not user_to_return:
-        raise HTTPException(status_code=404, detail="Failed to fetch user after update")
-    return user_to_return
+    if not updated_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return updated_user
@@ -0,0 +1,27 @@
+-- Migration: add_created_at_and_id_indexes_on_organizations_and_users
+-- Created at: 2026-10-17 09:12:40
+-- ====  UP  ====
+
+BEGIN;
+
+-- (created_at, id) is the keyset used to paginate listings.
+-- it also covers the lookups of the single column created_at indexes.
+CREATE INDEX index_organizations_on_created_at_and_id ON organizations (created_at, id);
+CREATE INDEX index_users_on_created_at_and_id ON users (created_at, id);
+
+DROP INDEX index_organizations_on_created_at;
+DROP INDEX index_users_on_created_at;
+
+COMMIT;
+
+-- ==== DOWN ====
+
+BEGIN;
+
+CREATE INDEX index_organizations_on_created_at ON organizations (created_at);
+CREATE INDEX index_users_on_created_at ON users (created_at);
+
+DROP INDEX index_organizations_on_created_at_and_id;
+DROP INDEX index_users_on_created_at_and_id;
+
+COMMIT;
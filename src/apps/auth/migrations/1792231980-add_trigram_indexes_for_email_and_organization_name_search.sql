@@ -0,0 +1,22 @@
+-- Migration: add_trigram_indexes_for_email_and_organization_name_search
+-- Created at: 2026-10-17 10:13:00
+-- ====  UP  ====
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- trigram indexes serve ILIKE '%term%', which btree indexes cannot.
+CREATE INDEX index_users_on_email_trigram ON users USING gin (email gin_trgm_ops);
+CREATE INDEX index_organizations_on_name_trigram ON organizations USING gin (name gin_trgm_ops);
+
+COMMIT;
+
+-- ==== DOWN ====
+
+BEGIN;
+
+DROP INDEX index_users_on_email_trigram;
+DROP INDEX index_organizations_on_name_trigram;
+
+COMMIT;
@@ -0,0 +1,19 @@
+-- Migration: add_organization_id_and_created_at_and_id_index_on_users
+-- Created at: 2026-10-17 11:13:00
+-- ====  UP  ====
+
+BEGIN;
+
+-- serves listing the users of an organization in (created_at, id) order,
+-- and the lookups of the foreign key on organization_id.
+CREATE INDEX index_users_on_organization_id_and_created_at_and_id ON users (organization_id, created_at, id);
+
+COMMIT;
+
+-- ==== DOWN ====
+
+BEGIN;
+
+DROP INDEX index_users_on_organization_id_and_created_at_and_id;
+
+COMMIT;
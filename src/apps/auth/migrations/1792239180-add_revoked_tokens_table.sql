@@ -0,0 +1,28 @@
+-- Migration: add_revoked_tokens_table
+-- Created at: 2026-10-17 12:13:00
+-- ====  UP  ====
+
+BEGIN;
+
+-- ids of the tokens revoked before they expired, e.g. on logout.
+-- rows are pruned once the token they revoke has expired.
+CREATE TABLE revoked_tokens (
+    jti VARCHAR(128) PRIMARY KEY,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    revoked_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- serves the pruning of expired revocations
+CREATE INDEX index_revoked_tokens_on_expires_at ON revoked_tokens (expires_at);
+-- serves loading the revocations made since the last sync
+CREATE INDEX index_revoked_tokens_on_revoked_at ON revoked_tokens (revoked_at);
+
+COMMIT;
+
+-- ==== DOWN ====
+
+BEGIN;
+
+DROP TABLE revoked_tokens;
+
+COMMIT;
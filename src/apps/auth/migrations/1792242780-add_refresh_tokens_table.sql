@@ -0,0 +1,35 @@
+-- Migration: add_refresh_tokens_table
+-- Created at: 2026-10-17 13:13:00
+-- ====  UP  ====
+
+BEGIN;
+
+-- refresh tokens are stored as the sha256 of their value. each use
+-- rotates the token, and tokens rotated from the same login share a family.
+CREATE TABLE refresh_tokens (
+    id VARCHAR(32) NOT NULL,
+    token_hash VARCHAR(64) NOT NULL,
+    family_id VARCHAR(32) NOT NULL,
+    user_id VARCHAR(255) NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    used_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    revoked_at TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (token_hash)
+);
+
+-- serves revoking a whole family when a rotated token is reused
+CREATE INDEX index_refresh_tokens_on_family_id ON refresh_tokens (family_id);
+-- serves the foreign key on user_id
+CREATE INDEX index_refresh_tokens_on_user_id ON refresh_tokens (user_id);
+
+COMMIT;
+
+-- ==== DOWN ====
+
+BEGIN;
+
+DROP TABLE refresh_tokens;
+
+COMMIT;
@@ -0,0 +1,18 @@
+-- Migration: add_expires_at_index_on_refresh_tokens
+-- Created at: 2026-10-17 14:13:00
+-- ====  UP  ====
+
+BEGIN;
+
+-- serves the pruning of expired refresh tokens
+CREATE INDEX index_refresh_tokens_on_expires_at ON refresh_tokens (expires_at);
+
+COMMIT;
+
+-- ==== DOWN ====
+
+BEGIN;
+
+DROP INDEX index_refresh_tokens_on_expires_at;
+
+COMMIT;
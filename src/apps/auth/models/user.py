@@ -6,7 +6,10 @@ from uuid import uuid4
 
 from src.lib_auth.password import (
     InvalidPasswordException,
+    async_hash_password,
+    async_verify_password,
     hash_password,
+    password_needs_rehash,
     verify_password,
 )
 from src.lib_auth.roles import OrganizationRole, UserRole
@@ -135,25 +138,50 @@ class SensitiveUser(User):
 
         return True
 
+    async def async_authenticate(self, password: str) -> bool:
+        """
+        Same as authenticate, with the password verified off the event loop.
+        """
+        if not self.is_activated:
+            raise AuthenticationException("User is not activated")
 
-def build_new_user(
+        if not self.is_confirmed:
+            raise AuthenticationException("User is not confirmed")
+
+        try:
+            await async_verify_password(password, self.hashed_password)
+        except InvalidPasswordException:
+            raise AuthenticationException("Password is not valid")
+
+        return True
+
+    def password_needs_rehash(self) -> bool:
+        """
+        Whether the password hash is outdated, check it only once the password
+        is verified as it is hashed again from the plain password.
+        """
+        return password_needs_rehash(self.hashed_password)
+
+
+def __check_new_user(
     email: str,
     password: str,
-    role: UserRole,
-    first_name: str | None = None,
-    last_name: str | None = None,
-    password_strength_checker: (
-        PasswordStrengthChecker | None
-    ) = NaivePasswordStrengthChecker,
-) -> SensitiveUser:
+    password_strength_checker: PasswordStrengthChecker | None,
+) -> None:
     if not email:
         raise InvalidEmailException("Email is invalid")
 
     if password_strength_checker and not password_strength_checker.check(password):
         raise PasswordNotStrongException(password_strength_checker.get_instructions())
 
-    hashed_password = hash_password(password)
 
+def __new_user(
+    email: str,
+    hashed_password: str,
+    role: UserRole,
+    first_name: str | None,
+    last_name: str | None,
+) -> SensitiveUser:
     return SensitiveUser(
         id=uuid4().hex,
         email=email,
@@ -165,3 +193,35 @@ def build_new_user(
         first_name=first_name,
         last_name=last_name,
     )
+
+
+def build_new_user(
+    email: str,
+    password: str,
+    role: UserRole,
+    first_name: str | None = None,
+    last_name: str | None = None,
+    password_strength_checker: (
+        PasswordStrengthChecker | None
+    ) = NaivePasswordStrengthChecker,
+) -> SensitiveUser:
+    __check_new_user(email, password, password_strength_checker)
+    return __new_user(email, hash_password(password), role, first_name, last_name)
+
+
+async def async_build_new_user(
+    email: str,
+    password: str,
+    role: UserRole,
+    first_name: str | None = None,
+    last_name: str | None = None,
+    password_strength_checker: (
+        PasswordStrengthChecker | None
+    ) = NaivePasswordStrengthChecker,
+) -> SensitiveUser:
+    """
+    Same as build_new_user, with the password hashed off the event loop.
+    """
+    __check_new_user(email, password, password_strength_checker)
+    hashed_password = await async_hash_password(password)
+    return __new_user(email, hashed_password, role, first_name, last_name)
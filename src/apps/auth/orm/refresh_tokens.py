@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, ForeignKey, String, Table, func
+
+from .metadata import mapper_registry
+
+refresh_tokens_table = Table(
+    "refresh_tokens",
+    mapper_registry.metadata,
+    Column("id", String(32), primary_key=True),
+    Column("token_hash", String(64), unique=True, nullable=False),
+    Column("family_id", String(32), nullable=False, index=True),
+    Column(
+        "user_id",
+        String(255),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    ),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    Column(
+        "created_at", DateTime(timezone=True), server_default=func.now(), nullable=False
+    ),
+    Column("used_at", DateTime(timezone=True), nullable=True),
+    Column("revoked_at", DateTime(timezone=True), nullable=True),
+)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, String, Table, func
+
+from .metadata import mapper_registry
+
+revoked_tokens_table = Table(
+    "revoked_tokens",
+    mapper_registry.metadata,
+    Column("jti", String(128), primary_key=True),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    Column(
+        "revoked_at", DateTime(timezone=True), server_default=func.now(), nullable=False
+    ),
+)
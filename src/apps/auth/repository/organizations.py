@@ -1,10 +1,13 @@
 import uuid
 from typing import List, Protocol
 
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.lib_db.search import LIKE_ESCAPE_CHARACTER, contains_pattern
+from src.lib_utils.pagination import KeysetCursor
+
 from ..models.organization import Organization
 
 
@@ -22,6 +25,7 @@ class OrganizationsRepository(Protocol):
         name_contains: str | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        after: KeysetCursor | None = None,
     ) -> List[Organization]:
         pass
 
@@ -44,12 +48,24 @@ class SQLOrganizationsRepository(OrganizationsRepository):
         name_contains: str | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        after: KeysetCursor | None = None,
     ) -> List[Organization]:
         query = select(Organization)
 
         if name_contains:
-            # search by name but ignore case
-            query = query.filter(Organization.name.ilike(f"%{name_contains}%"))  # type: ignore[attr-defined]
+            # search by name but ignore case, served by the trigram index on name
+            query = query.filter(
+                Organization.name.ilike(  # type: ignore[attr-defined]
+                    contains_pattern(name_contains), escape=LIKE_ESCAPE_CHARACTER
+                )
+            )
+
+        if after:
+            # row comparison so that the (created_at, id) index can seek to the cursor
+            query = query.filter(
+                tuple_(Organization.created_at, Organization.id)  # type: ignore[arg-type]
+                > tuple_(after.created_at, after.id)
+            )
 
         if limit:
             query = query.limit(limit)
@@ -57,7 +73,9 @@ class SQLOrganizationsRepository(OrganizationsRepository):
         if offset:
             query = query.offset(offset)
 
-        query = query.order_by(Organization.created_at)  # type: ignore[arg-type]
+        query = query.order_by(
+            Organization.created_at, Organization.id  # type: ignore[arg-type]
+        )
 
         result = await self.__async_session.execute(query)
 
@@ -79,21 +97,37 @@ class SQLOrganizationsRepository(OrganizationsRepository):
         if not organization.id:
             raise ValueError("Organization id is required")
 
-        existing_organization = await self.get_organization(organization.id)
-        if not existing_organization:
-            raise OrganizationNotFoundError(
-                f"Organization {organization.id} does not exist"
+        # a single UPDATE ... RETURNING, which also brings back
+        # the updated_at generated by the server.
+        query = (
+            update(Organization)
+            .where(Organization.id == organization.id)  # type: ignore[arg-type]
+            .values(
+                name=organization.name,
+                description=organization.description,
+                role=organization.role,
+                updated_at=func.now(),
             )
+            .returning(Organization)
+            .execution_options(populate_existing=True)
+        )
 
-        existing_organization.name = organization.name
-        existing_organization.description = organization.description
-        existing_organization.role = organization.role
+        try:
+            result = await self.__async_session.execute(query)
+            updated_organization = result.scalar_one_or_none()
+            await self.__async_session.commit()
+        except IntegrityError as e:
+            await self.__async_session.rollback()
+            raise OrganizationExistsError(
+                "Organization with this name already exists"
+            ) from e
 
-        self.__async_session.add(existing_organization)
-        await self.__async_session.commit()
-        await self.__async_session.refresh(existing_organization)
+        if not updated_organization:
+            raise OrganizationNotFoundError(
+                f"Organization {organization.id} does not exist"
+            )
 
-        return existing_organization
+        return updated_organization
 
     async def create_organization(self, organization: Organization) -> Organization:
         if organization.id:
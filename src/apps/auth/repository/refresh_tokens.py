@@ -0,0 +1,169 @@
+from datetime import datetime
+from typing import Protocol
+from uuid import uuid4
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..orm.refresh_tokens import refresh_tokens_table
+
+
+class InvalidRefreshTokenError(Exception):
+    pass
+
+
+class RefreshTokenReusedError(InvalidRefreshTokenError):
+    pass
+
+
+class RefreshTokensRepository(Protocol):
+    async def create(
+        self,
+        token_hash: str,
+        user_id: str,
+        expires_at: datetime,
+        family_id: str | None = None,
+    ) -> str:
+        """
+        Stores a refresh token and returns its family id,
+        a new family unless `family_id` is given.
+        """
+        ...
+
+    async def rotate(
+        self, token_hash: str, new_token_hash: str, expires_at: datetime
+    ) -> str:
+        """
+        Marks the refresh token as used, stores its replacement in the same
+        family and returns the id of the user.
+
+        Raises RefreshTokenReusedError, after revoking the whole family,
+        when the token was already used, and InvalidRefreshTokenError
+        when it is unknown, expired or revoked.
+        """
+        ...
+
+    async def revoke_family(self, family_id: str) -> None: ...
+
+    async def revoke_family_of(self, token_hash: str) -> None:
+        """
+        Revokes the family of the token, e.g. on logout, whichever
+        token of the family it is. Unknown tokens are ignored.
+        """
+        ...
+
+    async def prune(self) -> int:
+        """
+        Deletes the expired tokens, returns how many.
+        """
+        ...
+
+
+class SQLRefreshTokensRepository:
+    def __init__(self, session: AsyncSession):
+        self.__async_session = session
+
+    async def create(
+        self,
+        token_hash: str,
+        user_id: str,
+        expires_at: datetime,
+        family_id: str | None = None,
+    ) -> str:
+        family_id = family_id or uuid4().hex
+        await self.__insert(token_hash, user_id, expires_at, family_id)
+        await self.__async_session.commit()
+        return family_id
+
+    async def rotate(
+        self, token_hash: str, new_token_hash: str, expires_at: datetime
+    ) -> str:
+        # claiming the token and checking that it is usable is one statement,
+        # so that two concurrent refreshes cannot both succeed.
+        result = await self.__async_session.execute(
+            update(refresh_tokens_table)
+            .where(
+                refresh_tokens_table.c.token_hash == token_hash,
+                refresh_tokens_table.c.used_at.is_(None),
+                refresh_tokens_table.c.revoked_at.is_(None),
+                refresh_tokens_table.c.expires_at > func.now(),
+            )
+            .values(used_at=func.now())
+            .returning(refresh_tokens_table.c.user_id, refresh_tokens_table.c.family_id)
+        )
+        row = result.one_or_none()
+
+        if row is None:
+            await self.__raise_for_unusable(token_hash)
+
+        user_id, family_id = row  # type: ignore[misc]
+        await self.__insert(new_token_hash, user_id, expires_at, family_id)
+        await self.__async_session.commit()
+        return user_id
+
+    async def __raise_for_unusable(self, token_hash: str) -> None:
+        result = await self.__async_session.execute(
+            select(
+                refresh_tokens_table.c.family_id, refresh_tokens_table.c.used_at
+            ).where(refresh_tokens_table.c.token_hash == token_hash)
+        )
+        row = result.one_or_none()
+
+        if row is not None and row.used_at is not None:
+            # a rotated token came back, either the client or an attacker
+            # holds a copy. no token of the family can be trusted anymore.
+            await self.revoke_family(row.family_id)
+            raise RefreshTokenReusedError("Refresh token was already used")
+
+        raise InvalidRefreshTokenError("Refresh token is not valid")
+
+    async def revoke_family(self, family_id: str) -> None:
+        await self.__async_session.execute(
+            update(refresh_tokens_table)
+            .where(
+                refresh_tokens_table.c.family_id == family_id,
+                refresh_tokens_table.c.revoked_at.is_(None),
+            )
+            .values(revoked_at=func.now())
+        )
+        await self.__async_session.commit()
+
+    async def revoke_family_of(self, token_hash: str) -> None:
+        family_id = (
+            select(refresh_tokens_table.c.family_id)
+            .where(refresh_tokens_table.c.token_hash == token_hash)
+            .scalar_subquery()
+        )
+        await self.__async_session.execute(
+            update(refresh_tokens_table)
+            .where(
+                refresh_tokens_table.c.family_id == family_id,
+                refresh_tokens_table.c.revoked_at.is_(None),
+            )
+            .values(revoked_at=func.now())
+        )
+        await self.__async_session.commit()
+
+    async def prune(self) -> int:
+        # every rotation stores a token. the reuse check only needs the used
+        # tokens that have not expired, an expired one is rejected anyway.
+        result = await self.__async_session.execute(
+            delete(refresh_tokens_table).where(
+                refresh_tokens_table.c.expires_at <= func.now()
+            )
+        )
+        await self.__async_session.commit()
+        return result.rowcount
+
+    async def __insert(
+        self, token_hash: str, user_id: str, expires_at: datetime, family_id: str
+    ) -> None:
+        await self.__async_session.execute(
+            insert(refresh_tokens_table).values(
+                id=uuid4().hex,
+                token_hash=token_hash,
+                family_id=family_id,
+                user_id=user_id,
+                expires_at=expires_at,
+            )
+        )
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import List, Protocol, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..orm.revoked_tokens import revoked_tokens_table
+
+
+class RevokedTokensRepository(Protocol):
+    async def revoke(self, jti: str, expires_at: datetime) -> None: ...
+
+    async def get_revocations(
+        self, revoked_since: datetime | None = None
+    ) -> List[Tuple[str, datetime, datetime]]:
+        """
+        Returns the (jti, expires_at, revoked_at) of the unexpired revocations,
+        only those made at or after `revoked_since` when it is given.
+        """
+        ...
+
+    async def prune(self) -> int:
+        """
+        Deletes the revocations of expired tokens, returns how many.
+        """
+        ...
+
+
+class SQLRevokedTokensRepository:
+    def __init__(self, session: AsyncSession):
+        self.__async_session = session
+
+    async def revoke(self, jti: str, expires_at: datetime) -> None:
+        await self.__async_session.execute(
+            insert(revoked_tokens_table)
+            .values(jti=jti, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=["jti"])
+        )
+        await self.__async_session.commit()
+
+    async def get_revocations(
+        self, revoked_since: datetime | None = None
+    ) -> List[Tuple[str, datetime, datetime]]:
+        query = select(
+            revoked_tokens_table.c.jti,
+            revoked_tokens_table.c.expires_at,
+            revoked_tokens_table.c.revoked_at,
+        ).where(revoked_tokens_table.c.expires_at > func.now())
+
+        if revoked_since:
+            query = query.where(revoked_tokens_table.c.revoked_at >= revoked_since)
+
+        result = await self.__async_session.execute(query)
+        return [(jti, expires_at, revoked_at) for jti, expires_at, revoked_at in result]
+
+    async def prune(self) -> int:
+        result = await self.__async_session.execute(
+            delete(revoked_tokens_table).where(
+                revoked_tokens_table.c.expires_at <= func.now()
+            )
+        )
+        await self.__async_session.commit()
+        return result.rowcount
@@ -1,10 +1,39 @@
-from typing import Protocol
+from datetime import datetime
+from typing import Protocol, Sequence, TypedDict
 
-from sqlalchemy import select
+from sqlalchemy import Select, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import aliased, contains_eager, joinedload
 
+from src.lib_auth.roles import UserRole
+from src.lib_db.errors import FOREIGN_KEY_VIOLATION, UNIQUE_VIOLATION, get_sqlstate
+from src.lib_db.search import LIKE_ESCAPE_CHARACTER, contains_pattern
+from src.lib_utils.pagination import KeysetCursor
+
+from ..models.organization import Organization
 from ..models.user import SensitiveUser, User
+from ..orm.users import users_table
+from .organizations import OrganizationNotFoundError
+
+# asyncpg caps a statement at 32767 bind parameters,
+# a users row takes 10 of them.
+INSERT_BATCH_SIZE = 1000
+
+
+class UserExistsError(Exception):
+    pass
+
+
+class UserChanges(TypedDict, total=False):
+    email: str
+    first_name: str | None
+    last_name: str | None
+    role: UserRole
+    is_activated: bool
+    is_confirmed: bool
+    organization_id: str | None
 
 
 class UserRepository(Protocol):
@@ -20,12 +49,48 @@ class UserRepository(Protocol):
         self,
         username_contains: str | None = None,
         organization_id: str | None = None,
+        role: UserRole | None = None,
+        is_activated: bool | None = None,
+        is_confirmed: bool | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        after: KeysetCursor | None = None,
     ) -> list[User]: ...
 
     async def save_user(self, user: SensitiveUser | User) -> None: ...
 
+    async def create_user_if_absent(self, user: SensitiveUser) -> bool:
+        """
+        Inserts the user unless one with the same email exists.
+        Returns False, without raising, for a duplicate email.
+        """
+        ...
+
+    async def create_users_if_absent(self, users: Sequence[SensitiveUser]) -> set[str]:
+        """
+        Inserts the users in one transaction, skipping emails that exist.
+        Returns the ids of the users that were created.
+        """
+        ...
+
+    async def update_user(self, id: str, changes: UserChanges) -> User | None:
+        """
+        Applies the changes and returns the updated user with its organization,
+        or None when the user does not exist.
+        """
+        ...
+
+    async def replace_hashed_password(
+        self, id: str, hashed_password: str, new_hashed_password: str
+    ) -> bool:
+        """
+        Stores the new hash only if the user still has the given one, so a
+        password changed in the meantime is kept. Returns whether it was stored.
+        """
+        ...
+
     async def delete_user(self, user: SensitiveUser | User) -> None: ...
 
 
@@ -72,14 +137,59 @@ class SQLUserRepository:
         self,
         username_contains: str | None = None,
         organization_id: str | None = None,
+        role: UserRole | None = None,
+        is_activated: bool | None = None,
+        is_confirmed: bool | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        after: KeysetCursor | None = None,
     ) -> list[User]:
+        query = self.build_get_users_query(
+            username_contains=username_contains,
+            organization_id=organization_id,
+            role=role,
+            is_activated=is_activated,
+            is_confirmed=is_confirmed,
+            created_after=created_after,
+            created_before=created_before,
+            limit=limit,
+            offset=offset,
+            after=after,
+        )
+
+        result = await self.__async_session.execute(query)
+
+        return list(result.scalars().all())
+
+    def build_get_users_query(
+        self,
+        username_contains: str | None = None,
+        organization_id: str | None = None,
+        role: UserRole | None = None,
+        is_activated: bool | None = None,
+        is_confirmed: bool | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+        after: KeysetCursor | None = None,
+    ) -> Select:
+        """
+        Every filter compares a bare column, and rows are always ordered by
+        (created_at, id). With an organization the query walks the
+        (organization_id, created_at, id) index, otherwise (created_at, id).
+        The remaining filters are checked against the rows read from that index.
+        """
         query = select(User)
 
         if username_contains:
+            # served by the trigram index on email
             query = query.filter(
-                User.email.icontains(username_contains)  # type: ignore[union-attr]
+                User.email.ilike(  # type: ignore[union-attr]
+                    contains_pattern(username_contains), escape=LIKE_ESCAPE_CHARACTER
+                )
             )
 
         if organization_id:
@@ -87,6 +197,28 @@ class SQLUserRepository:
                 User.organization_id == organization_id  # type: ignore[attr-defined]
             )
 
+        if role:
+            query = query.filter(User.role == role)  # type: ignore[arg-type]
+
+        if is_activated is not None:
+            query = query.filter(User.is_activated == is_activated)  # type: ignore[arg-type]
+
+        if is_confirmed is not None:
+            query = query.filter(User.is_confirmed == is_confirmed)  # type: ignore[arg-type]
+
+        if created_after:
+            query = query.filter(User.created_at >= created_after)  # type: ignore[arg-type, operator]
+
+        if created_before:
+            query = query.filter(User.created_at < created_before)  # type: ignore[arg-type, operator]
+
+        if after:
+            # row comparison so that the (created_at, id) index can seek to the cursor
+            query = query.filter(
+                tuple_(User.created_at, User.id)  # type: ignore[arg-type]
+                > tuple_(after.created_at, after.id)
+            )
+
         if limit:
             query = query.limit(limit)
 
@@ -94,15 +226,138 @@ class SQLUserRepository:
             query = query.offset(offset)
 
         query = query.options(joinedload(User.organization))  # type: ignore[arg-type]
-        query = query.order_by(User.created_at)  # type: ignore[arg-type]
-
-        result = await self.__async_session.execute(query)
+        query = query.order_by(User.created_at, User.id)  # type: ignore[arg-type]
 
-        return list(result.scalars().all())
+        return query
 
     async def save_user(self, user: SensitiveUser | User) -> None:
         self.__async_session.add(user)
         await self.__async_session.commit()
 
+    async def create_user_if_absent(self, user: SensitiveUser) -> bool:
+        # a single INSERT ... ON CONFLICT DO NOTHING RETURNING,
+        # no row comes back when the email is taken.
+        statement = (
+            insert(SensitiveUser)
+            .values(self.__insert_values(user))
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(
+                SensitiveUser.created_at,  # type: ignore[arg-type]
+                SensitiveUser.updated_at,  # type: ignore[arg-type]
+            )
+        )
+
+        result = await self.__async_session.execute(statement)
+        row = result.one_or_none()
+        await self.__async_session.commit()
+
+        if row is None:
+            return False
+
+        user.created_at, user.updated_at = row
+        return True
+
+    async def create_users_if_absent(self, users: Sequence[SensitiveUser]) -> set[str]:
+        users_by_id = {user.id: user for user in users}
+        created_ids: set[str] = set()
+
+        # multi-row inserts, committed together
+        try:
+            for start in range(0, len(users), INSERT_BATCH_SIZE):
+                statement = (
+                    insert(SensitiveUser)
+                    .values(
+                        [
+                            self.__insert_values(user)
+                            for user in users[start : start + INSERT_BATCH_SIZE]
+                        ]
+                    )
+                    .on_conflict_do_nothing(index_elements=["email"])
+                    .returning(
+                        SensitiveUser.id,  # type: ignore[arg-type]
+                        SensitiveUser.created_at,  # type: ignore[arg-type]
+                        SensitiveUser.updated_at,  # type: ignore[arg-type]
+                    )
+                )
+                result = await self.__async_session.execute(statement)
+                for id, created_at, updated_at in result:
+                    users_by_id[id].created_at = created_at
+                    users_by_id[id].updated_at = updated_at
+                    created_ids.add(id)
+
+            await self.__async_session.commit()
+        except Exception:
+            await self.__async_session.rollback()
+            raise
+
+        return created_ids
+
+    @staticmethod
+    def __insert_values(user: SensitiveUser) -> dict:
+        return {
+            "id": user.id,
+            "email": user.email,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "hashed_password": user.hashed_password,
+            "is_activated": user.is_activated,
+            "is_confirmed": user.is_confirmed,
+            "confirmation_token": user.confirmation_token,
+            "role": user.role,
+            "organization_id": user.organization.id if user.organization else None,
+        }
+
+    async def update_user(self, id: str, changes: UserChanges) -> User | None:
+        # WITH updated AS (UPDATE users ... RETURNING users.*)
+        # SELECT updated.*, organizations.* FROM updated LEFT JOIN organizations
+        updated = (
+            update(users_table)
+            .where(users_table.c.id == id)
+            .values(**changes, updated_at=func.now())
+            .returning(*users_table.c)
+            .cte("updated_user")
+        )
+        updated_user = aliased(User, updated)
+        query = (
+            select(updated_user)
+            .outerjoin(Organization, updated.c.organization_id == Organization.id)
+            .options(contains_eager(updated_user.organization))  # type: ignore[arg-type]
+            .execution_options(populate_existing=True)
+        )
+
+        try:
+            result = await self.__async_session.execute(query)
+            user = result.scalar_one_or_none()
+            await self.__async_session.commit()
+        except IntegrityError as e:
+            await self.__async_session.rollback()
+            sqlstate = get_sqlstate(e)
+            if sqlstate == FOREIGN_KEY_VIOLATION:
+                raise OrganizationNotFoundError(
+                    f"Organization {changes.get('organization_id')} does not exist"
+                ) from e
+            if sqlstate == UNIQUE_VIOLATION:
+                raise UserExistsError("User with this email already exists") from e
+            raise
+
+        return user
+
+    async def replace_hashed_password(
+        self, id: str, hashed_password: str, new_hashed_password: str
+    ) -> bool:
+        query = (
+            update(users_table)
+            .where(
+                users_table.c.id == id,
+                users_table.c.hashed_password == hashed_password,
+            )
+            .values(hashed_password=new_hashed_password, updated_at=func.now())
+            .returning(users_table.c.id)
+        )
+        result = await self.__async_session.execute(query)
+        replaced = result.scalar_one_or_none() is not None
+        await self.__async_session.commit()
+        return replaced
+
     async def delete_user(self, user: SensitiveUser | User) -> None:
         raise NotImplementedError
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.lib_auth.revocation import TokenRevocationList
+
+from .repository.refresh_tokens import SQLRefreshTokensRepository
+from .repository.revoked_tokens import SQLRevokedTokensRepository
+
+
+class TokenRevocationSync:
+    """
+    Keeps the in-process revocation list in step with the revoked_tokens
+    table, so that tokens revoked by other processes are rejected here too,
+    and prunes the revocations of expired tokens and the expired refresh
+    tokens.
+    """
+
+    def __init__(
+        self,
+        revocation_list: TokenRevocationList,
+        make_session: async_sessionmaker[AsyncSession],
+        sync_interval_seconds: float = 10,
+        prune_interval_seconds: float = 300,
+        sync_overlap_seconds: float = 60,
+    ):
+        self.__revocation_list = revocation_list
+        self.__make_session = make_session
+        self.__sync_interval_seconds = sync_interval_seconds
+        self.__prune_interval_seconds = prune_interval_seconds
+        self.__sync_overlap_seconds = sync_overlap_seconds
+        self.__revoked_since: datetime | None = None
+        self.__pruned_at = time.time()
+
+    async def sync(self) -> None:
+        async with self.__make_session() as session:
+            repository = SQLRevokedTokensRepository(session)
+
+            # revoked_at is when the revoking transaction started, not when it
+            # committed: a revocation committed after a sync may be dated before
+            # the latest one it loaded. Revocations are loaded again over an
+            # overlap to catch those, adding them twice is harmless.
+            revoked_since = (
+                self.__revoked_since - timedelta(seconds=self.__sync_overlap_seconds)
+                if self.__revoked_since
+                else None
+            )
+            revocations = await repository.get_revocations(revoked_since)
+            self.__revocation_list.add_all(
+                (jti, expires_at.timestamp()) for jti, expires_at, _ in revocations
+            )
+            if revocations:
+                self.__revoked_since = max(
+                    revoked_at for _, _, revoked_at in revocations
+                )
+
+            if time.time() - self.__pruned_at >= self.__prune_interval_seconds:
+                await repository.prune()
+                await SQLRefreshTokensRepository(session).prune()
+                self.__revocation_list.prune()
+                self.__pruned_at = time.time()
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.__sync_interval_seconds)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Could not sync the token revocation list: {e!r}")
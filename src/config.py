@@ -36,11 +36,17 @@ class ObservabilityConfig(BaseModel):
     sentry_dsn: Optional[str] = None
 
 
+class HealthConfig(BaseModel):
+    database_probe_ttl_seconds: float = 5
+    database_probe_timeout_seconds: float = 2
+
+
 class Config(BaseModel):
     server: ServerConfig
     security: SecurityConfig
     cashmere: AWSCashmereConfig
     observability: ObservabilityConfig
+    health: HealthConfig
 
 
 _config: Optional[Config] = None
@@ -66,5 +72,6 @@ def get_config() -> Config:
         observability=ObservabilityConfig(
             sentry_dsn=config["config"].get("observability", {}).get("sentry_dsn", None)
         ),
+        health=HealthConfig(**config["config"].get("health", {})),
     )
     return _config
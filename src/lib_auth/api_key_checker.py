@@ -38,11 +38,11 @@ class APIKeyChecker:
         if found_api_key is None:
             raise InvalidAPIKeyError("Invalid API key")
 
-        for endpoint in found_api_key.allowed_endpoints:
+        for allowed_endpoint in found_api_key.allowed_endpoints:
             if (
-                (endpoint.app == "*" or endpoint.app == endpoint.app)
-                and (endpoint.method == "*" or endpoint.method == endpoint.method)
-                and (endpoint.endpoint == "*" or endpoint.endpoint == endpoint.endpoint)
+                allowed_endpoint.app in ("*", endpoint.app)
+                and allowed_endpoint.method in ("*", endpoint.method)
+                and allowed_endpoint.endpoint in ("*", endpoint.endpoint)
             ):
                 return
 
@@ -0,0 +1,112 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict
+
+from .jwt import JWTClaim
+
+
+@dataclass
+class _CachedClaim:
+    claim: JWTClaim
+    expires_at: float
+
+
+class VerifiedClaimCache:
+    """
+    A bounded LRU of claims whose token already passed signature and claim
+    verification, keyed by the sha256 digest of the token.
+
+    An entry is served until the earliest of the token's `exp`, `ttl_seconds`
+    after it was cached, and the `not_after` it was put with. Revoked tokens
+    must be dropped with `invalidate_jti` and the whole cache with `clear`
+    when keys rotate.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 300):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self.__max_entries = max_entries
+        self.__ttl_seconds = ttl_seconds
+        # claims are looked up from the worker threads of sync dependencies
+        self.__lock = threading.Lock()
+        self.__entries: OrderedDict[bytes, _CachedClaim] = OrderedDict()
+        self.__digests_by_jti: Dict[str, bytes] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def __digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> JWTClaim | None:
+        digest = self.__digest(token)
+        with self.__lock:
+            entry = self.__entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if time.time() >= entry.expires_at:
+                self.__remove(digest)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(digest)
+            self.hits += 1
+            return entry.claim
+
+    def put(self, token: str, claim: JWTClaim, not_after: float | None = None) -> None:
+        expires_at = min(float(claim.exp), time.time() + self.__ttl_seconds)
+        if not_after is not None:
+            expires_at = min(expires_at, not_after)
+        digest = self.__digest(token)
+        with self.__lock:
+            if digest in self.__entries:
+                self.__remove(digest)
+
+            self.__entries[digest] = _CachedClaim(claim=claim, expires_at=expires_at)
+            self.__digests_by_jti[claim.jti] = digest
+
+            while len(self.__entries) > self.__max_entries:
+                oldest_digest = next(iter(self.__entries))
+                self.__remove(oldest_digest)
+                self.evictions += 1
+
+    def invalidate_jti(self, jti: str) -> None:
+        with self.__lock:
+            digest = self.__digests_by_jti.get(jti)
+            if digest is not None:
+                self.__remove(digest)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.invalidations += len(self.__entries)
+            self.__entries.clear()
+            self.__digests_by_jti.clear()
+
+    def __remove(self, digest: bytes) -> None:
+        entry = self.__entries.pop(digest)
+        if self.__digests_by_jti.get(entry.claim.jti) == digest:
+            del self.__digests_by_jti[entry.claim.jti]
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "size": len(self.__entries),
+                "max_entries": self.__max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
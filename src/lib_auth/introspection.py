@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence
+
+from .claim_cache import VerifiedClaimCache
+from .jwt import JWTClaim, JWTDecodeService, JWTException, decode_and_verify_jwt_token
+from .revocation import TokenRevocationList
+
+
+@dataclass
+class TokenIntrospection:
+    active: bool
+    claim: JWTClaim | None = None
+
+
+class TokenVerifier:
+    """
+    Verifies tokens the way every authenticated request does: a cached claim
+    is served when there is one, otherwise the token is decoded and verified
+    and its claim cached, and revoked tokens are rejected either way.
+    """
+
+    def __init__(
+        self,
+        jwt_decode_service: JWTDecodeService,
+        claim_cache: VerifiedClaimCache | None = None,
+        key_not_after: Callable[[str], float | None] | None = None,
+        revocation_list: TokenRevocationList | None = None,
+    ):
+        self.__jwt_decode_service = jwt_decode_service
+        self.__claim_cache = claim_cache
+        self.__key_not_after = key_not_after
+        self.__revocation_list = revocation_list
+
+    def verify(self, jwt: str) -> JWTClaim:
+        claim = self.__claim_cache.get(jwt) if self.__claim_cache else None
+
+        if not claim:
+            claim = decode_and_verify_jwt_token(jwt, self.__jwt_decode_service)
+
+            if self.__claim_cache:
+                self.__claim_cache.put(
+                    jwt,
+                    claim,
+                    not_after=(
+                        self.__key_not_after(jwt) if self.__key_not_after else None
+                    ),
+                )
+
+        # checked for cached claims too, the token may be revoked since
+        if self.__revocation_list and self.__revocation_list.is_revoked(claim.jti):
+            raise JWTException("JWT revoked")
+
+        return claim
+
+    def introspect(self, jwts: Sequence[str]) -> List[TokenIntrospection]:
+        """
+        Verifies each distinct token once and returns one result per token,
+        in the order they were given.
+        """
+        introspections: Dict[str, TokenIntrospection] = {}
+
+        for jwt in jwts:
+            if jwt in introspections:
+                continue
+
+            try:
+                introspections[jwt] = TokenIntrospection(
+                    active=True, claim=self.verify(jwt)
+                )
+            except JWTException:
+                introspections[jwt] = TokenIntrospection(active=False)
+
+        return [introspections[jwt] for jwt in jwts]
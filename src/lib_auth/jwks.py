@@ -0,0 +1,69 @@
+import hashlib
+import json
+import math
+import threading
+import time
+
+from .jwt_keys import JWTKeySet
+
+
+class JWKSDocument:
+    """
+    The JSON Web Key Set of the verification keys of a key set, serialized
+    once and served as is until the keys change or one of them retires.
+    """
+
+    def __init__(self, key_set: JWTKeySet):
+        self.__key_set = key_set
+        self.__lock = threading.Lock()
+        self.__body: bytes | None = None
+        self.__etag: str | None = None
+        self.__expires_at: float | None = None
+
+        key_set.subscribe(self.invalidate)
+
+    def invalidate(self) -> None:
+        with self.__lock:
+            self.__body = None
+
+    def get(self) -> tuple[bytes, str]:
+        """
+        Returns the serialized document and its strong ETag.
+        """
+        with self.__lock:
+            self.__build_if_stale()
+            return self.__body, self.__etag  # type: ignore[return-value]
+
+    def max_age(self, max_age_seconds: int) -> int:
+        """
+        The seconds the document may be cached for, at most until the
+        earliest `not_after` of its keys, so that no cache keeps serving a
+        key once it retired.
+        """
+        with self.__lock:
+            self.__build_if_stale()
+            if self.__expires_at is None:
+                return max_age_seconds
+            seconds_left = math.floor(self.__expires_at - time.time())
+        return max(min(max_age_seconds, seconds_left), 0)
+
+    def __build_if_stale(self) -> None:
+        if self.__body is None or (
+            self.__expires_at is not None and time.time() >= self.__expires_at
+        ):
+            self.__build()
+
+    def __build(self) -> None:
+        keys = []
+        not_afters = []
+        for key in self.__key_set.verification_keys():
+            keys.append({**key.decode_service.to_jwk(), "kid": key.kid})
+            if key.not_after is not None:
+                not_afters.append(key.not_after)
+
+        self.__body = json.dumps(
+            {"keys": keys}, separators=(",", ":"), sort_keys=True
+        ).encode()
+        self.__etag = f'"{hashlib.sha256(self.__body).hexdigest()}"'
+        # a retiring key leaves the document when its window closes
+        self.__expires_at = min(not_afters) if not_afters else None
@@ -1,11 +1,16 @@
+import base64
+import hashlib
+import json
 from dataclasses import dataclass
 from datetime import datetime
+from enum import StrEnum
 from os import urandom
 from typing import Protocol
 
 import jwt as pyjwt
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 
 
 @dataclass
@@ -38,6 +43,22 @@ class PayloadClaim:
         }
 
 
+# version of the compact claim format, carried in its `v` claim
+COMPACT_CLAIM_VERSION = 2
+
+# short names of the custom claims in the compact format
+_COMPACT_CUSTOM_CLAIM_KEYS = {
+    "user_id": "uid",
+    "role": "rl",
+    "organization_id": "oid",
+    "organization_role": "orl",
+    "impersonator_user_id": "iuid",
+    "impersonator_user_role": "irl",
+    "impersonator_organization_id": "ioid",
+    "impersonator_organization_role": "iorl",
+}
+
+
 @dataclass
 class JWTClaim:
     # Claims in the jwt standard
@@ -62,13 +83,32 @@ class JWTClaim:
             },
         }
 
+    def as_compact_dict(self) -> dict:
+        """
+        The claim with short custom claim names and without null values.
+        `uid` is left out when it is the same as `sub`.
+        """
+        compact = {
+            "v": COMPACT_CLAIM_VERSION,
+            "sub": self.sub,
+            "exp": self.exp,
+            "iat": self.iat,
+            "iss": self.iss,
+            "jti": self.jti,
+        }
+        for name, value in self.custom_claims.as_dict().items():
+            if value is None or (name == "user_id" and value == self.sub):
+                continue
+            compact[_COMPACT_CUSTOM_CLAIM_KEYS[name]] = value
+        return compact
+
 
 class JWTException(Exception):
     pass
 
 
 class JWTSigningService(Protocol):
-    def generate(self, payload: dict) -> str:
+    def generate(self, payload: dict, headers: dict | None = None) -> str:
         pass
 
 
@@ -77,7 +117,21 @@ class JWTDecodeService(Protocol):
         pass
 
 
-class RSA256JWTSigningService:
+class JWTPublicKeyDecodeService(JWTDecodeService, Protocol):
+    def to_jwk(self) -> dict:
+        pass
+
+
+class JWTAlgorithm(StrEnum):
+    RS256 = "RS256"
+    ES256 = "ES256"
+    EDDSA = "EdDSA"
+
+
+class _PEMJWTSigningService:
+    algorithm: JWTAlgorithm
+    key_types: tuple[type, ...]
+
     def __init__(
         self,
         private_key_pem: str,
@@ -97,29 +151,55 @@ class RSA256JWTSigningService:
             password=private_key_password.encode(),
             backend=default_backend(),
         )
+        if not _is_key_for(self.algorithm, self.__private_key, self.key_types):
+            raise JWTException(f"The private key is not a {self.algorithm} key")
 
-    def generate(self, payload: dict) -> str:
+    def generate(self, payload: dict, headers: dict | None = None) -> str:
         if not self.__private_key:
             raise JWTException("Cannot generate a JWT without a private key")
-        return pyjwt.encode(payload, self.__private_key, algorithm="RS256")  # type: ignore
+        return pyjwt.encode(
+            payload,
+            self.__private_key,  # type: ignore[arg-type]
+            algorithm=self.algorithm,
+            headers=headers,
+        )
 
 
-class RSA256JWTDecodeService:
+class _PEMJWTDecodeService:
+    algorithm: JWTAlgorithm
+    key_types: tuple[type, ...]
+
     def __init__(self, public_key_pem: str):
         if not public_key_pem:
             raise JWTException(
                 "Cannot initialize a JWT decode service without a public key"
             )
 
-        self.__public_key = public_key_pem
+        # the PEM is parsed once here, pyjwt would re-parse it on every decode
+        try:
+            self.__public_key = serialization.load_pem_public_key(
+                data=public_key_pem.encode(), backend=default_backend()
+            )
+        except ValueError:
+            raise JWTException("Cannot load the public key of the JWT decode service")
+        if not _is_key_for(self.algorithm, self.__public_key, self.key_types):
+            raise JWTException(f"The public key is not a {self.algorithm} key")
+
+        self.__decoder = pyjwt.PyJWT(options={"verify_signature": True})
+
+    def to_jwk(self) -> dict:
+        jwk = pyjwt.get_algorithm_by_name(self.algorithm).to_jwk(
+            self.__public_key, as_dict=True
+        )
+        return {**jwk, "alg": self.algorithm, "use": "sig"}  # type: ignore[dict-item]
 
     def decode(self, jwt: str) -> dict:
         if not self.__public_key:
             raise JWTException("Cannot decode a JWT without a public key")
 
         try:
-            return pyjwt.decode(
-                jwt, self.__public_key, algorithms=["RS256"], verify=True
+            return self.__decoder.decode(
+                jwt, self.__public_key, algorithms=[self.algorithm]  # type: ignore[arg-type]
             )
         except pyjwt.exceptions.ExpiredSignatureError:
             raise JWTException("JWT expired")
@@ -129,6 +209,91 @@ class RSA256JWTDecodeService:
             raise JWTException("Invalid JWT")
 
 
+def _is_key_for(algorithm: JWTAlgorithm, key: object, key_types: tuple) -> bool:
+    if not isinstance(key, key_types):
+        return False
+
+    # ES256 is ECDSA over P-256 only
+    if algorithm == JWTAlgorithm.ES256:
+        return isinstance(key.curve, ec.SECP256R1)  # type: ignore[attr-defined]
+
+    return True
+
+
+class RSA256JWTSigningService(_PEMJWTSigningService):
+    algorithm = JWTAlgorithm.RS256
+    key_types = (rsa.RSAPrivateKey,)
+
+
+class RSA256JWTDecodeService(_PEMJWTDecodeService):
+    algorithm = JWTAlgorithm.RS256
+    key_types = (rsa.RSAPublicKey,)
+
+
+class ES256JWTSigningService(_PEMJWTSigningService):
+    algorithm = JWTAlgorithm.ES256
+    key_types = (ec.EllipticCurvePrivateKey,)
+
+
+class ES256JWTDecodeService(_PEMJWTDecodeService):
+    algorithm = JWTAlgorithm.ES256
+    key_types = (ec.EllipticCurvePublicKey,)
+
+
+class EdDSAJWTSigningService(_PEMJWTSigningService):
+    algorithm = JWTAlgorithm.EDDSA
+    key_types = (ed25519.Ed25519PrivateKey,)
+
+
+class EdDSAJWTDecodeService(_PEMJWTDecodeService):
+    algorithm = JWTAlgorithm.EDDSA
+    key_types = (ed25519.Ed25519PublicKey,)
+
+
+_SIGNING_SERVICES: dict[JWTAlgorithm, type[_PEMJWTSigningService]] = {
+    JWTAlgorithm.RS256: RSA256JWTSigningService,
+    JWTAlgorithm.ES256: ES256JWTSigningService,
+    JWTAlgorithm.EDDSA: EdDSAJWTSigningService,
+}
+
+_DECODE_SERVICES: dict[JWTAlgorithm, type[_PEMJWTDecodeService]] = {
+    JWTAlgorithm.RS256: RSA256JWTDecodeService,
+    JWTAlgorithm.ES256: ES256JWTDecodeService,
+    JWTAlgorithm.EDDSA: EdDSAJWTDecodeService,
+}
+
+
+# members that identify each key type, RFC 7638 section 3.2
+_JWK_THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+def jwk_thumbprint(jwk: dict) -> str:
+    """
+    The RFC 7638 thumbprint of a public JWK, used as its default `kid`.
+    """
+    members = {name: jwk[name] for name in _JWK_THUMBPRINT_MEMBERS[jwk["kty"]]}
+    digest = hashlib.sha256(
+        json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def make_jwt_signing_service(
+    algorithm: JWTAlgorithm, private_key_pem: str, private_key_password: str
+) -> JWTSigningService:
+    return _SIGNING_SERVICES[algorithm](private_key_pem, private_key_password)
+
+
+def make_jwt_decode_service(
+    algorithm: JWTAlgorithm, public_key_pem: str
+) -> JWTPublicKeyDecodeService:
+    return _DECODE_SERVICES[algorithm](public_key_pem)
+
+
 def build_jwt_claim(
     user_id: str,
     role: str,
@@ -147,7 +312,7 @@ def build_jwt_claim(
         exp=int(now.timestamp() + expire_in_seconds),
         iat=int(now.timestamp()),
         iss=issuer,
-        jti=urandom(64).hex(),  # 512 bits, 128 hex chars
+        jti=base64.urlsafe_b64encode(urandom(16)).rstrip(b"=").decode(),  # 128 bits
         custom_claims=PayloadClaim(
             user_id=user_id,
             role=role,
@@ -165,16 +330,34 @@ def build_jwt_claim(
 def create_jwt_token(
     payload: JWTClaim,
     signing_service: JWTSigningService,
+    compact: bool = False,
 ) -> str:
-    return signing_service.generate(payload.as_dict())
+    return signing_service.generate(
+        payload.as_compact_dict() if compact else payload.as_dict()
+    )
 
 
-def decode_and_verify_jwt_token(
-    jwt: str, decoding_service: JWTDecodeService
-) -> JWTClaim:
-    payload = decoding_service.decode(jwt)
+def __claim_from_compact_payload(payload: dict) -> JWTClaim:
+    custom_claims = {
+        name: payload.get(key) for name, key in _COMPACT_CUSTOM_CLAIM_KEYS.items()
+    }
+    custom_claims["user_id"] = payload.get("uid", payload["sub"])
 
-    claim = JWTClaim(
+    return JWTClaim(
+        sub=payload["sub"],
+        exp=payload["exp"],
+        iat=payload["iat"],
+        iss=payload["iss"],
+        jti=payload["jti"],
+        custom_claims=PayloadClaim(**custom_claims),
+    )
+
+
+def __claim_from_payload(payload: dict) -> JWTClaim:
+    if payload.get("v") == COMPACT_CLAIM_VERSION:
+        return __claim_from_compact_payload(payload)
+
+    return JWTClaim(
         sub=payload["sub"],
         exp=payload["exp"],
         iat=payload["iat"],
@@ -196,6 +379,19 @@ def decode_and_verify_jwt_token(
         ),
     )
 
+
+def decode_and_verify_jwt_token(
+    jwt: str, decoding_service: JWTDecodeService
+) -> JWTClaim:
+    payload = decoding_service.decode(jwt)
+
+    # both the compact and the original format are accepted,
+    # until every token of the original format has expired.
+    try:
+        claim = __claim_from_payload(payload)
+    except (KeyError, TypeError):
+        raise JWTException("JWT claim verification failed")
+
     if not verify_jwt_claim(claim):
         raise JWTException("JWT claim verification failed")
 
@@ -0,0 +1,121 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List
+
+import jwt as pyjwt
+
+from .jwt import JWTException, JWTPublicKeyDecodeService, JWTSigningService
+
+
+@dataclass
+class JWTVerificationKey:
+    kid: str
+    decode_service: JWTPublicKeyDecodeService
+    # end of the overlap window of a retired key, as a UNIX timestamp.
+    # tokens signed with it are rejected afterwards.
+    not_after: float | None = None
+
+    def is_retired(self, now: float) -> bool:
+        return self.not_after is not None and now >= self.not_after
+
+
+class JWTKeySet:
+    """
+    Verification keys indexed by `kid`, and the one key that signs new tokens.
+
+    Signed tokens carry the `kid` of the signing key in their header, and
+    decoding looks that `kid` up instead of trying every key. Tokens issued
+    before kids were stamped are verified with `legacy_kid`.
+
+    Rotating keys means adding the new verification key, switching the
+    signing key to it, and giving the old key a `not_after` that is at
+    least as long as the lifetime of the tokens it signed.
+    """
+
+    def __init__(
+        self,
+        verification_keys: Iterable[JWTVerificationKey] = (),
+        legacy_kid: str | None = None,
+    ):
+        self.__keys: Dict[str, JWTVerificationKey] = {}
+        self.__signing_kid: str | None = None
+        self.__signing_service: JWTSigningService | None = None
+        self.__subscribers: List[Callable[[], None]] = []
+        self.legacy_kid = legacy_kid
+
+        for key in verification_keys:
+            self.add_verification_key(key)
+
+    @property
+    def signing_kid(self) -> str | None:
+        return self.__signing_kid
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """
+        Registers a callback that runs whenever keys are added, removed,
+        or the signing key changes, e.g. to drop cached verifications.
+        """
+        self.__subscribers.append(callback)
+
+    def __notify(self) -> None:
+        for callback in self.__subscribers:
+            callback()
+
+    def add_verification_key(self, key: JWTVerificationKey) -> None:
+        self.__keys[key.kid] = key
+        self.__notify()
+
+    def remove_verification_key(self, kid: str) -> None:
+        if kid == self.__signing_kid:
+            raise JWTException("Cannot remove the key that signs new tokens")
+        self.__keys.pop(kid, None)
+        self.__notify()
+
+    def get_verification_key(self, kid: str) -> JWTVerificationKey | None:
+        return self.__keys.get(kid)
+
+    def verification_keys(self) -> List[JWTVerificationKey]:
+        now = time.time()
+        return [key for key in self.__keys.values() if not key.is_retired(now)]
+
+    def set_signing_key(self, kid: str, signing_service: JWTSigningService) -> None:
+        key = self.__keys.get(kid)
+        if key is None:
+            raise JWTException(f"No verification key with kid {kid}")
+        if key.is_retired(time.time()):
+            raise JWTException(f"The key {kid} is retired")
+
+        self.__signing_kid = kid
+        self.__signing_service = signing_service
+        self.__notify()
+
+    def generate(self, payload: dict, headers: dict | None = None) -> str:
+        if not self.__signing_service:
+            raise JWTException("Cannot generate a JWT without a signing key")
+        return self.__signing_service.generate(
+            payload, headers={**(headers or {}), "kid": self.__signing_kid}
+        )
+
+    def __key_for(self, jwt: str) -> JWTVerificationKey:
+        try:
+            kid = pyjwt.get_unverified_header(jwt).get("kid", self.legacy_kid)
+        except pyjwt.exceptions.PyJWTError:
+            raise JWTException("Invalid JWT")
+
+        key = self.__keys.get(kid) if isinstance(kid, str) else None
+        if key is None:
+            raise JWTException("Unknown JWT key")
+        return key
+
+    def decode(self, jwt: str) -> dict:
+        key = self.__key_for(jwt)
+        if key.is_retired(time.time()):
+            raise JWTException("JWT key retired")
+        return key.decode_service.decode(jwt)
+
+    def key_not_after(self, jwt: str) -> float | None:
+        """
+        When the key that signed the token stops being accepted,
+        so that verifications of it are not cached past that point.
+        """
+        return self.__key_for(jwt).not_after
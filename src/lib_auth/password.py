@@ -1,5 +1,25 @@
+import asyncio
+import hmac
+import multiprocessing
 import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import StrEnum
 from hashlib import scrypt
+from typing import Any, Callable, Tuple, TypeVar
+
+from src.lib_utils.limiter import ConcurrencyLimiter
+
+try:
+    from argon2.low_level import Type as Argon2Type
+    from argon2.low_level import hash_secret_raw
+except ImportError:  # argon2-cffi is optional, only needed for argon2id hashes
+    hash_secret_raw = None
+
+T = TypeVar("T")
+
+ARGON2_SALT_LENGTH = 16
+ARGON2_HASH_LENGTH = 32
 
 
 class InvalidPasswordHashException(Exception):
@@ -10,25 +30,165 @@ class InvalidPasswordException(Exception):
     pass
 
 
-def hash_password(password: str):
+class PasswordHashAlgorithm(StrEnum):
+    SCRYPT = "scrypt"
+    ARGON2ID = "argon2id"
+
+
+@dataclass(frozen=True)
+class ScryptParameters:
+    n: int = 2**14
+    r: int = 8
+    p: int = 1
+
+    @property
+    def algorithm(self) -> PasswordHashAlgorithm:
+        return PasswordHashAlgorithm.SCRYPT
+
+    def format(self) -> str:
+        return f"n={self.n},r={self.r},p={self.p}"
+
+    def memory_bytes(self) -> int:
+        return 128 * self.r * (self.n + self.p + 2)
+
+
+@dataclass(frozen=True)
+class Argon2Parameters:
+    time_cost: int = 3
+    # in KiB
+    memory_cost: int = 64 * 1024
+    parallelism: int = 4
+
+    @property
+    def algorithm(self) -> PasswordHashAlgorithm:
+        return PasswordHashAlgorithm.ARGON2ID
+
+    def format(self) -> str:
+        return f"t={self.time_cost},m={self.memory_cost},p={self.parallelism}"
+
+    def memory_bytes(self) -> int:
+        return self.memory_cost * 1024
+
+
+PasswordHashParameters = ScryptParameters | Argon2Parameters
+
+# hashes from before the parameters were stored, "scrypt/<salt>/<hash>"
+LEGACY_SCRYPT_PARAMETERS = ScryptParameters(n=2**14, r=8, p=1)
+
+_password_hash_parameters: PasswordHashParameters = ScryptParameters()
+
+
+def is_argon2_available() -> bool:
+    return hash_secret_raw is not None
+
+
+def get_password_hash_parameters() -> PasswordHashParameters:
+    return _password_hash_parameters
+
+
+def set_password_hash_parameters(parameters: PasswordHashParameters) -> None:
+    """
+    Sets the parameters of new hashes. Hashes made with other ones still
+    verify, and password_needs_rehash reports them.
+    """
+    global _password_hash_parameters
+
+    if isinstance(parameters, Argon2Parameters) and not is_argon2_available():
+        raise ValueError(
+            "argon2id hashing needs the argon2-cffi package, install the argon2 extra"
+        )
+
+    _password_hash_parameters = parameters
+
+
+def hash_password(password: str, parameters: PasswordHashParameters | None = None):
     if not password:
         raise InvalidPasswordException()
 
-    salt = os.urandom(32)
-    hashed_password = __hash_with_scrypt(
-        password.encode("utf-8", errors="strict"), salt=salt
+    parameters = parameters or _password_hash_parameters
+    salt = os.urandom(
+        32 if isinstance(parameters, ScryptParameters) else ARGON2_SALT_LENGTH
+    )
+    hashed_password = __hash(
+        password.encode("utf-8", errors="strict"), salt, parameters
     )
     return format_hashed_password(
-        algorithm="scrypt", salt=salt, hashed_password=hashed_password
+        parameters=parameters, salt=salt, hashed_password=hashed_password
+    )
+
+
+def __hash(password: bytes, salt: bytes, parameters: PasswordHashParameters) -> bytes:
+    if isinstance(parameters, ScryptParameters):
+        return scrypt(
+            password,
+            salt=salt,
+            n=parameters.n,
+            r=parameters.r,
+            p=parameters.p,
+            # openssl refuses to use more than 32 MiB unless told otherwise
+            maxmem=parameters.memory_bytes(),
+            dklen=64,
+        )
+
+    if hash_secret_raw is None:
+        raise InvalidPasswordHashException("argon2id needs the argon2-cffi package")
+
+    return hash_secret_raw(
+        password,
+        salt,
+        time_cost=parameters.time_cost,
+        memory_cost=parameters.memory_cost,
+        parallelism=parameters.parallelism,
+        hash_len=ARGON2_HASH_LENGTH,
+        type=Argon2Type.ID,
+    )
+
+
+def format_hashed_password(
+    parameters: PasswordHashParameters, salt: bytes, hashed_password: bytes
+) -> str:
+    return (
+        f"{parameters.algorithm}/{parameters.format()}"
+        f"/{salt.hex()}/{hashed_password.hex()}"
     )
 
 
-def __hash_with_scrypt(password: bytes, salt: bytes) -> bytes:
-    return scrypt(password, salt=salt, n=2**14, r=8, p=1, dklen=64)
+def __parse_parameters(algorithm: str, formatted: str) -> PasswordHashParameters:
+    values = dict(value.split("=", 1) for value in formatted.split(","))
+
+    if algorithm == PasswordHashAlgorithm.SCRYPT:
+        return ScryptParameters(
+            n=int(values["n"]), r=int(values["r"]), p=int(values["p"])
+        )
+
+    if algorithm == PasswordHashAlgorithm.ARGON2ID:
+        return Argon2Parameters(
+            time_cost=int(values["t"]),
+            memory_cost=int(values["m"]),
+            parallelism=int(values["p"]),
+        )
+
+    raise InvalidPasswordHashException()
 
 
-def format_hashed_password(algorithm: str, salt: bytes, hashed_password: bytes) -> str:
-    return f"{algorithm}/{salt.hex()}/{hashed_password.hex()}"
+def __parse_hashed_password(
+    hashed_password: str,
+) -> Tuple[PasswordHashParameters, bytes, bytes]:
+    parts = hashed_password.split("/")
+
+    try:
+        if len(parts) == 3 and parts[0] == PasswordHashAlgorithm.SCRYPT:
+            parameters: PasswordHashParameters = LEGACY_SCRYPT_PARAMETERS
+            salt_hex, hashed_key_hex = parts[1:]
+        elif len(parts) == 4:
+            parameters = __parse_parameters(parts[0], parts[1])
+            salt_hex, hashed_key_hex = parts[2:]
+        else:
+            raise InvalidPasswordHashException()
+
+        return parameters, bytes.fromhex(salt_hex), bytes.fromhex(hashed_key_hex)
+    except (KeyError, ValueError):
+        raise InvalidPasswordHashException()
 
 
 def verify_password(password: str | None, hashed_password: str | None) -> bool:
@@ -38,14 +198,125 @@ def verify_password(password: str | None, hashed_password: str | None) -> bool:
     if not hashed_password:
         raise InvalidPasswordHashException()
 
-    algorithm, salt_hex, hashed_key_hex = hashed_password.split("/")
-
-    if len(salt_hex) != 64 or algorithm != "scrypt" or len(hashed_key_hex) != 128:
-        raise InvalidPasswordHashException()
+    parameters, salt, hashed_key = __parse_hashed_password(hashed_password)
 
-    if __hash_with_scrypt(
-        password.encode("utf-8", errors="strict"), salt=bytes.fromhex(salt_hex)
-    ) == bytes.fromhex(hashed_key_hex):
+    if hmac.compare_digest(
+        __hash(password.encode("utf-8", errors="strict"), salt, parameters),
+        hashed_key,
+    ):
         return True
 
     raise InvalidPasswordException()
+
+
+def password_needs_rehash(hashed_password: str | None) -> bool:
+    """
+    Whether the hash was made with other parameters than new hashes are.
+    """
+    if not hashed_password:
+        return False
+
+    parameters, _, _ = __parse_hashed_password(hashed_password)
+    return parameters != _password_hash_parameters
+
+
+class PasswordHashingBackend(StrEnum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+def make_password_executor(
+    backend: PasswordHashingBackend, max_workers: int
+) -> Executor:
+    if backend == PasswordHashingBackend.PROCESS:
+        # spawned and not forked, a fork would copy the locks of the
+        # server's other threads in whatever state they are in.
+        return ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    # hashlib.scrypt releases the GIL, so hashes run in parallel on these
+    # threads while the event loop keeps serving other requests.
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password")
+
+
+def _warm_up() -> None:
+    hash_password("warm up")
+
+
+async def warm_password_executor(executor: Executor, max_workers: int) -> None:
+    """
+    Runs a hash on each worker, so that worker processes are started
+    before the first login has to wait for them.
+    """
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *(loop.run_in_executor(executor, _warm_up) for _ in range(max_workers))
+    )
+
+
+_password_executor: Executor | None = None
+_password_limiter: ConcurrencyLimiter | None = None
+
+
+def get_password_executor() -> Executor:
+    global _password_executor
+
+    if _password_executor is None:
+        _password_executor = make_password_executor(
+            PasswordHashingBackend.THREAD, max_workers=os.cpu_count() or 1
+        )
+    return _password_executor
+
+
+def set_password_executor(
+    executor: Executor | None,
+    max_pending: int | None = None,
+    max_waiting: int | None = None,
+) -> Executor | None:
+    """
+    Replaces the executor of the async variants, returns the previous one
+    so that the caller can shut it down.
+
+    At most `max_pending` hashes are submitted to the executor at once, the
+    other callers wait outside of it, where a cancellation costs nothing.
+    Past `max_waiting` waiting callers, the async variants raise
+    ConcurrencyLimitExceededError instead of queueing more work.
+    """
+    global _password_executor, _password_limiter
+
+    previous_executor = _password_executor
+    _password_executor = executor
+    _password_limiter = (
+        ConcurrencyLimiter(max_pending, max_waiting=max_waiting)
+        if max_pending
+        else None
+    )
+    return previous_executor
+
+
+def get_password_hashing_stats() -> dict | None:
+    return _password_limiter.stats() if _password_limiter else None
+
+
+async def __run_on_password_executor(fn: Callable[..., T], *args: Any) -> T:
+    # cancelling the awaiting task also cancels the call while it is queued
+    loop = asyncio.get_running_loop()
+    if _password_limiter is None:
+        return await loop.run_in_executor(get_password_executor(), fn, *args)
+
+    async with _password_limiter.hold():
+        return await loop.run_in_executor(get_password_executor(), fn, *args)
+
+
+async def async_hash_password(password: str) -> str:
+    # the parameters are passed along, a worker process has its own defaults
+    return await __run_on_password_executor(
+        hash_password, password, _password_hash_parameters
+    )
+
+
+async def async_verify_password(
+    password: str | None, hashed_password: str | None
+) -> bool:
+    return await __run_on_password_executor(verify_password, password, hashed_password)
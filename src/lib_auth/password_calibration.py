@@ -0,0 +1,296 @@
+"""
+Benchmarks password hashing parameters on the current machine, to pick the
+costliest ones that keep logins within a latency budget.
+
+Each parameter set is hashed by `concurrency` clients at once on a password
+executor with as many workers, as the server does under a login burst.
+The latency of a hash is measured from its submission to its result, so it
+includes the time spent queued behind the other clients.
+
+usage:
+    calibrate-password-hashing [--target-ms 250] [--concurrency <cpus>] ...
+
+e.g.
+    poetry run calibrate-password-hashing --target-ms 100 --concurrency 4 \\
+        --scrypt-n 16384,32768,65536 --scrypt-r 8 --scrypt-p 1
+"""
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from .password import (
+    Argon2Parameters,
+    PasswordHashingBackend,
+    PasswordHashParameters,
+    ScryptParameters,
+    hash_password,
+    is_argon2_available,
+    make_password_executor,
+)
+
+CALIBRATION_PASSWORD = "calibration_password_123_$$%"
+
+DEFAULT_SCRYPT_N = [2**13, 2**14, 2**15, 2**16]
+DEFAULT_SCRYPT_R = [8]
+DEFAULT_SCRYPT_P = [1]
+DEFAULT_ARGON2_TIME_COST = [2, 3]
+# in KiB, 19 MiB is the owasp minimum for argon2id
+DEFAULT_ARGON2_MEMORY_COST = [19 * 1024, 64 * 1024]
+DEFAULT_ARGON2_PARALLELISM = [1]
+
+
+@dataclass
+class CalibrationResult:
+    parameters: PasswordHashParameters
+    concurrency: int
+    latencies_in_seconds: List[float]
+    wall_seconds: float
+
+    @property
+    def p50_ms(self) -> float:
+        return percentile(self.latencies_in_seconds, 50) * 1000
+
+    @property
+    def p99_ms(self) -> float:
+        return percentile(self.latencies_in_seconds, 99) * 1000
+
+    @property
+    def logins_per_second(self) -> float:
+        return len(self.latencies_in_seconds) / self.wall_seconds
+
+    @property
+    def peak_memory_bytes(self) -> int:
+        return self.parameters.memory_bytes() * self.concurrency
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    # nearest rank, with a handful of samples p99 is the slowest one
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+def build_parameter_grid(
+    scrypt_n: Sequence[int] = DEFAULT_SCRYPT_N,
+    scrypt_r: Sequence[int] = DEFAULT_SCRYPT_R,
+    scrypt_p: Sequence[int] = DEFAULT_SCRYPT_P,
+    argon2_time_cost: Sequence[int] = DEFAULT_ARGON2_TIME_COST,
+    argon2_memory_cost: Sequence[int] = DEFAULT_ARGON2_MEMORY_COST,
+    argon2_parallelism: Sequence[int] = DEFAULT_ARGON2_PARALLELISM,
+) -> List[PasswordHashParameters]:
+    grid: List[PasswordHashParameters] = [
+        ScryptParameters(n=n, r=r, p=p)
+        for n in scrypt_n
+        for r in scrypt_r
+        for p in scrypt_p
+    ]
+
+    if is_argon2_available():
+        grid.extend(
+            Argon2Parameters(
+                time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+            )
+            for time_cost in argon2_time_cost
+            for memory_cost in argon2_memory_cost
+            for parallelism in argon2_parallelism
+        )
+
+    return grid
+
+
+def benchmark_parameters(
+    parameters: PasswordHashParameters,
+    concurrency: int,
+    samples: int,
+    backend: PasswordHashingBackend = PasswordHashingBackend.THREAD,
+) -> CalibrationResult:
+    """
+    Runs `samples` hashes, keeping `concurrency` of them in flight.
+    """
+    executor = make_password_executor(backend, concurrency)
+    try:
+        # starts the workers, and the processes of the process backend
+        for future in [
+            executor.submit(hash_password, CALIBRATION_PASSWORD, parameters)
+            for _ in range(concurrency)
+        ]:
+            future.result()
+
+        submitted_at: Dict[Future, float] = {}
+        latencies: List[float] = []
+        start = time.perf_counter()
+
+        def submit() -> None:
+            future = executor.submit(hash_password, CALIBRATION_PASSWORD, parameters)
+            submitted_at[future] = time.perf_counter()
+
+        for _ in range(min(concurrency, samples)):
+            submit()
+
+        while submitted_at:
+            done, _ = wait(submitted_at, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+                latencies.append(time.perf_counter() - submitted_at.pop(future))
+                if len(latencies) + len(submitted_at) < samples:
+                    submit()
+
+        wall_seconds = time.perf_counter() - start
+    finally:
+        executor.shutdown()
+
+    return CalibrationResult(
+        parameters=parameters,
+        concurrency=concurrency,
+        latencies_in_seconds=latencies,
+        wall_seconds=wall_seconds,
+    )
+
+
+def recommend(
+    results: Sequence[CalibrationResult], target_p99_ms: float
+) -> CalibrationResult | None:
+    """
+    The costliest parameters whose p99 fits the target, the time an attacker
+    spends per guess grows with the time a hash takes here.
+    """
+    within_target = [result for result in results if result.p99_ms <= target_p99_ms]
+    if not within_target:
+        return None
+
+    return max(
+        within_target,
+        key=lambda result: (result.p50_ms, result.parameters.memory_bytes()),
+    )
+
+
+def format_config(parameters: PasswordHashParameters) -> str:
+    if isinstance(parameters, ScryptParameters):
+        return (
+            "password_hashing:\n"
+            "  algorithm: scrypt\n"
+            "  scrypt:\n"
+            f"    n: {parameters.n}\n"
+            f"    r: {parameters.r}\n"
+            f"    p: {parameters.p}"
+        )
+
+    return (
+        "password_hashing:\n"
+        "  algorithm: argon2id\n"
+        "  argon2:\n"
+        f"    time_cost: {parameters.time_cost}\n"
+        f"    memory_cost: {parameters.memory_cost}\n"
+        f"    parallelism: {parameters.parallelism}"
+    )
+
+
+def format_result(result: CalibrationResult) -> str:
+    parameters = result.parameters
+    return (
+        f"{parameters.algorithm:<9} {parameters.format():<22} "
+        f"{result.p50_ms:>9.1f} {result.p99_ms:>9.1f} "
+        f"{parameters.memory_bytes() / 2**20:>9.1f} "
+        f"{result.peak_memory_bytes / 2**20:>10.1f} "
+        f"{result.logins_per_second:>10.1f}"
+    )
+
+
+def __int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="calibrate-password-hashing",
+        description="Recommends password hashing parameters for a p99 latency target.",
+    )
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=250,
+        help="p99 latency budget of a hash, in milliseconds",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="hashes in flight, use the password hashing max_workers of the server",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=None,
+        help="hashes per parameter set, defaults to 8 per client",
+    )
+    parser.add_argument(
+        "--backend",
+        type=PasswordHashingBackend,
+        choices=list(PasswordHashingBackend),
+        default=PasswordHashingBackend.THREAD,
+    )
+    parser.add_argument("--scrypt-n", type=__int_list, default=DEFAULT_SCRYPT_N)
+    parser.add_argument("--scrypt-r", type=__int_list, default=DEFAULT_SCRYPT_R)
+    parser.add_argument("--scrypt-p", type=__int_list, default=DEFAULT_SCRYPT_P)
+    parser.add_argument(
+        "--argon2-time-cost", type=__int_list, default=DEFAULT_ARGON2_TIME_COST
+    )
+    parser.add_argument(
+        "--argon2-memory-cost",
+        type=__int_list,
+        default=DEFAULT_ARGON2_MEMORY_COST,
+        help="in KiB",
+    )
+    parser.add_argument(
+        "--argon2-parallelism", type=__int_list, default=DEFAULT_ARGON2_PARALLELISM
+    )
+    args = parser.parse_args(argv)
+
+    samples = args.samples or 8 * args.concurrency
+    grid = build_parameter_grid(
+        scrypt_n=args.scrypt_n,
+        scrypt_r=args.scrypt_r,
+        scrypt_p=args.scrypt_p,
+        argon2_time_cost=args.argon2_time_cost,
+        argon2_memory_cost=args.argon2_memory_cost,
+        argon2_parallelism=args.argon2_parallelism,
+    )
+
+    print(
+        f"{samples} hashes per parameter set, {args.concurrency} in flight "
+        f"on the {args.backend} backend"
+    )
+    if not is_argon2_available():
+        print("argon2-cffi is not installed (argon2 extra), argon2id is skipped")
+    print(
+        f"{'algorithm':<9} {'parameters':<22} {'p50 ms':>9} {'p99 ms':>9} "
+        f"{'MiB/hash':>9} {'peak MiB':>10} {'logins/s':>10}"
+    )
+
+    results = []
+    for parameters in grid:
+        result = benchmark_parameters(
+            parameters, args.concurrency, samples, backend=args.backend
+        )
+        results.append(result)
+        print(format_result(result), flush=True)
+
+    recommended = recommend(results, args.target_ms)
+    if recommended is None:
+        print(f"\nno parameters keep the p99 under {args.target_ms:g}ms")
+        return
+
+    print(
+        f"\nrecommended for a p99 under {args.target_ms:g}ms, "
+        f"{recommended.logins_per_second:.1f} logins/s:\n"
+    )
+    print(format_config(recommended.parameters))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+import secrets
+from hashlib import sha256
+
+
+def generate_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(refresh_token: str) -> str:
+    # the token is 256 random bits, a fast hash is enough to keep
+    # a leaked table from yielding usable tokens
+    return sha256(refresh_token.encode("utf-8")).hexdigest()
@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+
+from src.lib_utils.bloom import BloomFilter
+
+
+class TokenRevocationList:
+    """
+    The in-process copy of the revoked token ids, with their expiry.
+
+    A Bloom filter answers for the tokens that were never revoked, which
+    is nearly every request, and the exact set confirms its positives.
+    Entries are pruned once the token they revoke has expired.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        self.__error_rate = error_rate
+        self.__lock = threading.Lock()
+        self.__expires_at_by_jti: Dict[str, float] = {}
+        self.__bloom_filter = BloomFilter(capacity, error_rate)
+
+    def __len__(self) -> int:
+        return len(self.__expires_at_by_jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        if jti not in self.__bloom_filter:
+            return False
+
+        expires_at = self.__expires_at_by_jti.get(jti)
+        return expires_at is not None and time.time() < expires_at
+
+    def add(self, jti: str, expires_at: float) -> None:
+        self.add_all([(jti, expires_at)])
+
+    def add_all(self, entries: Iterable[Tuple[str, float]]) -> None:
+        with self.__lock:
+            for jti, expires_at in entries:
+                self.__expires_at_by_jti[jti] = expires_at
+                self.__bloom_filter.add(jti)
+
+            if len(self.__expires_at_by_jti) > self.__bloom_filter.capacity:
+                self.__rebuild(capacity=2 * len(self.__expires_at_by_jti))
+
+    def prune(self) -> None:
+        now = time.time()
+        with self.__lock:
+            self.__expires_at_by_jti = {
+                jti: expires_at
+                for jti, expires_at in self.__expires_at_by_jti.items()
+                if expires_at > now
+            }
+            # bloom filters cannot forget, the pruned ids go with a new one
+            self.__rebuild(capacity=self.__bloom_filter.capacity)
+
+    def __rebuild(self, capacity: int) -> None:
+        bloom_filter = BloomFilter(
+            max(capacity, len(self.__expires_at_by_jti)), self.__error_rate
+        )
+        for jti in self.__expires_at_by_jti:
+            bloom_filter.add(jti)
+        self.__bloom_filter = bloom_filter
@@ -0,0 +1,87 @@
+from typing import Callable, Dict, List, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from .pool import TimedAsyncAdaptedQueuePool
+
+
+def create_pooled_async_engine(
+    url: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    pool_recycle: int = 1800,
+    pool_pre_ping: bool = True,
+    use_null_pool: bool = False,
+    connect_timeout: float | None = None,
+) -> AsyncEngine:
+    connect_args = {"timeout": connect_timeout} if connect_timeout else {}
+
+    if use_null_pool:
+        # every checkout opens a new connection and every checkin closes it.
+        # useful when the engine is shared across event loops (e.g. in tests).
+        return create_async_engine(url, poolclass=NullPool, connect_args=connect_args)
+
+    return create_async_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+    )
+
+
+class AsyncEngineRegistry:
+    """
+    Holds one engine (and therefore one connection pool) per name
+    for the lifetime of the process.
+    """
+
+    def __init__(self):
+        self.__engines: Dict[str, AsyncEngine] = {}
+        self.__optional: Set[str] = set()
+
+    def get_or_create(
+        self, name: str, factory: Callable[[], AsyncEngine], required: bool = True
+    ) -> AsyncEngine:
+        """
+        `required` is False for engines the app can work without,
+        e.g. read replicas that have a fallback.
+        """
+        engine = self.__engines.get(name)
+        if engine is None:
+            engine = factory()
+            self.__engines[name] = engine
+            if not required:
+                self.__optional.add(name)
+        return engine
+
+    def is_required(self, name: str) -> bool:
+        return name not in self.__optional
+
+    def get(self, name: str) -> AsyncEngine | None:
+        return self.__engines.get(name)
+
+    def items(self) -> List[Tuple[str, AsyncEngine]]:
+        return list(self.__engines.items())
+
+    async def dispose(self, name: str) -> None:
+        engine = self.__engines.pop(name, None)
+        self.__optional.discard(name)
+        if engine is not None:
+            await engine.dispose()
+
+    async def dispose_all(self) -> None:
+        for name in list(self.__engines):
+            await self.dispose(name)
+
+
+_engine_registry = AsyncEngineRegistry()
+
+
+def get_engine_registry() -> AsyncEngineRegistry:
+    return _engine_registry
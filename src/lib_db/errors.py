@@ -0,0 +1,14 @@
+from sqlalchemy.exc import DBAPIError
+
+# https://www.postgresql.org/docs/current/errcodes-appendix.html
+FOREIGN_KEY_VIOLATION = "23503"
+UNIQUE_VIOLATION = "23505"
+
+
+def get_sqlstate(error: DBAPIError) -> str | None:
+    # the adapted driver error carries the sqlstate,
+    # older adapters only expose it on the original asyncpg error.
+    sqlstate = getattr(error.orig, "sqlstate", None)
+    if sqlstate is None:
+        sqlstate = getattr(getattr(error.orig, "__cause__", None), "sqlstate", None)
+    return sqlstate
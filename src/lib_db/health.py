@@ -0,0 +1,108 @@
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .engine import AsyncEngineRegistry
+from .pool import get_pool_stats
+
+
+@dataclass
+class ProbeResult:
+    ok: bool
+    checked_at: float
+    latency_seconds: float | None = None
+    error: str | None = None
+
+
+class CachedDatabaseProbe:
+    """
+    Runs a `SELECT 1` round trip at most once per `ttl_seconds` and serves
+    the cached result in between, so that frequent readiness checks
+    do not compete with requests for pool slots.
+    """
+
+    def __init__(
+        self, engine: AsyncEngine, ttl_seconds: float = 5, timeout_seconds: float = 2
+    ):
+        self.engine = engine
+        self.__ttl_seconds = ttl_seconds
+        self.__timeout_seconds = timeout_seconds
+        self.__lock = asyncio.Lock()
+        self.__result: ProbeResult | None = None
+
+    def __is_fresh(self) -> bool:
+        return (
+            self.__result is not None
+            and time.time() - self.__result.checked_at < self.__ttl_seconds
+        )
+
+    async def check(self) -> ProbeResult:
+        if self.__is_fresh():
+            return self.__result  # type: ignore[return-value]
+
+        async with self.__lock:
+            # another caller may have refreshed the result while we waited
+            if self.__is_fresh():
+                return self.__result  # type: ignore[return-value]
+
+            self.__result = await self.__run()
+            return self.__result
+
+    async def __run(self) -> ProbeResult:
+        start = time.time()
+        try:
+            await asyncio.wait_for(self.__round_trip(), self.__timeout_seconds)
+        except Exception as e:
+            return ProbeResult(ok=False, checked_at=time.time(), error=type(e).__name__)
+
+        now = time.time()
+        return ProbeResult(ok=True, checked_at=now, latency_seconds=now - start)
+
+    async def __round_trip(self) -> None:
+        async with self.engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+
+class EngineHealthMonitor:
+    def __init__(
+        self,
+        registry: AsyncEngineRegistry,
+        probe_ttl_seconds: float = 5,
+        probe_timeout_seconds: float = 2,
+    ):
+        self.__registry = registry
+        self.__probe_ttl_seconds = probe_ttl_seconds
+        self.__probe_timeout_seconds = probe_timeout_seconds
+        self.__probes: Dict[str, CachedDatabaseProbe] = {}
+
+    def __get_probe(self, name: str, engine: AsyncEngine) -> CachedDatabaseProbe:
+        probe = self.__probes.get(name)
+        if probe is None or probe.engine is not engine:
+            probe = CachedDatabaseProbe(
+                engine,
+                ttl_seconds=self.__probe_ttl_seconds,
+                timeout_seconds=self.__probe_timeout_seconds,
+            )
+            self.__probes[name] = probe
+        return probe
+
+    async def readiness_report(self) -> dict:
+        databases = {}
+        for name, engine in self.__registry.items():
+            result = await self.__get_probe(name, engine).check()
+            databases[name] = {
+                "required": self.__registry.is_required(name),
+                "probe": asdict(result),
+                "pool": get_pool_stats(engine.sync_engine.pool),
+            }
+
+        return {
+            "ready": all(
+                db["probe"]["ok"] for db in databases.values() if db["required"]
+            ),
+            "databases": databases,
+        }
@@ -0,0 +1,50 @@
+import time
+from typing import Any
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from src.lib_utils.metrics import Histogram
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    An AsyncAdaptedQueuePool that records how long every checkout takes,
+    including the time spent waiting for a free connection, the pre-ping
+    and, when the pool grows, the time to open a new connection.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait_seconds = Histogram()
+
+    def connect(self):  # type: ignore[no-untyped-def]
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.checkout_wait_seconds.observe(time.perf_counter() - start)
+
+    def recreate(self) -> QueuePool:
+        # keep the history across engine.dispose(), which recreates the pool.
+        pool = super().recreate()
+        pool.checkout_wait_seconds = self.checkout_wait_seconds  # type: ignore[attr-defined]
+        return pool
+
+
+def get_pool_stats(pool: Pool) -> dict:
+    if not isinstance(pool, QueuePool):
+        return {"pool_class": type(pool).__name__}
+
+    stats = {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # the pool reports a negative overflow until it has opened pool_size connections
+        "overflow": max(pool.overflow(), 0),
+    }
+
+    if isinstance(pool, TimedAsyncAdaptedQueuePool):
+        stats["checkout_wait_seconds"] = pool.checkout_wait_seconds.as_dict()
+
+    return stats
@@ -0,0 +1,64 @@
+import asyncio
+import time
+from itertools import count
+from typing import Callable, Dict, List
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+# errors raised while opening a connection that mean the replica
+# cannot be reached, as opposed to the pool being exhausted.
+REPLICA_CONNECTION_ERRORS = (OSError, DBAPIError, asyncio.TimeoutError)
+
+
+class ReplicaRouter:
+    """
+    Spreads reads across replicas in round robin order.
+    A replica that failed is skipped until its cooldown has elapsed.
+    """
+
+    def __init__(self, replica_names: List[str], cooldown_seconds: float = 30):
+        self.__replica_names = list(replica_names)
+        self.__cooldown_seconds = cooldown_seconds
+        self.__unhealthy_until: Dict[str, float] = {}
+        self.__counter = count()
+
+    @property
+    def replica_names(self) -> List[str]:
+        return list(self.__replica_names)
+
+    def candidates(self) -> List[str]:
+        if not self.__replica_names:
+            return []
+
+        now = time.monotonic()
+        start = next(self.__counter) % len(self.__replica_names)
+        rotated = self.__replica_names[start:] + self.__replica_names[:start]
+
+        return [name for name in rotated if self.__unhealthy_until.get(name, 0) <= now]
+
+    def mark_unhealthy(self, replica_name: str) -> None:
+        self.__unhealthy_until[replica_name] = (
+            time.monotonic() + self.__cooldown_seconds
+        )
+
+
+async def open_replica_session(
+    router: ReplicaRouter, get_engine: Callable[[str], AsyncEngine]
+) -> AsyncSession | None:
+    """
+    Returns a session that is already connected to the first reachable replica,
+    or None when no replica is configured or reachable.
+    """
+    for replica_name in router.candidates():
+        session = AsyncSession(bind=get_engine(replica_name), expire_on_commit=False)
+        try:
+            await session.connection()
+        except REPLICA_CONNECTION_ERRORS:
+            await session.close()
+            router.mark_unhealthy(replica_name)
+            continue
+
+        return session
+
+    return None
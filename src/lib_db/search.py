@@ -0,0 +1,19 @@
+LIKE_ESCAPE_CHARACTER = "\\"
+
+
+def contains_pattern(term: str) -> str:
+    """
+    Builds a LIKE pattern matching values that contain `term`.
+    Wildcards in the term are escaped so they match literally.
+
+    Use it with a single bound parameter, e.g.
+    `column.ilike(contains_pattern(term), escape=LIKE_ESCAPE_CHARACTER)`,
+    so the planner sees the whole pattern and can use a trigram index.
+    Terms shorter than 3 characters have no trigrams and cannot use one.
+    """
+    escaped = (
+        term.replace(LIKE_ESCAPE_CHARACTER, LIKE_ESCAPE_CHARACTER * 2)
+        .replace("%", f"{LIKE_ESCAPE_CHARACTER}%")
+        .replace("_", f"{LIKE_ESCAPE_CHARACTER}_")
+    )
+    return f"%{escaped}%"
@@ -1,15 +1,13 @@
-from typing import Annotated, List
+from typing import Annotated, Callable, List
 
 from fastapi import Depends, HTTPException
 from fastapi.params import Cookie, Header
 
 from src.lib_auth.api_key_checker import APIEndpoint, APIKeyChecker, APIKeyConfig
-from src.lib_auth.jwt import (
-    JWTClaim,
-    JWTDecodeService,
-    JWTException,
-    decode_and_verify_jwt_token,
-)
+from src.lib_auth.claim_cache import VerifiedClaimCache
+from src.lib_auth.introspection import TokenVerifier
+from src.lib_auth.jwt import JWTClaim, JWTDecodeService, JWTException
+from src.lib_auth.revocation import TokenRevocationList
 
 
 def make_api_key_checker(config: APIKeyConfig, app: str, method: str, endpoint: str):
@@ -57,7 +55,17 @@ def build_claim_authenticator(
     jwt_decode_service: JWTDecodeService,
     with_user_role_in: List[str] | None = None,
     with_organization_role: str | None = None,
+    claim_cache: VerifiedClaimCache | None = None,
+    key_not_after: Callable[[str], float | None] | None = None,
+    revocation_list: TokenRevocationList | None = None,
 ):
+    token_verifier = TokenVerifier(
+        jwt_decode_service,
+        claim_cache=claim_cache,
+        key_not_after=key_not_after,
+        revocation_list=revocation_list,
+    )
+
     def get_verified_claim(
         jwt_access_token: Annotated[str | None, Depends(get_authorization_token)],
     ) -> JWTClaim:
@@ -65,9 +73,7 @@ def build_claim_authenticator(
             raise HTTPException(status_code=401, detail="Not Authorized")
 
         try:
-            jwt_claim = decode_and_verify_jwt_token(
-                jwt_access_token, jwt_decode_service
-            )
+            jwt_claim = token_verifier.verify(jwt_access_token)
         except JWTException:
             raise HTTPException(status_code=401, detail="Not Authorized")
 
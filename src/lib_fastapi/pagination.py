@@ -0,0 +1,55 @@
+from typing import Annotated, Protocol, Sequence
+
+from fastapi import HTTPException, Query, Response
+
+from src.lib_utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursorError,
+    KeysetCursor,
+    decode_cursor,
+    encode_cursor,
+)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class KeysetPageable(Protocol):
+    created_at: object
+    id: object
+
+
+def get_page_size(
+    limit: Annotated[int | None, Query(ge=1, le=MAX_PAGE_SIZE)] = None,
+) -> int:
+    return limit or DEFAULT_PAGE_SIZE
+
+
+def get_keyset_cursor(
+    cursor: str | None = None, offset: int | None = None
+) -> KeysetCursor | None:
+    if not cursor:
+        return None
+
+    if offset:
+        raise HTTPException(
+            status_code=400, detail="cursor and offset cannot be used together"
+        )
+
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor_header(
+    response: Response, page: Sequence[KeysetPageable], page_size: int
+) -> None:
+    # a short page is the last one
+    if len(page) < page_size:
+        return
+
+    last = page[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+        KeysetCursor(created_at=last.created_at, id=last.id)  # type: ignore[arg-type]
+    )
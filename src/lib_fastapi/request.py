@@ -1,6 +1,13 @@
-from typing import Any, Dict
+import asyncio
+from ipaddress import IPv4Network, IPv6Network, ip_address
+from typing import Any, Awaitable, Dict, Sequence, TypeVar
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+
+T = TypeVar("T")
+
+# nginx's status for requests whose client went away before the response
+CLIENT_CLOSED_REQUEST = 499
 
 
 def raise_if_not_defined_values(args: Dict[str, Any]):
@@ -9,3 +16,68 @@ def raise_if_not_defined_values(args: Dict[str, Any]):
     if len(missing_values):
         missing_values_str = ", ".join(args)
         raise HTTPException(401, f"Missing mandatory values: {missing_values_str}")
+
+
+async def __wait_for_disconnect(request: Request) -> None:
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    Awaits `awaitable`, unless the client disconnects first. It is then
+    cancelled and a 499 raised, so that no more work is spent on a response
+    nobody reads.
+
+    The request body must have been read already, e.g. by a body parameter.
+    """
+    task = asyncio.ensure_future(awaitable)
+    disconnect = asyncio.ensure_future(__wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait(
+            {task, disconnect}, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        disconnect.cancel()
+        if not task.done():
+            task.cancel()
+
+    if task not in done:
+        raise HTTPException(CLIENT_CLOSED_REQUEST, "Client closed request")
+    return task.result()
+
+
+def __is_trusted(
+    host: str, trusted_proxies: Sequence[IPv4Network | IPv6Network]
+) -> bool:
+    try:
+        address = ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in trusted_proxies)
+
+
+def get_client_ip(
+    request: Request, trusted_proxies: Sequence[IPv4Network | IPv6Network] = ()
+) -> str | None:
+    """
+    The address of the client, read from X-Forwarded-For when the request
+    comes from one of the `trusted_proxies`.
+
+    The header is read from the right, as each proxy appends the address it
+    got the request from: the first address that is not a trusted proxy is
+    the client. The addresses left of it are whatever the client sent.
+    """
+    host = request.client.host if request.client else None
+    if host is None or not __is_trusted(host, trusted_proxies):
+        return host
+
+    forwarded_for = ",".join(request.headers.getlist("x-forwarded-for"))
+    for forwarded_host in reversed(forwarded_for.split(",")):
+        forwarded_host = forwarded_host.strip()
+        if not forwarded_host:
+            continue
+        host = forwarded_host
+        if not __is_trusted(host, trusted_proxies):
+            break
+    return host
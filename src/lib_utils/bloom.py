@@ -0,0 +1,39 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    A set of strings that answers membership with no false negatives and
+    a false positive rate of about `error_rate` up to `capacity` items.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.__size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.__hash_count = max(1, round(self.__size / capacity * math.log(2)))
+        self.__bits = bytearray((self.__size + 7) // 8)
+
+    def __positions(self, item: str):
+        # double hashing, h1 + i * h2, from one 128 bits digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.__hash_count):
+            yield (h1 + i * h2) % self.__size
+
+    def add(self, item: str) -> None:
+        for position in self.__positions(item):
+            self.__bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.__bits[position >> 3] & (1 << (position & 7))
+            for position in self.__positions(item)
+        )
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Tuple
+
+from .metrics import Histogram
+
+
+class ConcurrencyLimitExceededError(Exception):
+    pass
+
+
+class ConcurrencyLimiter:
+    """
+    Lets at most `max_concurrency` holders in at once, the others wait
+    in FIFO order. When `max_waiting` callers wait already, further ones
+    are turned away with ConcurrencyLimitExceededError.
+
+    Unlike asyncio.Semaphore it is not bound to one event loop, so a
+    process-wide limiter can be shared by the event loops of every thread.
+    """
+
+    def __init__(self, max_concurrency: int, max_waiting: int | None = None):
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+
+        self.__max_concurrency = max_concurrency
+        self.__max_waiting = max_waiting
+        self.__lock = threading.Lock()
+        self.__in_flight = 0
+        self.__waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = (
+            deque()
+        )
+
+        self.rejections = 0
+        self.wait_seconds = Histogram()
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.__max_concurrency
+
+    @property
+    def in_flight(self) -> int:
+        return self.__in_flight
+
+    @property
+    def waiting(self) -> int:
+        return len(self.__waiters)
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self.__lock:
+            if self.__in_flight < self.__max_concurrency and not self.__waiters:
+                self.__in_flight += 1
+                self.wait_seconds.observe(0)
+                return
+
+            if (
+                self.__max_waiting is not None
+                and len(self.__waiters) >= self.__max_waiting
+            ):
+                self.rejections += 1
+                raise ConcurrencyLimitExceededError(
+                    f"{self.__in_flight} running and {len(self.__waiters)} waiting"
+                )
+
+            waiter = loop.create_future()
+            self.__waiters.append((loop, waiter))
+
+        start = time.perf_counter()
+        try:
+            await waiter
+            with self.__lock:
+                self.wait_seconds.observe(time.perf_counter() - start)
+        except asyncio.CancelledError:
+            with self.__lock:
+                try:
+                    self.__waiters.remove((loop, waiter))
+                    was_waiting = True
+                except ValueError:
+                    was_waiting = False
+
+            # the slot was handed over just before the cancellation
+            if not was_waiting and waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self.__lock:
+            while self.__waiters:
+                loop, waiter = self.__waiters.popleft()
+                # the slot goes to the waiter as is, in_flight does not change
+                try:
+                    loop.call_soon_threadsafe(self.__hand_over, waiter)
+                except RuntimeError:
+                    # the loop of the waiter is closed, nobody awaits it
+                    continue
+                return
+
+            self.__in_flight -= 1
+
+    def __hand_over(self, waiter: asyncio.Future) -> None:
+        if waiter.cancelled():
+            self.release()
+        else:
+            waiter.set_result(None)
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "in_flight": self.__in_flight,
+                "waiting": len(self.__waiters),
+                "max_concurrency": self.__max_concurrency,
+                "max_waiting": self.__max_waiting,
+                "rejections": self.rejections,
+                "wait_seconds": self.wait_seconds.as_dict(),
+            }
+
+    @asynccontextmanager
+    async def hold(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
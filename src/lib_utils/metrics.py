@@ -0,0 +1,57 @@
+from bisect import bisect_left
+from typing import List, Sequence
+
+DEFAULT_LATENCY_BUCKETS_IN_SECONDS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """
+    A cumulative histogram with fixed upper bounds,
+    in the style of prometheus histograms.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_IN_SECONDS):
+        if not buckets or list(buckets) != sorted(buckets):
+            raise ValueError("buckets must be a non-empty, sorted sequence")
+
+        self.__buckets = list(buckets)
+        # the last counter is for values above the highest bucket
+        self.__counts: List[int] = [0] * (len(self.__buckets) + 1)
+        self.__count = 0
+        self.__sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.__counts[bisect_left(self.__buckets, value)] += 1
+        self.__count += 1
+        self.__sum += value
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def sum(self) -> float:
+        return self.__sum
+
+    def as_dict(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for upper_bound, count in zip(self.__buckets, self.__counts):
+            cumulative += count
+            buckets[str(upper_bound)] = cumulative
+        buckets["+Inf"] = self.__count
+
+        return {"count": self.__count, "sum": self.__sum, "buckets": buckets}
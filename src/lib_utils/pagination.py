@@ -0,0 +1,36 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class KeysetCursor:
+    """
+    Position of the last row of a page, ordered by (created_at, id).
+    The id breaks ties between rows created at the same time.
+    """
+
+    created_at: datetime
+    id: str
+
+
+def encode_cursor(cursor: KeysetCursor) -> str:
+    raw = json.dumps([cursor.created_at.isoformat(), cursor.id], separators=(",", ":"))
+    return urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(value: str) -> KeysetCursor:
+    try:
+        padding = "=" * (-len(value) % 4)
+        created_at, id = json.loads(urlsafe_b64decode(value + padding))
+        return KeysetCursor(created_at=datetime.fromisoformat(created_at), id=str(id))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
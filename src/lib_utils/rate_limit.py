@@ -0,0 +1,164 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Protocol, Sequence, Tuple
+
+
+class RateLimitExceededError(Exception):
+    def __init__(self, key: str, retry_after_seconds: float):
+        super().__init__(f"Rate limit exceeded for {key}")
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    limit: int
+    window_seconds: float
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, key: str, rate_limit: RateLimit) -> float | None:
+        """
+        Counts an attempt for the key, unless the limit is reached already.
+        Returns None when it was counted, otherwise the seconds to wait until
+        an attempt would be.
+        """
+        ...
+
+    def stats(self) -> dict: ...
+
+
+@dataclass
+class _Window:
+    window_seconds: float
+    # the current fixed window, windows are aligned on the clock
+    index: int
+    count: int = 0
+    previous_count: int = 0
+
+    @property
+    def start(self) -> float:
+        return self.index * self.window_seconds
+
+
+def _roll(window: _Window, index: int) -> None:
+    if window.index == index:
+        return
+
+    window.previous_count = window.count if window.index == index - 1 else 0
+    window.count = 0
+    window.index = index
+
+
+def _retry_after(window: _Window, limit: int, now: float) -> float:
+    # until the weighted count of the previous window decays below the limit,
+    # in the next window if the current one is full on its own.
+    if window.count < limit:
+        remaining = (limit - window.count) / window.previous_count
+        return window.start + window.window_seconds * (1 - remaining) - now
+
+    remaining = limit / window.count
+    return window.start + window.window_seconds * (2 - remaining) - now
+
+
+class InMemoryRateLimitBackend:
+    """
+    Sliding window counters of a single process.
+
+    Each key keeps the counts of the current and the previous fixed window,
+    and the previous one is weighted by how much of it still overlaps the
+    sliding window. That is two integers per key, whatever the limit.
+
+    Keys are kept in least recently hit order: a hit drops the stale keys at
+    the front, and beyond `max_keys` the least recently hit key is dropped
+    even though it still counts.
+    """
+
+    def __init__(
+        self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic
+    ):
+        if max_keys <= 0:
+            raise ValueError("max_keys must be positive")
+
+        self.__max_keys = max_keys
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__windows: OrderedDict[str, _Window] = OrderedDict()
+
+        self.expirations = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.__windows)
+
+    async def hit(self, key: str, rate_limit: RateLimit) -> float | None:
+        now = self.__clock()
+        index = math.floor(now / rate_limit.window_seconds)
+
+        with self.__lock:
+            window = self.__windows.get(key)
+            if window is None:
+                window = _Window(rate_limit.window_seconds, index)
+                self.__windows[key] = window
+            else:
+                self.__windows.move_to_end(key)
+            _roll(window, index)
+
+            self.__drop_stale_windows(now)
+
+            elapsed = now / rate_limit.window_seconds - index
+            estimate = window.previous_count * (1 - elapsed) + window.count
+            if estimate >= rate_limit.limit:
+                return max(_retry_after(window, rate_limit.limit, now), 0.0)
+
+            window.count += 1
+            return None
+
+    def __drop_stale_windows(self, now: float) -> None:
+        while self.__windows:
+            key, window = next(iter(self.__windows.items()))
+            # both counts are 0 once the window after it is over
+            if now < window.start + 2 * window.window_seconds:
+                break
+            del self.__windows[key]
+            self.expirations += 1
+
+        while len(self.__windows) > self.__max_keys:
+            self.__windows.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "keys": len(self.__windows),
+                "max_keys": self.__max_keys,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
+
+
+class RateLimiter:
+    """
+    Checks attempts against several limits, e.g. per user and per client.
+    Attempts are counted for each limit in order until one is exceeded.
+    """
+
+    def __init__(self, backend: RateLimitBackend):
+        self.__backend = backend
+        self.rejections = 0
+
+    async def hit(self, limits: Sequence[Tuple[str, RateLimit]]) -> None:
+        for key, rate_limit in limits:
+            retry_after_seconds = await self.__backend.hit(key, rate_limit)
+            if retry_after_seconds is not None:
+                self.rejections += 1
+                raise RateLimitExceededError(key, retry_after_seconds)
+
+    def stats(self) -> dict:
+        return {"rejections": self.rejections, **self.__backend.stats()}
+
+
+def retry_after_header(retry_after_seconds: float) -> str:
+    return str(max(math.ceil(retry_after_seconds), 1))
@@ -1,22 +1,39 @@
 import sys
+from contextlib import AsyncExitStack, asynccontextmanager
 from dataclasses import dataclass
-from typing import Callable, List
+from typing import AsyncIterator, List
 
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from loguru import logger
 
 from .apps.auth.app import app as auth_app
+from .apps.auth.dependencies import get_login_rate_limiter, get_verified_claim_cache
 from .config import Config, get_config
+from .lib_auth.password import get_password_hashing_stats
+from .lib_db.engine import get_engine_registry
+from .lib_db.health import EngineHealthMonitor
 
 # Setup Logging
 logger.configure(
     handlers=[{"sink": sys.stderr, "level": get_config().server.log_level}]
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # starlette does not forward lifespan events to mounted applications,
+    # so the lifespan of every mounted app is entered here.
+    async with AsyncExitStack() as stack:
+        for atm in APPS_TO_MOUNT:
+            await stack.enter_async_context(atm.app.router.lifespan_context(atm.app))
+        yield
+
+
 # Setup FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 origins = (
     get_config().server.allowed_origins if get_config().server.allowed_origins else []
 )
@@ -32,7 +49,7 @@ app.add_middleware(
 @dataclass
 class AppMount:
     mount_path: str
-    app: Callable
+    app: FastAPI
 
 
 APPS_TO_MOUNT: List[AppMount] = [
@@ -42,11 +59,49 @@ for atm in APPS_TO_MOUNT:
     app.mount(atm.mount_path, app=atm.app)
 
 
+health_monitor = EngineHealthMonitor(
+    get_engine_registry(),
+    probe_ttl_seconds=get_config().health.database_probe_ttl_seconds,
+    probe_timeout_seconds=get_config().health.database_probe_timeout_seconds,
+)
+
+
 @app.get("/")
 async def ping(request: Request) -> dict:
     return {"data": "ok"}
 
 
+@app.get("/health/live")
+async def liveness() -> dict:
+    # never touch the database here, orchestrator probes
+    # must not consume connection pool slots.
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def readiness() -> JSONResponse:
+    report = await health_monitor.readiness_report()
+    return JSONResponse(
+        status_code=200 if report["ready"] else 503,
+        content=report,
+    )
+
+
+@app.get("/health/metrics")
+async def metrics() -> dict:
+    claim_cache = get_verified_claim_cache()
+    login_rate_limiter = get_login_rate_limiter()
+    return {
+        "auth": {
+            "verified_claim_cache": claim_cache.stats() if claim_cache else None,
+            "password_hashing": get_password_hashing_stats(),
+            "login_rate_limit": (
+                login_rate_limiter.stats() if login_rate_limiter else None
+            ),
+        },
+    }
+
+
 @app.get("/apps")
 async def list_apps() -> dict:
     mounted_apps = [{"app_path": "/", "doc_path": "/docs"}]
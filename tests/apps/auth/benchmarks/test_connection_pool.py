@@ -0,0 +1,122 @@
+import time
+from typing import Callable, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.apps.auth.app import app
+from src.apps.auth.config import get_config
+from src.apps.auth.dependencies import async_sql_engine
+from src.apps.auth.repository.organizations import OrganizationsRepository
+from src.apps.auth.repository.users import UserRepository
+from src.lib_db.engine import create_pooled_async_engine
+from tests.test_utils.user import (
+    NON_PLATFORM_OWNER_EMAIL,
+    NON_PLATFORM_OWNER_PASSWORD,
+    add_platform_user,
+)
+
+REQUESTS = 30
+POOL_SIZE = 2
+
+
+class ConnectCounter:
+    def __init__(self):
+        self.connects = 0
+        self.engines: List[AsyncEngine] = []
+
+    def track(self, engine: AsyncEngine) -> AsyncEngine:
+        def on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        event.listen(engine.sync_engine, "connect", on_connect)
+        self.engines.append(engine)
+        return engine
+
+    def dispose(self):
+        # the event loop that owned the connections is gone by now,
+        # so the pools are dropped without closing them gracefully.
+        for engine in self.engines:
+            engine.sync_engine.dispose(close=False)
+
+
+def run_requests(
+    engine_dependency: Callable[[], AsyncEngine], send_request: Callable
+) -> float:
+    app.dependency_overrides[async_sql_engine] = engine_dependency
+    try:
+        with TestClient(app) as client:
+            start = time.perf_counter()
+            for _ in range(REQUESTS):
+                assert send_request(client).status_code == 200
+            return time.perf_counter() - start
+    finally:
+        app.dependency_overrides.pop(async_sql_engine, None)
+
+
+def login(client: TestClient):
+    return client.post(
+        "/v1/login",
+        json={
+            "username": NON_PLATFORM_OWNER_EMAIL,
+            "password": NON_PLATFORM_OWNER_PASSWORD,
+            "grant_type": "password",
+        },
+    )
+
+
+class TestConnectionPoolBenchmark:
+    def compare(self, send_request: Callable, name: str):
+        url = get_config().database.url
+
+        per_request = ConnectCounter()
+        per_request_seconds = run_requests(
+            lambda: per_request.track(create_async_engine(url)), send_request
+        )
+
+        pooled = ConnectCounter()
+        pooled_engine = pooled.track(
+            create_pooled_async_engine(url, pool_size=POOL_SIZE, max_overflow=0)
+        )
+        pooled_seconds = run_requests(lambda: pooled_engine, send_request)
+
+        per_request.dispose()
+        pooled.dispose()
+
+        print(
+            f"\n{name}: {REQUESTS} requests, "
+            f"per-request engine {per_request_seconds:.3f}s "
+            f"({per_request.connects} connects), "
+            f"pooled engine {pooled_seconds:.3f}s ({pooled.connects} connects)"
+        )
+
+        assert per_request.connects >= REQUESTS
+        assert pooled.connects <= POOL_SIZE
+
+    async def test_me_reuses_pooled_connections(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await add_platform_user(user_repository, organizations_repository)
+        with TestClient(app) as client:
+            access_token = login(client).json()["access_token"]
+
+        self.compare(
+            lambda client: client.get(
+                "/v1/me", headers={"X-Oly-Authorization": f"Bearer {access_token}"}
+            ),
+            "/v1/me",
+        )
+
+    async def test_login_reuses_pooled_connections(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await add_platform_user(user_repository, organizations_repository)
+
+        self.compare(login, "/v1/login")
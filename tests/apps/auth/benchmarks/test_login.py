@@ -0,0 +1,78 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.apps.auth import dependencies
+from src.apps.auth.app import app
+from src.apps.auth.dependencies import build_jwt_signing_service, jwt_signing_service
+from src.apps.auth.models.user import build_new_user
+from src.apps.auth.repository.users import UserRepository
+from src.lib_auth.roles import UserRole
+
+LOGINS = 10
+EMAIL = "login_benchmark@oly.co"
+PASSWORD = "test_password_123_$$%"
+
+client = TestClient(app)
+
+
+def run_logins() -> float:
+    start = time.perf_counter()
+    for _ in range(LOGINS):
+        response = client.post(
+            "/v1/login",
+            json={"username": EMAIL, "password": PASSWORD, "grant_type": "password"},
+        )
+        assert response.status_code == 200
+    return (time.perf_counter() - start) / LOGINS
+
+
+async def add_user(user_repository: UserRepository):
+    user = build_new_user(email=EMAIL, password=PASSWORD, role=UserRole.USER)
+    user.activate()
+    user.confirm(user.confirmation_token)
+    await user_repository.save_user(user)
+
+
+class TestLoginSigningKey:
+    async def test_signing_key_is_loaded_once_across_logins(
+        self, user_repository: UserRepository, monkeypatch
+    ):
+        await add_user(user_repository)
+        jwt_signing_service()
+
+        def build_jwt_signing_service():
+            raise AssertionError("the signing key is loaded again")
+
+        monkeypatch.setattr(
+            dependencies, "build_jwt_signing_service", build_jwt_signing_service
+        )
+        run_logins()
+
+
+@pytest.mark.benchmark
+class TestLoginBenchmark:
+    async def test_shared_signing_key_login_latency(
+        self, user_repository: UserRepository
+    ):
+        await add_user(user_repository)
+
+        # before: the encrypted private key is loaded on every login
+        app.dependency_overrides[jwt_signing_service] = build_jwt_signing_service
+        try:
+            per_login_seconds = run_logins()
+        finally:
+            del app.dependency_overrides[jwt_signing_service]
+
+        jwt_signing_service()
+        shared_seconds = run_logins()
+
+        print(
+            f"\nmean login latency over {LOGINS} logins: "
+            f"key loaded per login {per_login_seconds * 1000:.1f}ms, "
+            f"shared key {shared_seconds * 1000:.1f}ms"
+        )
+
+        assert jwt_signing_service() is jwt_signing_service()
+        assert shared_seconds < per_login_seconds
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, Future
+
+import httpx
+import pytest
+
+from src.apps.auth.app import app
+from src.apps.auth.models.user import build_new_user
+from src.apps.auth.repository.users import UserRepository
+from src.lib_auth.password import (
+    PasswordHashingBackend,
+    make_password_executor,
+    set_password_executor,
+    warm_password_executor,
+)
+from src.lib_auth.roles import UserRole
+
+LOGINS = 24
+EMAIL = "password_backends_benchmark@oly.co"
+PASSWORD = "test_password_123_$$%"
+
+
+class InlineExecutor(Executor):
+    """
+    Runs each call as it is submitted, on the event loop, like the
+    handlers did before hashing moved to an executor.
+    """
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+async def run_logins(executor: Executor, max_workers: int) -> float:
+    previous_executor = set_password_executor(executor, max_pending=2 * max_workers)
+    try:
+        await warm_password_executor(executor, max_workers)
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+        ) as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        "/v1/login",
+                        json={
+                            "username": EMAIL,
+                            "password": PASSWORD,
+                            "grant_type": "password",
+                        },
+                    )
+                    for _ in range(LOGINS)
+                )
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        set_password_executor(previous_executor)
+        executor.shutdown()
+
+    assert all(response.status_code == 200 for response in responses)
+    return LOGINS / elapsed
+
+
+@pytest.mark.benchmark
+class TestPasswordBackendsBenchmark:
+    async def test_logins_per_second_by_backend(self, user_repository: UserRepository):
+        user = build_new_user(email=EMAIL, password=PASSWORD, role=UserRole.USER)
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        max_workers = os.cpu_count() or 1
+        inline_rate = await run_logins(InlineExecutor(), max_workers=1)
+        thread_rate = await run_logins(
+            make_password_executor(PasswordHashingBackend.THREAD, max_workers),
+            max_workers,
+        )
+        process_rate = await run_logins(
+            make_password_executor(PasswordHashingBackend.PROCESS, max_workers),
+            max_workers,
+        )
+
+        print(
+            f"\nlogins/sec over {LOGINS} concurrent logins on {max_workers} cpus: "
+            f"inline {inline_rate:.1f}, thread pool {thread_rate:.1f}, "
+            f"process pool {process_rate:.1f}"
+        )
+
+        # a single core has nothing to run the hashes in parallel on
+        if max_workers > 1:
+            assert thread_rate > inline_rate
+            assert process_rate > inline_rate
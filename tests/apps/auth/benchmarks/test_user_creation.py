@@ -0,0 +1,95 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.apps.auth.config import get_config
+from src.apps.auth.models.user import SensitiveUser, User
+from src.apps.auth.repository.users import SQLUserRepository
+from src.lib_auth.roles import UserRole
+from src.lib_db.engine import create_pooled_async_engine
+
+SIGNUPS = 400
+DISTINCT_EMAILS = 300
+CONCURRENCY = 20
+
+
+def build_user(index: int) -> SensitiveUser:
+    return SensitiveUser(
+        id=uuid4().hex,
+        email=f"signup{index % DISTINCT_EMAILS}@oly.co",
+        first_name="first",
+        last_name="last",
+        hashed_password="a_hashed_password",
+        confirmation_token="a_confirmation_token",
+        role=UserRole.USER,
+    )
+
+
+async def select_then_insert(repository: SQLUserRepository, user: SensitiveUser):
+    if await repository.get_user_by_email(user.email):  # type: ignore[arg-type]
+        return False
+    try:
+        await repository.save_user(user)
+    except IntegrityError:
+        # another signup won the race between the select and the insert
+        return False
+    return True
+
+
+async def insert_on_conflict(repository: SQLUserRepository, user: SensitiveUser):
+    return await repository.create_user_if_absent(user)
+
+
+async def run_signups(
+    make_session: async_sessionmaker[AsyncSession],
+    signup: Callable[[SQLUserRepository, SensitiveUser], Awaitable[bool]],
+) -> tuple[float, int]:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(index: int) -> bool:
+        async with semaphore, make_session() as session:
+            return await signup(SQLUserRepository(session), build_user(index))
+
+    start = time.perf_counter()
+    created = await asyncio.gather(*(one(index) for index in range(SIGNUPS)))
+    return time.perf_counter() - start, sum(created)
+
+
+class TestUserCreationBenchmark:
+    async def test_insert_on_conflict_throughput(self, ensure_clean_db: None):
+        engine = create_pooled_async_engine(
+            get_config().database.url, pool_size=CONCURRENCY, max_overflow=0
+        )
+        make_session = async_sessionmaker(
+            expire_on_commit=False, class_=AsyncSession, bind=engine
+        )
+
+        async def clean():
+            async with make_session() as session:
+                await session.execute(delete(User))
+                await session.commit()
+
+        select_seconds, select_created = await run_signups(
+            make_session, select_then_insert
+        )
+        await clean()
+        conflict_seconds, conflict_created = await run_signups(
+            make_session, insert_on_conflict
+        )
+        await clean()
+        await engine.dispose()
+
+        print(
+            f"\n{SIGNUPS} signups ({DISTINCT_EMAILS} distinct emails, "
+            f"concurrency {CONCURRENCY}): "
+            f"select then insert {SIGNUPS / select_seconds:.0f}/s, "
+            f"insert on conflict {SIGNUPS / conflict_seconds:.0f}/s"
+        )
+
+        assert select_created == DISTINCT_EMAILS
+        assert conflict_created == DISTINCT_EMAILS
@@ -13,10 +13,20 @@ from src.apps.auth.config import get_config
 from src.apps.auth.models.organization import Organization
 from src.apps.auth.models.user import User
 from src.apps.auth.orm.mappers import start_mappers
+from src.apps.auth.orm.refresh_tokens import refresh_tokens_table
+from src.apps.auth.orm.revoked_tokens import revoked_tokens_table
 from src.apps.auth.repository.organizations import (
     OrganizationsRepository,
     SQLOrganizationsRepository,
 )
+from src.apps.auth.repository.refresh_tokens import (
+    RefreshTokensRepository,
+    SQLRefreshTokensRepository,
+)
+from src.apps.auth.repository.revoked_tokens import (
+    RevokedTokensRepository,
+    SQLRevokedTokensRepository,
+)
 from src.apps.auth.repository.users import SQLUserRepository, UserRepository
 
 
@@ -40,8 +50,10 @@ async def async_session(session_maker) -> AsyncGenerator[AsyncSession, None]:
 
 
 async def __cleanup_db(session: AsyncSession):
+    await session.execute(delete(refresh_tokens_table))
     await session.execute(delete(User))
     await session.execute(delete(Organization))
+    await session.execute(delete(revoked_tokens_table))
     await session.commit()
     await session.rollback()
 
@@ -63,3 +75,17 @@ async def organizations_repository(
     async_session: AsyncSession, ensure_clean_db: None
 ) -> OrganizationsRepository:
     return SQLOrganizationsRepository(async_session)
+
+
+@pytest.fixture(scope="function")
+async def revoked_tokens_repository(
+    async_session: AsyncSession, ensure_clean_db: None
+) -> RevokedTokensRepository:
+    return SQLRevokedTokensRepository(async_session)
+
+
+@pytest.fixture(scope="function")
+async def refresh_tokens_repository(
+    async_session: AsyncSession, ensure_clean_db: None
+) -> RefreshTokensRepository:
+    return SQLRefreshTokensRepository(async_session)
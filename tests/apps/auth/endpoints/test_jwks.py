@@ -0,0 +1,81 @@
+import time
+
+import jwt as pyjwt
+from fastapi.testclient import TestClient
+
+from src.apps.auth.app import app
+from src.apps.auth.config import get_config
+from src.apps.auth.dependencies import (
+    get_jwks_document,
+    get_jwt_key_set,
+    jwt_signing_service,
+)
+from src.lib_auth.jwks import JWKSDocument
+from src.lib_auth.jwt import JWTAlgorithm, make_jwt_decode_service
+from src.lib_auth.jwt_keys import JWTKeySet, JWTVerificationKey
+from tests.test_utils.jwt import generate_test_key_pair
+
+client = TestClient(app)
+
+
+class TestJWKS:
+    def test_jwks_lists_the_signing_key(self):
+        jwt_signing_service()
+
+        response = client.get("/.well-known/jwks.json")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["etag"]
+        assert "max-age=" in response.headers["cache-control"]
+        kids = [key["kid"] for key in response.json()["keys"]]
+        assert get_jwt_key_set().signing_kid in kids
+
+    def test_tokens_verify_with_the_published_keys(self):
+        token = jwt_signing_service().generate({"sub": "abc"})
+
+        keys = client.get("/.well-known/jwks.json").json()
+        jwk_set = pyjwt.PyJWKSet.from_dict(keys)
+        signing_key = jwk_set[pyjwt.get_unverified_header(token)["kid"]]
+
+        payload = pyjwt.decode(
+            token, signing_key.key, algorithms=[signing_key.algorithm_name]
+        )
+        assert payload["sub"] == "abc"
+
+    def test_matching_etag_returns_304(self):
+        etag = client.get("/.well-known/jwks.json").headers["etag"]
+
+        response = client.get(
+            "/.well-known/jwks.json", headers={"If-None-Match": f'"other", {etag}'}
+        )
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    def test_stale_etag_returns_document(self):
+        response = client.get(
+            "/.well-known/jwks.json", headers={"If-None-Match": '"stale"'}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["keys"]
+
+    def test_max_age_ends_when_a_published_key_retires(self):
+        _, public_key_pem = generate_test_key_pair(JWTAlgorithm.EDDSA, "a_password")
+        retiring_key = JWTVerificationKey(
+            kid="retiring",
+            decode_service=make_jwt_decode_service(JWTAlgorithm.EDDSA, public_key_pem),
+            not_after=time.time() + 30.5,
+        )
+        document = JWKSDocument(JWTKeySet([retiring_key]))
+        assert get_config().jwks_max_age_seconds > 30
+
+        app.dependency_overrides[get_jwks_document] = lambda: document
+        try:
+            response = client.get("/.well-known/jwks.json")
+        finally:
+            del app.dependency_overrides[get_jwks_document]
+
+        assert response.headers["cache-control"] == "public, max-age=30"
@@ -1,18 +1,42 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ipaddress import ip_network
+
+import httpx
+import jwt as pyjwt
+import pytest
 from fastapi.testclient import TestClient
 
 from src.apps.auth.app import app
 from src.apps.auth.config import AuthDomainConfig, get_config
+from src.apps.auth.dependencies import get_jwt_key_set, get_login_rate_limiter
 from src.apps.auth.endpoints.login import get_cookie_domain
 from src.apps.auth.models.organization import Organization
 from src.apps.auth.models.user import SensitiveUser, build_new_user
 from src.apps.auth.repository.organizations import OrganizationsRepository
-from src.apps.auth.repository.users import UserRepository
+from src.apps.auth.repository.revoked_tokens import RevokedTokensRepository
+from src.apps.auth.repository.users import SQLUserRepository, UserRepository
+from src.lib_auth import password as password_module
 from src.lib_auth.jwt import (
     JWTClaim,
-    RSA256JWTDecodeService,
     decode_and_verify_jwt_token,
+    make_jwt_decode_service,
+)
+from src.lib_auth.password import (
+    ScryptParameters,
+    get_password_hash_parameters,
+    get_password_hashing_stats,
+    hash_password,
+    password_needs_rehash,
+    set_password_executor,
+    verify_password,
 )
 from src.lib_auth.roles import OrganizationRole, UserRole
+from src.lib_utils.rate_limit import InMemoryRateLimitBackend, RateLimiter
+from src.main import app as main_app
 
 
 class TestGetCookieDomain:
@@ -105,8 +129,9 @@ class TestLogin:
 
     def is_valid_token(self, token: str) -> bool:
         try:
-            RSA256JWTDecodeService(
-                public_key_pem=get_config().public_key.key  # type: ignore
+            make_jwt_decode_service(
+                get_config().jwt_algorithm,
+                public_key_pem=get_config().public_key.key,  # type: ignore
             ).decode(token)
         except Exception:
             return False
@@ -115,8 +140,9 @@ class TestLogin:
     def get_jwt_claim(self, jwt: str) -> JWTClaim:
         return decode_and_verify_jwt_token(
             jwt,
-            RSA256JWTDecodeService(
-                public_key_pem=get_config().public_key.key  # type: ignore
+            make_jwt_decode_service(
+                get_config().jwt_algorithm,
+                public_key_pem=get_config().public_key.key,  # type: ignore
             ),
         )
 
@@ -157,6 +183,59 @@ class TestLogin:
         assert custom_claims.impersonator_organization_id is None
         assert custom_claims.impersonator_organization_role is None
 
+    async def test_login_token_carries_signing_kid(
+        self, user_repository: UserRepository, ensure_clean_db: None
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        response = self.get_client().post(
+            "/v1/login",
+            json={"username": email, "password": password, "grant_type": "password"},
+        )
+
+        assert response.status_code == 200
+        header = pyjwt.get_unverified_header(response.json()["access_token"])
+        assert header["kid"] == get_jwt_key_set().signing_kid
+
+    async def test_login_with_compact_claims(
+        self, user_repository: UserRepository, ensure_clean_db: None, monkeypatch
+    ):
+        monkeypatch.setattr(get_config(), "compact_claims", True)
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        client = self.get_client()
+        response = client.post(
+            "/v1/login",
+            json={"username": email, "password": password, "grant_type": "password"},
+        )
+
+        assert response.status_code == 200
+        token = response.json()["access_token"]
+        assert pyjwt.decode(token, options={"verify_signature": False})["v"] == 2
+        assert self.get_jwt_claim(token).custom_claims.user_id == user.id
+
+        me_response = client.get(
+            "/v1/me", headers={"X-Oly-Authorization": f"Bearer {token}"}
+        )
+        assert me_response.status_code == 200
+        assert me_response.json()["id"] == user.id
+
     async def test_login_for_user_with_organization(
         self,
         user_repository: UserRepository,
@@ -292,6 +371,279 @@ class TestLogin:
         assert response.json() == {"status": "ok"}
         assert "jwt_access_token" not in response.cookies
 
+    async def test_logout_revokes_token(
+        self,
+        user_repository: UserRepository,
+        revoked_tokens_repository: RevokedTokensRepository,
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        client = self.get_client()
+        access_token = client.post(
+            "/v1/login",
+            json={"username": email, "password": password, "grant_type": "password"},
+        ).json()["access_token"]
+        headers = {"X-Oly-Authorization": f"Bearer {access_token}"}
+        assert client.get("/v1/me", headers=headers).status_code == 200
+
+        response = client.post("/v1/logout", headers=headers)
+
+        assert response.status_code == 200
+        assert client.get("/v1/me", headers=headers).status_code == 401
+        revocations = await revoked_tokens_repository.get_revocations()
+        assert [jti for jti, _, _ in revocations] == [
+            self.get_jwt_claim(access_token).jti
+        ]
+
+    async def test_logout_revokes_the_refresh_token_family(
+        self, user_repository: UserRepository, ensure_clean_db: None
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        client = self.get_client()
+        tokens = client.post(
+            "/v1/login",
+            json={"username": email, "password": password, "grant_type": "password"},
+        ).json()
+        refreshed_tokens = client.post(
+            "/v1/login",
+            json={
+                "grant_type": "refresh_token",
+                "refresh_token": tokens["refresh_token"],
+            },
+        ).json()
+
+        response = client.post(
+            "/v1/logout",
+            headers={
+                "X-Oly-Authorization": f"Bearer {refreshed_tokens['access_token']}"
+            },
+            json={"refresh_token": refreshed_tokens["refresh_token"]},
+        )
+
+        assert response.status_code == 200
+        response = client.post(
+            "/v1/login",
+            json={
+                "grant_type": "refresh_token",
+                "refresh_token": refreshed_tokens["refresh_token"],
+            },
+        )
+        assert response.status_code == 401
+
+    async def test_login_issues_refresh_token_with_short_lived_access_token(
+        self, user_repository: UserRepository, ensure_clean_db: None
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        response = self.get_client().post(
+            "/v1/login",
+            json={"username": email, "password": password, "grant_type": "password"},
+        )
+
+        assert response.status_code == 200
+        expires_in = get_config().refresh_tokens.access_token_expire_seconds
+        assert response.json()["expires_in"] == expires_in
+        assert response.json()["refresh_token"]
+        jwt_claim = self.get_jwt_claim(response.json()["access_token"])
+        assert jwt_claim.exp - jwt_claim.iat == expires_in
+
+    async def test_login_rehashes_an_outdated_password_hash(
+        self, user_repository: UserRepository, session_maker
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.hashed_password = hash_password(
+            password, ScryptParameters(n=2**10, r=8, p=1)
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        response = self.get_client().post(
+            "/v1/login",
+            json={"username": email, "password": password, "grant_type": "password"},
+        )
+
+        assert response.status_code == 200
+        # the test client returns once the background tasks have run
+        async with session_maker() as session:
+            rehashed_user = await SQLUserRepository(session).get_sensitive_user_by_id(
+                user.id  # type: ignore
+            )
+        hashed_password = rehashed_user.hashed_password  # type: ignore
+        assert hashed_password.startswith(
+            f"scrypt/{get_password_hash_parameters().format()}/"
+        )
+        assert not password_needs_rehash(hashed_password)
+        assert verify_password(password, hashed_password)
+
+    async def test_refresh_token_grant_rotates_the_refresh_token(
+        self, user_repository: UserRepository, ensure_clean_db: None
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        client = self.get_client()
+        refresh_token = client.post(
+            "/v1/login",
+            json={"username": email, "password": password, "grant_type": "password"},
+        ).json()["refresh_token"]
+
+        response = client.post(
+            "/v1/login",
+            json={"grant_type": "refresh_token", "refresh_token": refresh_token},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["token_type"] == "bearer"
+        assert response.json()["refresh_token"] != refresh_token
+        assert self.get_jwt_claim(response.json()["access_token"]).sub == user.id
+
+        rotated_response = client.post(
+            "/v1/login",
+            json={
+                "grant_type": "refresh_token",
+                "refresh_token": response.json()["refresh_token"],
+            },
+        )
+        assert rotated_response.status_code == 200
+
+    async def test_refresh_token_reuse_revokes_the_family(
+        self, user_repository: UserRepository, ensure_clean_db: None
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        client = self.get_client()
+        refresh_token = client.post(
+            "/v1/login",
+            json={"username": email, "password": password, "grant_type": "password"},
+        ).json()["refresh_token"]
+        rotated_refresh_token = client.post(
+            "/v1/login",
+            json={"grant_type": "refresh_token", "refresh_token": refresh_token},
+        ).json()["refresh_token"]
+
+        reuse_response = client.post(
+            "/v1/login",
+            json={"grant_type": "refresh_token", "refresh_token": refresh_token},
+        )
+        assert reuse_response.status_code == 401
+
+        response = client.post(
+            "/v1/login",
+            json={
+                "grant_type": "refresh_token",
+                "refresh_token": rotated_refresh_token,
+            },
+        )
+        assert response.status_code == 401
+
+    async def test_refresh_token_grant_for_deactivated_user_fails(
+        self, user_repository: UserRepository, ensure_clean_db: None
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        client = self.get_client()
+        refresh_token = client.post(
+            "/v1/login",
+            json={"username": email, "password": password, "grant_type": "password"},
+        ).json()["refresh_token"]
+
+        user.deactivate()
+        await user_repository.save_user(user)
+
+        response = client.post(
+            "/v1/login",
+            json={"grant_type": "refresh_token", "refresh_token": refresh_token},
+        )
+        assert response.status_code == 401
+
+    def test_refresh_token_grant_with_unknown_token_fails(self):
+        response = self.get_client().post(
+            "/v1/login",
+            json={"grant_type": "refresh_token", "refresh_token": "unknown"},
+        )
+
+        assert response.status_code == 401
+
+    def test_refresh_token_grant_without_refresh_token_is_invalid(self):
+        response = self.get_client().post(
+            "/v1/login", json={"grant_type": "refresh_token"}
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "invalid_request: refresh_token"
+
+    def test_password_grant_without_password_is_invalid(self):
+        response = self.get_client().post(
+            "/v1/login", json={"grant_type": "password", "username": "test@oly.co"}
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "invalid_request: password"
+
+    def test_refresh_token_grant_is_unsupported_when_disabled(self, monkeypatch):
+        monkeypatch.setattr(get_config().refresh_tokens, "enabled", False)
+
+        response = self.get_client().post(
+            "/v1/login",
+            json={"grant_type": "refresh_token", "refresh_token": "unknown"},
+        )
+
+        assert response.status_code == 400
+
 
 class TestMe:
     def get_client(self) -> TestClient:
@@ -340,3 +692,303 @@ class TestMe:
         )
 
         assert response.status_code == 401
+
+
+LOGINS_IN_FLIGHT = 8
+
+
+class TestLoginConcurrency:
+    async def test_ping_is_answered_while_a_password_is_verified(
+        self, user_repository: UserRepository, monkeypatch
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        verification_started = threading.Event()
+        release_verification = threading.Event()
+
+        def verify_password(password: str | None, hashed_password: str | None) -> bool:
+            verification_started.set()
+            release_verification.wait(timeout=5)
+            return True
+
+        monkeypatch.setattr(password_module, "verify_password", verify_password)
+        executor = ThreadPoolExecutor(max_workers=1)
+        previous_executor = set_password_executor(executor)
+        login_request = {
+            "username": email,
+            "password": password,
+            "grant_type": "password",
+        }
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=main_app),
+                base_url="http://testserver",
+            ) as client:
+                login = asyncio.create_task(
+                    client.post("/auth/v1/login", json=login_request)
+                )
+                while not verification_started.is_set():
+                    await asyncio.sleep(0.001)
+
+                ping = await client.get("/")
+                login_was_pending = not login.done()
+
+                release_verification.set()
+                assert (await login).status_code == 200
+        finally:
+            release_verification.set()
+            set_password_executor(previous_executor)
+            executor.shutdown()
+
+        assert ping.status_code == 200
+        assert login_was_pending
+
+    @pytest.mark.benchmark
+    async def test_ping_latency_stays_flat_while_logins_are_in_flight(
+        self, user_repository: UserRepository
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        start = time.perf_counter()
+        verify_password(password, user.hashed_password)
+        verify_seconds = time.perf_counter() - start
+
+        login_request = {
+            "username": email,
+            "password": password,
+            "grant_type": "password",
+        }
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main_app), base_url="http://testserver"
+        ) as client:
+            # the first login also loads the signing key
+            await client.post("/auth/v1/login", json=login_request)
+
+            logins = asyncio.gather(
+                *(
+                    client.post("/auth/v1/login", json=login_request)
+                    for _ in range(LOGINS_IN_FLIGHT)
+                )
+            )
+
+            # the logins progress while a ping yields, so an event loop stalled
+            # by a password hash shows up in the time the ping takes.
+            latencies = []
+            while not logins.done():
+                start = time.perf_counter()
+                assert (await client.get("/")).status_code == 200
+                await asyncio.sleep(0)
+                latencies.append(time.perf_counter() - start)
+
+            assert all(response.status_code == 200 for response in await logins)
+
+        stalled_seconds = sum(
+            latency for latency in latencies if latency >= verify_seconds / 2
+        )
+        print(
+            f"\nping latency with {LOGINS_IN_FLIGHT} logins in flight: "
+            f"median {statistics.median(latencies) * 1000:.1f}ms, "
+            f"max {max(latencies) * 1000:.1f}ms, stalled {stalled_seconds * 1000:.1f}ms, "
+            f"one password verification {verify_seconds * 1000:.1f}ms"
+        )
+
+        # inline hashing stalls the pings for every verification in flight
+        assert stalled_seconds < LOGINS_IN_FLIGHT * verify_seconds / 2
+
+
+class TestLoginAdmissionControl:
+    async def test_login_is_shed_when_password_hashing_is_saturated(
+        self, user_repository: UserRepository, monkeypatch
+    ):
+        email = "test@oly.co"
+        password = "test_password_123_$$%"
+
+        user: SensitiveUser = build_new_user(
+            email=email, password=password, role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        release_verification = threading.Event()
+
+        def verify_password(password: str | None, hashed_password: str | None) -> bool:
+            release_verification.wait(timeout=5)
+            return True
+
+        monkeypatch.setattr(password_module, "verify_password", verify_password)
+        executor = ThreadPoolExecutor(max_workers=1)
+        previous_executor = set_password_executor(
+            executor, max_pending=1, max_waiting=0
+        )
+        login_request = {
+            "username": email,
+            "password": password,
+            "grant_type": "password",
+        }
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+            ) as client:
+                first_login = asyncio.create_task(
+                    client.post("/v1/login", json=login_request)
+                )
+                while get_password_hashing_stats()["in_flight"] == 0:  # type: ignore[index]
+                    await asyncio.sleep(0.001)
+
+                response = await client.post("/v1/login", json=login_request)
+
+                release_verification.set()
+                assert (await first_login).status_code == 200
+        finally:
+            set_password_executor(previous_executor)
+            executor.shutdown()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(
+            get_config().password_hashing.retry_after_seconds
+        )
+
+
+class TestLoginRateLimit:
+    @pytest.fixture(autouse=True)
+    def rate_limiter(self, monkeypatch):
+        monkeypatch.setattr(get_config().login_rate_limit, "email_limit", 2)
+        monkeypatch.setattr(get_config().login_rate_limit, "ip_limit", 3)
+        rate_limiter = RateLimiter(InMemoryRateLimitBackend())
+        app.dependency_overrides[get_login_rate_limiter] = lambda: rate_limiter
+        yield rate_limiter
+        del app.dependency_overrides[get_login_rate_limiter]
+
+    def login(self, client: TestClient, email: str, password: str):
+        return client.post(
+            "/v1/login",
+            json={"username": email, "password": password, "grant_type": "password"},
+        )
+
+    async def test_attempts_beyond_the_email_limit_skip_the_password_hash(
+        self, user_repository: UserRepository, monkeypatch
+    ):
+        email = "test@oly.co"
+        user: SensitiveUser = build_new_user(
+            email=email, password="test_password_123_$$%", role=UserRole.USER
+        )
+        user.activate()
+        user.confirm(user.confirmation_token)
+        await user_repository.save_user(user)
+
+        verifications = []
+
+        def verify_password(password: str | None, hashed_password: str | None) -> bool:
+            verifications.append(password)
+            raise password_module.InvalidPasswordException()
+
+        monkeypatch.setattr(password_module, "verify_password", verify_password)
+        client = TestClient(app)
+
+        responses = [self.login(client, email, "wrong_password") for _ in range(3)]
+
+        assert [response.status_code for response in responses] == [401, 401, 429]
+        assert int(responses[2].headers["Retry-After"]) >= 1
+        assert len(verifications) == 2
+
+    async def test_emails_are_limited_whatever_their_case(self, ensure_clean_db: None):
+        client = TestClient(app)
+
+        self.login(client, "test@oly.co", "wrong_password")
+        self.login(client, "TEST@oly.co", "wrong_password")
+
+        assert self.login(client, "Test@Oly.co", "wrong_password").status_code == 429
+
+    async def test_attempts_beyond_the_ip_limit_are_rejected_for_any_email(
+        self, ensure_clean_db: None, rate_limiter: RateLimiter
+    ):
+        client = TestClient(app)
+
+        responses = [
+            self.login(client, f"user{i}@oly.co", "wrong_password") for i in range(4)
+        ]
+
+        assert [response.status_code for response in responses] == [
+            401,
+            401,
+            401,
+            429,
+        ]
+        assert rate_limiter.stats()["rejections"] == 1
+
+    async def test_ip_limit_applies_to_the_forwarded_address_behind_a_trusted_proxy(
+        self, ensure_clean_db: None, monkeypatch
+    ):
+        monkeypatch.setattr(
+            get_config().login_rate_limit,
+            "trusted_proxies",
+            [ip_network("10.0.0.0/8")],
+        )
+
+        async def login(client: httpx.AsyncClient, index: int, forwarded_for: str):
+            return await client.post(
+                "/v1/login",
+                json={
+                    "username": f"user{index}@oly.co",
+                    "password": "wrong_password",
+                    "grant_type": "password",
+                },
+                headers={"X-Forwarded-For": forwarded_for},
+            )
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, client=("10.0.0.1", 123)),
+            base_url="http://testserver",
+        ) as client:
+            limited = [await login(client, i, "203.0.113.1") for i in range(4)]
+            other_client = await login(client, 4, "203.0.113.2")
+
+        assert [response.status_code for response in limited] == [401, 401, 401, 429]
+        assert other_client.status_code == 401
+
+    async def test_forwarded_address_is_ignored_from_an_untrusted_client(
+        self, ensure_clean_db: None, monkeypatch
+    ):
+        monkeypatch.setattr(
+            get_config().login_rate_limit,
+            "trusted_proxies",
+            [ip_network("10.0.0.0/8")],
+        )
+        client = TestClient(app)
+
+        responses = [
+            client.post(
+                "/v1/login",
+                json={
+                    "username": f"user{i}@oly.co",
+                    "password": "wrong_password",
+                    "grant_type": "password",
+                },
+                headers={"X-Forwarded-For": f"203.0.113.{i}"},
+            )
+            for i in range(4)
+        ]
+
+        assert [response.status_code for response in responses] == [
+            401,
+            401,
+            401,
+            429,
+        ]
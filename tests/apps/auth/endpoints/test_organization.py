@@ -4,6 +4,7 @@ from src.apps.auth.app import app
 from src.apps.auth.repository.organizations import OrganizationsRepository
 from src.apps.auth.repository.users import UserRepository
 from src.lib_auth.roles import OrganizationRole
+from src.lib_utils.pagination import MAX_PAGE_SIZE
 from tests.test_utils.user import (
     add_platform_owner,
     add_platform_user,
@@ -241,6 +242,77 @@ class TestOrganizationList:
         assert len(result) == 1
         assert result[0]["name"] == "Test Organization"
 
+    async def test_list_organizations_with_cursor(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await add_platform_owner(user_repository, organizations_repository)
+        access_token = await get_authorization_token_for_platform_owner(client)
+
+        for name in ["Test Organization 1", "Test Organization 2"]:
+            client.post(
+                "/v1/organizations",
+                json={
+                    "name": name,
+                    "description": "A test organization",
+                    "role": OrganizationRole.PLATFORM_USER.value,
+                },
+                headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+            )
+
+        names = []
+        params: dict = {"limit": 2}
+        while True:
+            response = client.get(
+                "/v1/organizations",
+                params=params,
+                headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+            )
+            assert response.status_code == 200
+            names += [org["name"] for org in response.json()]
+
+            if "X-Next-Cursor" not in response.headers:
+                break
+            params = {"limit": 2, "cursor": response.headers["X-Next-Cursor"]}
+
+        assert names == ["Platform", "Test Organization 1", "Test Organization 2"]
+
+    async def test_list_organizations_with_invalid_cursor_returns_400(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await add_platform_owner(user_repository, organizations_repository)
+        access_token = await get_authorization_token_for_platform_owner(client)
+
+        response = client.get(
+            "/v1/organizations",
+            params={"cursor": "not-a-cursor"},
+            headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response.status_code == 400
+
+    async def test_list_organizations_above_max_page_size_returns_422(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await add_platform_owner(user_repository, organizations_repository)
+        access_token = await get_authorization_token_for_platform_owner(client)
+
+        response = client.get(
+            "/v1/organizations",
+            params={"limit": MAX_PAGE_SIZE + 1},
+            headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response.status_code == 422
+
     async def test_list_organizations_with_limit_and_offset(
         self,
         user_repository: UserRepository,
@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+
+from src.apps.auth.app import app
+from src.apps.auth.endpoints.tokens import MAX_INTROSPECTED_TOKENS
+from src.lib_auth.roles import OrganizationRole, UserRole
+from tests.test_utils.jwt import generate_test_jwt_token
+
+
+class TestIntrospectTokens:
+    def get_client(self) -> TestClient:
+        return TestClient(app)
+
+    def test_introspect_returns_claims_of_valid_tokens(self):
+        token = generate_test_jwt_token(
+            user_id="user-1",
+            user_role=UserRole.USER,
+            organization_id="organization-1",
+            organization_role=OrganizationRole.PLATFORM_USER,
+        )
+
+        response = self.get_client().post(
+            "/v1/tokens/introspect",
+            headers={"X-API-Key": "test_gateway_api_key"},
+            json={"tokens": [token, "not-a-token", token]},
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["active"] for result in results] == [True, False, True]
+        assert results[0]["claims"]["sub"] == "user-1"
+        assert results[0]["claims"]["custom_claims"]["organization_id"] == (
+            "organization-1"
+        )
+        assert results[1]["claims"] is None
+
+    def test_introspect_without_api_key_is_rejected(self):
+        response = self.get_client().post(
+            "/v1/tokens/introspect", json={"tokens": ["not-a-token"]}
+        )
+
+        assert response.status_code == 422
+
+    def test_introspect_with_api_key_for_other_endpoint_is_rejected(self):
+        response = self.get_client().post(
+            "/v1/tokens/introspect",
+            headers={"X-API-Key": "test_other_api_key"},
+            json={"tokens": ["not-a-token"]},
+        )
+
+        assert response.status_code == 401
+
+    def test_introspect_rejects_too_many_tokens(self):
+        response = self.get_client().post(
+            "/v1/tokens/introspect",
+            headers={"X-API-Key": "test_gateway_api_key"},
+            json={"tokens": ["not-a-token"] * (MAX_INTROSPECTED_TOKENS + 1)},
+        )
+
+        assert response.status_code == 422
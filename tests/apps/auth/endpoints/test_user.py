@@ -1,10 +1,19 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
 from fastapi.testclient import TestClient
 
 from src.apps.auth.app import app
+from src.apps.auth.endpoints.user import MAX_BATCH_USERS
 from src.apps.auth.models.organization import Organization
 from src.apps.auth.models.user import build_new_user
 from src.apps.auth.repository.organizations import OrganizationsRepository
 from src.apps.auth.repository.users import UserRepository
+from src.lib_auth import password as password_module
+from src.lib_auth.password import async_hash_password, set_password_executor
 from src.lib_auth.roles import OrganizationRole, UserRole
 
 client = TestClient(app)
@@ -202,6 +211,7 @@ class TestUserCreate:
         user_repository: UserRepository,
         organizations_repository: OrganizationsRepository,
         ensure_clean_db: None,
+        monkeypatch,
     ):
         await self.add_platform_owner(user_repository, organizations_repository)
         access_token = await self.get_authorization_token_for_platform_owner()
@@ -227,6 +237,14 @@ class TestUserCreate:
             == 200
         )
 
+        hashed = []
+
+        def hash_password(password: str, *args) -> str:
+            hashed.append(password)
+            return "hashed"
+
+        monkeypatch.setattr(password_module, "hash_password", hash_password)
+
         # try to create a user with the same email
         response = client.post(
             "/v1/users",
@@ -236,6 +254,8 @@ class TestUserCreate:
 
         assert response.status_code == 400
         assert response.json() == {"detail": "User already exists"}
+        # turned away before the password is hashed
+        assert hashed == []
 
     async def test_create_user_with_non_matching_passwords(
         self,
@@ -289,3 +309,271 @@ class TestUserCreate:
         )
 
         assert response.status_code == 400
+
+
+class TestUserUpdate:
+    users = TestUserCreate()
+
+    def build_update(self, **overrides) -> dict:
+        return {
+            "email": "updated@oly.co",
+            "first_name": "Updated",
+            "last_name": "User",
+            "role": UserRole.ADMIN,
+            "is_activated": True,
+            "is_confirmed": True,
+            **overrides,
+        }
+
+    async def test_platform_owner_updates_user_and_organization(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await self.users.add_platform_owner(user_repository, organizations_repository)
+        await self.users.add_platform_user(user_repository, organizations_repository)
+        access_token = await self.users.get_authorization_token_for_platform_owner()
+
+        user = await user_repository.get_user_by_email(
+            self.users.NON_PLATFORM_OWNER_EMAIL
+        )
+        organization = await organizations_repository.create_organization(
+            Organization(name="Other", description="Other")
+        )
+        assert user is not None
+
+        response = client.put(
+            f"/v1/user/{user.id}",
+            json=self.build_update(organization_id=organization.id),
+            headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["email"] == "updated@oly.co"
+        assert body["role"] == UserRole.ADMIN
+        assert body["organization"]["id"] == organization.id
+
+    async def test_platform_owner_update_of_missing_user_returns_404(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await self.users.add_platform_owner(user_repository, organizations_repository)
+        access_token = await self.users.get_authorization_token_for_platform_owner()
+
+        response = client.put(
+            "/v1/user/missing",
+            json=self.build_update(),
+            headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "User not found"}
+
+    async def test_platform_user_cannot_change_own_role(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await self.users.add_platform_user(user_repository, organizations_repository)
+        access_token = await self.users.get_authorization_token_for_basic_user()
+
+        user = await user_repository.get_user_by_email(
+            self.users.NON_PLATFORM_OWNER_EMAIL
+        )
+        assert user is not None
+
+        response = client.put(
+            f"/v1/user/{user.id}",
+            json=self.build_update(),
+            headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["email"] == "updated@oly.co"
+        assert body["role"] == UserRole.USER
+        assert body["organization"]["id"] == user.organization.id  # type: ignore[union-attr]
+
+
+class TestUserBatchCreate:
+    users = TestUserCreate()
+
+    def build_item(self, email: str, password: str = "test_password_123_$$%") -> dict:
+        return {
+            "email": email,
+            "password": password,
+            "confirm_password": password,
+            "first_name": "Test",
+            "last_name": "User",
+        }
+
+    async def test_batch_reports_per_item_results(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await self.users.add_platform_owner(user_repository, organizations_repository)
+        access_token = await self.users.get_authorization_token_for_platform_owner()
+
+        mismatched = self.build_item("mismatch@oly.co")
+        mismatched["confirm_password"] = "something else"
+
+        response = client.post(
+            "/v1/users/batch",
+            json={
+                "users": [
+                    self.build_item("first@oly.co"),
+                    self.build_item(self.users.PLATFORM_OWNER_EMAIL),
+                    self.build_item("first@oly.co"),
+                    self.build_item("weak@oly.co", password="weak"),
+                    mismatched,
+                    self.build_item("second@oly.co"),
+                ]
+            },
+            headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [(r["email"], r["status"]) for r in results] == [
+            ("first@oly.co", "created"),
+            (self.users.PLATFORM_OWNER_EMAIL, "duplicate"),
+            ("first@oly.co", "duplicate"),
+            ("weak@oly.co", "invalid"),
+            ("mismatch@oly.co", "invalid"),
+            ("second@oly.co", "created"),
+        ]
+        assert results[4]["detail"] == "Passwords do not match"
+
+        assert await user_repository.get_user_by_email("first@oly.co")
+        assert await user_repository.get_user_by_email("second@oly.co")
+
+    async def test_invalid_item_does_not_hide_a_valid_one_for_the_same_email(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await self.users.add_platform_owner(user_repository, organizations_repository)
+        access_token = await self.users.get_authorization_token_for_platform_owner()
+
+        response = client.post(
+            "/v1/users/batch",
+            json={
+                "users": [
+                    self.build_item("first@oly.co", password="weak"),
+                    self.build_item("first@oly.co"),
+                    self.build_item("first@oly.co"),
+                ]
+            },
+            headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response.status_code == 200
+        assert [r["status"] for r in response.json()["results"]] == [
+            "invalid",
+            "created",
+            "duplicate",
+        ]
+        assert await user_repository.get_user_by_email("first@oly.co")
+
+    async def test_rejected_batch_cancels_its_other_items(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+        monkeypatch,
+    ):
+        await self.users.add_platform_owner(user_repository, organizations_repository)
+        access_token = await self.users.get_authorization_token_for_platform_owner()
+
+        release_hash = threading.Event()
+        hashed = []
+
+        def hash_password(password: str, *args) -> str:
+            hashed.append(password)
+            release_hash.wait(timeout=5)
+            return "hashed"
+
+        monkeypatch.setattr(password_module, "hash_password", hash_password)
+        monkeypatch.setattr(os, "cpu_count", lambda: 2)
+        executor = ThreadPoolExecutor(max_workers=1)
+        # one hash in flight and one waiting, the next one is turned away
+        previous_executor = set_password_executor(
+            executor, max_pending=1, max_waiting=1
+        )
+        try:
+            in_flight = asyncio.create_task(async_hash_password("in_flight"))
+            while not hashed:
+                await asyncio.sleep(0.001)
+
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+            ) as async_client:
+                response = await async_client.post(
+                    "/v1/users/batch",
+                    json={
+                        "users": [
+                            self.build_item("first@oly.co"),
+                            self.build_item("second@oly.co"),
+                        ]
+                    },
+                    headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+                )
+
+            release_hash.set()
+            await in_flight
+            # a waiting item that was not cancelled would be hashed by now
+            await asyncio.sleep(0.1)
+        finally:
+            release_hash.set()
+            set_password_executor(previous_executor)
+            executor.shutdown()
+
+        assert response.status_code == 503
+        assert hashed == ["in_flight"]
+
+    async def test_batch_over_the_limit_returns_422(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await self.users.add_platform_owner(user_repository, organizations_repository)
+        access_token = await self.users.get_authorization_token_for_platform_owner()
+
+        response = client.post(
+            "/v1/users/batch",
+            json={
+                "users": [
+                    self.build_item(f"user{i}@oly.co")
+                    for i in range(MAX_BATCH_USERS + 1)
+                ]
+            },
+            headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response.status_code == 422
+
+    async def test_batch_as_platform_user_returns_403(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+        ensure_clean_db: None,
+    ):
+        await self.users.add_platform_user(user_repository, organizations_repository)
+        access_token = await self.users.get_authorization_token_for_basic_user()
+
+        response = client.post(
+            "/v1/users/batch",
+            json={"users": [self.build_item("first@oly.co")]},
+            headers={"X-Oly-Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response.status_code == 403
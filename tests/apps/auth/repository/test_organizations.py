@@ -10,6 +10,7 @@ from src.apps.auth.repository.organizations import (
     OrganizationsRepository,
 )
 from src.lib_auth.roles import OrganizationRole
+from src.lib_utils.pagination import KeysetCursor
 
 
 class TestOrganizationRepositoryOrganizationCreation:
@@ -111,6 +112,24 @@ class TestOrganizationRepositoryOrganizationUpdate:
         assert updated_organization.role == OrganizationRole.PLATFORM_USER
         assert updated_organization.created_at is not None
         assert updated_organization.updated_at is not None
+        assert updated_organization.updated_at >= updated_organization.created_at
+
+    async def test_update_to_existing_name_raises_error(
+        self, organizations_repository: OrganizationsRepository, ensure_clean_db: None
+    ):
+        await organizations_repository.create_organization(
+            Organization(name="Test Organization", description="Test Description")
+        )
+        other_organization = await organizations_repository.create_organization(
+            Organization(name="Other Organization", description="Test Description")
+        )
+
+        other_organization.name = "Test Organization"
+
+        with pytest.raises(
+            OrganizationExistsError, match="Organization with this name already exists"
+        ):
+            await organizations_repository.update_organization(other_organization)
 
     async def test_update_non_existing(
         self, organizations_repository: OrganizationsRepository, ensure_clean_db: None
@@ -231,6 +250,30 @@ class TestOrganizationRepositoryOrganizationGet:
         assert organizations[0].created_at is not None
         assert organizations[0].updated_at is not None
 
+    async def test_get_organizations_after_cursor(
+        self, organizations_repository: OrganizationsRepository, ensure_clean_db: None
+    ):
+        for index in range(3):
+            await organizations_repository.create_organization(
+                Organization(
+                    name=f"Test Organization {index}",
+                    description=f"Test Description {index}",
+                )
+            )
+
+        first_page = await organizations_repository.get_organizations(limit=2)
+        last = first_page[-1]
+        second_page = await organizations_repository.get_organizations(
+            limit=2,
+            after=KeysetCursor(created_at=last.created_at, id=last.id),  # type: ignore[arg-type]
+        )
+
+        assert [o.name for o in first_page] == [
+            "Test Organization 0",
+            "Test Organization 1",
+        ]
+        assert [o.name for o in second_page] == ["Test Organization 2"]
+
     async def test_get_organizations_with_name_contains(
         self, organizations_repository: OrganizationsRepository, ensure_clean_db: None
     ):
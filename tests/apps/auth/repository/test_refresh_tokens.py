@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.apps.auth.models.user import SensitiveUser, build_new_user
+from src.apps.auth.repository.refresh_tokens import (
+    InvalidRefreshTokenError,
+    RefreshTokenReusedError,
+    RefreshTokensRepository,
+)
+from src.apps.auth.repository.users import UserRepository
+from src.lib_auth.roles import UserRole
+
+
+def in_a_day() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=1)
+
+
+async def create_user(user_repository: UserRepository) -> SensitiveUser:
+    user = build_new_user(
+        email="test@oly.co", password="test_password_123_$$%", role=UserRole.USER
+    )
+    await user_repository.save_user(user)
+    return user
+
+
+class TestRefreshTokensRepository:
+    async def test_rotate_returns_user_and_accepts_the_new_token(
+        self,
+        user_repository: UserRepository,
+        refresh_tokens_repository: RefreshTokensRepository,
+    ):
+        user = await create_user(user_repository)
+        await refresh_tokens_repository.create("hash-1", user.id, in_a_day())  # type: ignore
+
+        assert (
+            await refresh_tokens_repository.rotate("hash-1", "hash-2", in_a_day())
+            == user.id
+        )
+        assert (
+            await refresh_tokens_repository.rotate("hash-2", "hash-3", in_a_day())
+            == user.id
+        )
+
+    async def test_rotate_unknown_token_raises(
+        self, refresh_tokens_repository: RefreshTokensRepository
+    ):
+        with pytest.raises(InvalidRefreshTokenError):
+            await refresh_tokens_repository.rotate("unknown", "hash-2", in_a_day())
+
+    async def test_rotate_expired_token_raises(
+        self,
+        user_repository: UserRepository,
+        refresh_tokens_repository: RefreshTokensRepository,
+    ):
+        user = await create_user(user_repository)
+        await refresh_tokens_repository.create(
+            "hash-1",
+            user.id,  # type: ignore
+            datetime.now(timezone.utc) - timedelta(seconds=1),
+        )
+
+        with pytest.raises(InvalidRefreshTokenError) as error:
+            await refresh_tokens_repository.rotate("hash-1", "hash-2", in_a_day())
+        assert not isinstance(error.value, RefreshTokenReusedError)
+
+    async def test_reusing_a_rotated_token_revokes_the_family(
+        self,
+        user_repository: UserRepository,
+        refresh_tokens_repository: RefreshTokensRepository,
+    ):
+        user = await create_user(user_repository)
+        await refresh_tokens_repository.create("hash-1", user.id, in_a_day())  # type: ignore
+        await refresh_tokens_repository.rotate("hash-1", "hash-2", in_a_day())
+
+        with pytest.raises(RefreshTokenReusedError):
+            await refresh_tokens_repository.rotate("hash-1", "hash-3", in_a_day())
+
+        # the token issued by the legitimate rotation is revoked too
+        with pytest.raises(InvalidRefreshTokenError):
+            await refresh_tokens_repository.rotate("hash-2", "hash-4", in_a_day())
+
+    async def test_revoking_a_family_keeps_other_families(
+        self,
+        user_repository: UserRepository,
+        refresh_tokens_repository: RefreshTokensRepository,
+    ):
+        user = await create_user(user_repository)
+        family_id = await refresh_tokens_repository.create(
+            "hash-1", user.id, in_a_day()  # type: ignore
+        )
+        await refresh_tokens_repository.create("other-1", user.id, in_a_day())  # type: ignore
+
+        await refresh_tokens_repository.revoke_family(family_id)
+
+        with pytest.raises(InvalidRefreshTokenError):
+            await refresh_tokens_repository.rotate("hash-1", "hash-2", in_a_day())
+        assert (
+            await refresh_tokens_repository.rotate("other-1", "other-2", in_a_day())
+            == user.id
+        )
+
+    async def test_revoking_the_family_of_a_token_revokes_its_rotations(
+        self,
+        user_repository: UserRepository,
+        refresh_tokens_repository: RefreshTokensRepository,
+    ):
+        user = await create_user(user_repository)
+        await refresh_tokens_repository.create("hash-1", user.id, in_a_day())  # type: ignore
+        await refresh_tokens_repository.rotate("hash-1", "hash-2", in_a_day())
+
+        await refresh_tokens_repository.revoke_family_of("hash-1")
+
+        with pytest.raises(InvalidRefreshTokenError):
+            await refresh_tokens_repository.rotate("hash-2", "hash-3", in_a_day())
+
+    async def test_revoking_the_family_of_an_unknown_token_is_a_no_op(
+        self, refresh_tokens_repository: RefreshTokensRepository
+    ):
+        await refresh_tokens_repository.revoke_family_of("unknown")
+
+    async def test_prune_deletes_expired_tokens(
+        self,
+        user_repository: UserRepository,
+        refresh_tokens_repository: RefreshTokensRepository,
+    ):
+        user = await create_user(user_repository)
+        await refresh_tokens_repository.create(
+            "expired",
+            user.id,  # type: ignore
+            datetime.now(timezone.utc) - timedelta(seconds=1),
+        )
+        await refresh_tokens_repository.create("active", user.id, in_a_day())  # type: ignore
+
+        assert await refresh_tokens_repository.prune() == 1
+        assert (
+            await refresh_tokens_repository.rotate("active", "hash-2", in_a_day())
+            == user.id
+        )
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.apps.auth.models.user import build_new_user
+from src.apps.auth.orm.revoked_tokens import revoked_tokens_table
+from src.apps.auth.repository.refresh_tokens import RefreshTokensRepository
+from src.apps.auth.repository.revoked_tokens import RevokedTokensRepository
+from src.apps.auth.repository.users import UserRepository
+from src.apps.auth.revocation import TokenRevocationSync
+from src.lib_auth.revocation import TokenRevocationList
+from src.lib_auth.roles import UserRole
+
+
+def in_an_hour() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(hours=1)
+
+
+class TestRevokedTokensRepository:
+    async def test_revocations_are_returned(
+        self, revoked_tokens_repository: RevokedTokensRepository
+    ):
+        expires_at = in_an_hour()
+
+        await revoked_tokens_repository.revoke("jti-1", expires_at)
+        # revoking twice is a no-op
+        await revoked_tokens_repository.revoke("jti-1", expires_at)
+
+        revocations = await revoked_tokens_repository.get_revocations()
+        assert [(jti, expires) for jti, expires, _ in revocations] == [
+            ("jti-1", expires_at)
+        ]
+
+    async def test_revocations_since_are_returned(
+        self, revoked_tokens_repository: RevokedTokensRepository
+    ):
+        await revoked_tokens_repository.revoke("jti-1", in_an_hour())
+        (_, _, revoked_at), *_ = await revoked_tokens_repository.get_revocations()
+
+        await revoked_tokens_repository.revoke("jti-2", in_an_hour())
+        revocations = await revoked_tokens_repository.get_revocations(
+            revoked_since=revoked_at + timedelta(microseconds=1)
+        )
+
+        assert [jti for jti, _, _ in revocations] == ["jti-2"]
+
+    async def test_prune_deletes_expired_revocations(
+        self, revoked_tokens_repository: RevokedTokensRepository
+    ):
+        await revoked_tokens_repository.revoke(
+            "expired", datetime.now(timezone.utc) - timedelta(seconds=1)
+        )
+        await revoked_tokens_repository.revoke("active", in_an_hour())
+
+        assert await revoked_tokens_repository.prune() == 1
+        assert [
+            jti for jti, _, _ in await revoked_tokens_repository.get_revocations()
+        ] == ["active"]
+
+
+class TestTokenRevocationSync:
+    async def test_sync_loads_revocations(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        revoked_tokens_repository: RevokedTokensRepository,
+    ):
+        revocation_list = TokenRevocationList()
+        revocation_sync = TokenRevocationSync(
+            revocation_list, session_maker, prune_interval_seconds=0
+        )
+
+        await revoked_tokens_repository.revoke("jti-1", in_an_hour())
+        await revocation_sync.sync()
+        await revoked_tokens_repository.revoke("jti-2", in_an_hour())
+        await revocation_sync.sync()
+
+        assert revocation_list.is_revoked("jti-1")
+        assert revocation_list.is_revoked("jti-2")
+        assert len(revocation_list) == 2
+
+    async def test_sync_loads_revocations_committed_out_of_order(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        revoked_tokens_repository: RevokedTokensRepository,
+    ):
+        revocation_list = TokenRevocationList()
+        revocation_sync = TokenRevocationSync(revocation_list, session_maker)
+
+        async with session_maker() as slow_session:
+            # its revoked_at is the start of this transaction, before jti-2's
+            await slow_session.execute(
+                insert(revoked_tokens_table).values(
+                    jti="jti-1", expires_at=in_an_hour()
+                )
+            )
+            await revoked_tokens_repository.revoke("jti-2", in_an_hour())
+            await revocation_sync.sync()
+            await slow_session.commit()
+
+        await revocation_sync.sync()
+
+        assert revocation_list.is_revoked("jti-1")
+        assert revocation_list.is_revoked("jti-2")
+
+    async def test_sync_prunes_expired_refresh_tokens(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        user_repository: UserRepository,
+        refresh_tokens_repository: RefreshTokensRepository,
+    ):
+        user = build_new_user(
+            email="test@oly.co", password="test_password_123_$$%", role=UserRole.USER
+        )
+        await user_repository.save_user(user)
+        await refresh_tokens_repository.create(
+            "expired",
+            user.id,  # type: ignore
+            datetime.now(timezone.utc) - timedelta(seconds=1),
+        )
+        await refresh_tokens_repository.create("active", user.id, in_an_hour())  # type: ignore
+        revocation_sync = TokenRevocationSync(
+            TokenRevocationList(), session_maker, prune_interval_seconds=0
+        )
+
+        await revocation_sync.sync()
+
+        assert await refresh_tokens_repository.prune() == 0
+        assert await refresh_tokens_repository.rotate("active", "hash-2", in_an_hour())
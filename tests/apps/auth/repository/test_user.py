@@ -1,10 +1,22 @@
+from datetime import datetime
+
+import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.apps.auth.models.organization import Organization
 from src.apps.auth.models.user import SensitiveUser, build_new_user
-from src.apps.auth.repository.organizations import OrganizationsRepository
-from src.apps.auth.repository.users import UserRepository
+from src.apps.auth.repository.organizations import (
+    OrganizationNotFoundError,
+    OrganizationsRepository,
+)
+from src.apps.auth.repository.users import (
+    SQLUserRepository,
+    UserChanges,
+    UserExistsError,
+    UserRepository,
+)
 from src.lib_auth.roles import UserRole
+from src.lib_utils.pagination import KeysetCursor
 
 
 class TestUserRepositoryUserCreation:
@@ -74,6 +86,214 @@ class TestUserRepositoryUserCreation:
         assert fetched_user and fetched_user.is_confirmed is False
 
 
+class TestUserRepositoryCreateUserIfAbsent:
+    def build_user(self, id: str) -> SensitiveUser:
+        return SensitiveUser(
+            id=id,
+            email="abc@abc.com",
+            first_name="first",
+            last_name="last",
+            hashed_password="a_hashed_password",
+            confirmation_token="a_confirmation_token",
+            role=UserRole.USER,
+        )
+
+    async def test_new_user_is_created(self, user_repository: UserRepository):
+        user = self.build_user("abc-abc-abc")
+
+        assert await user_repository.create_user_if_absent(user) is True
+        assert user.created_at is not None
+
+        fetched_user = await user_repository.get_sensitive_user_by_email("abc@abc.com")
+        assert fetched_user and fetched_user.id == "abc-abc-abc"
+        assert fetched_user.hashed_password == "a_hashed_password"
+
+    async def test_duplicate_email_is_not_created(
+        self, user_repository: UserRepository
+    ):
+        await user_repository.create_user_if_absent(self.build_user("abc-abc-abc"))
+
+        duplicate = self.build_user("def-def-def")
+
+        assert await user_repository.create_user_if_absent(duplicate) is False
+
+        fetched_user = await user_repository.get_user_by_email("abc@abc.com")
+        assert fetched_user and fetched_user.id == "abc-abc-abc"
+
+
+class TestUserRepositoryCreateUsersIfAbsent:
+    def build_user(self, id: str, email: str) -> SensitiveUser:
+        return SensitiveUser(
+            id=id,
+            email=email,
+            hashed_password="a_hashed_password",
+            confirmation_token="a_confirmation_token",
+            role=UserRole.USER,
+        )
+
+    async def test_new_users_are_created(self, user_repository: UserRepository):
+        users = [
+            self.build_user("abc-abc-abc", "abc@abc.com"),
+            self.build_user("def-def-def", "def@def.com"),
+        ]
+
+        created_ids = await user_repository.create_users_if_absent(users)
+
+        assert created_ids == {"abc-abc-abc", "def-def-def"}
+        assert all(user.created_at is not None for user in users)
+        assert len(await user_repository.get_users()) == 2
+
+    async def test_existing_emails_are_skipped(self, user_repository: UserRepository):
+        await user_repository.save_user(self.build_user("abc-abc-abc", "abc@abc.com"))
+
+        created_ids = await user_repository.create_users_if_absent(
+            [
+                self.build_user("def-def-def", "abc@abc.com"),
+                self.build_user("ghi-ghi-ghi", "ghi@ghi.com"),
+            ]
+        )
+
+        assert created_ids == {"ghi-ghi-ghi"}
+        fetched_user = await user_repository.get_user_by_email("abc@abc.com")
+        assert fetched_user and fetched_user.id == "abc-abc-abc"
+
+
+class TestUserRepositoryUpdateUser:
+    def build_user(self, id: str, email: str) -> SensitiveUser:
+        return SensitiveUser(
+            id=id,
+            email=email,
+            first_name="first",
+            last_name="last",
+            hashed_password="a_hashed_password",
+            confirmation_token="a_confirmation_token",
+            role=UserRole.USER,
+        )
+
+    async def test_update_returns_updated_user_with_organization(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+    ):
+        user = self.build_user("abc-abc-abc", "abc@abc.com")
+        await user_repository.save_user(user)
+        organization = await organizations_repository.create_organization(
+            Organization(name="abc", description="abc")
+        )
+
+        updated_user = await user_repository.update_user(
+            "abc-abc-abc",
+            UserChanges(
+                email="new@abc.com",
+                first_name="new first",
+                role=UserRole.ADMIN,
+                is_activated=True,
+                organization_id=organization.id,
+            ),
+        )
+
+        assert updated_user is not None
+        assert updated_user.email == "new@abc.com"
+        assert updated_user.first_name == "new first"
+        assert updated_user.last_name == "last"
+        assert updated_user.role == UserRole.ADMIN
+        assert updated_user.is_activated is True
+        assert updated_user.organization is not None
+        assert updated_user.organization.id == organization.id
+        assert updated_user.updated_at is not None
+        assert updated_user.created_at is not None
+        assert updated_user.updated_at > updated_user.created_at
+
+    async def test_update_can_remove_organization(
+        self,
+        user_repository: UserRepository,
+        organizations_repository: OrganizationsRepository,
+    ):
+        organization = await organizations_repository.create_organization(
+            Organization(name="abc", description="abc")
+        )
+        user = self.build_user("abc-abc-abc", "abc@abc.com")
+        user.organization = organization
+        await user_repository.save_user(user)
+
+        updated_user = await user_repository.update_user(
+            "abc-abc-abc", UserChanges(organization_id=None)
+        )
+
+        assert updated_user is not None
+        assert updated_user.organization is None
+
+    async def test_update_of_missing_user_returns_none(
+        self, user_repository: UserRepository
+    ):
+        assert (
+            await user_repository.update_user("abc-abc-abc", UserChanges(email="a@b.c"))
+            is None
+        )
+
+    async def test_update_to_existing_email_raises_error(
+        self, user_repository: UserRepository
+    ):
+        await user_repository.save_user(self.build_user("abc-abc-abc", "abc@abc.com"))
+        await user_repository.save_user(self.build_user("def-def-def", "def@def.com"))
+
+        with pytest.raises(UserExistsError):
+            await user_repository.update_user(
+                "def-def-def", UserChanges(email="abc@abc.com")
+            )
+
+    async def test_update_to_missing_organization_raises_error(
+        self, user_repository: UserRepository
+    ):
+        await user_repository.save_user(self.build_user("abc-abc-abc", "abc@abc.com"))
+
+        with pytest.raises(OrganizationNotFoundError):
+            await user_repository.update_user(
+                "abc-abc-abc", UserChanges(organization_id="missing")
+            )
+
+
+class TestUserRepositoryReplaceHashedPassword:
+    def build_user(self) -> SensitiveUser:
+        return SensitiveUser(
+            id="abc-abc-abc",
+            email="abc@abc.com",
+            hashed_password="old_hashed_password",
+            confirmation_token="a_confirmation_token",
+            role=UserRole.USER,
+        )
+
+    async def test_hash_is_replaced(
+        self, user_repository: UserRepository, session_maker
+    ):
+        await user_repository.save_user(self.build_user())
+
+        assert await user_repository.replace_hashed_password(
+            "abc-abc-abc", "old_hashed_password", "new_hashed_password"
+        )
+
+        async with session_maker() as session:
+            user = await SQLUserRepository(session).get_sensitive_user_by_id(
+                "abc-abc-abc"
+            )
+        assert user.hashed_password == "new_hashed_password"  # type: ignore
+
+    async def test_hash_changed_in_the_meantime_is_kept(
+        self, user_repository: UserRepository, session_maker
+    ):
+        await user_repository.save_user(self.build_user())
+
+        assert not await user_repository.replace_hashed_password(
+            "abc-abc-abc", "outdated_hashed_password", "new_hashed_password"
+        )
+
+        async with session_maker() as session:
+            user = await SQLUserRepository(session).get_sensitive_user_by_id(
+                "abc-abc-abc"
+            )
+        assert user.hashed_password == "old_hashed_password"  # type: ignore
+
+
 class TestUserRepositoryUserOrganizationRelations:
     async def test_user_is_correctly_associated_with_organization(
         self,
@@ -267,6 +487,34 @@ class TestUserRepositoryGetUsers:
         assert user2.id == users[0].id
         assert user3.id == users[1].id
 
+    async def test_get_users_after_cursor_breaks_ties_on_id(
+        self,
+        user_repository: UserRepository,
+        ensure_clean_db: None,
+    ):
+        created_at = datetime(2024, 4, 13, 14, 59, 8)
+        for user_id in ["c", "a", "b"]:
+            await user_repository.save_user(
+                SensitiveUser(
+                    id=user_id,
+                    email=f"{user_id}@email.com",
+                    hashed_password="a_hashed_password",
+                    confirmation_token="a_confirmation_token",
+                    created_at=created_at,
+                )
+            )
+
+        seen = []
+        after = None
+        while True:
+            users = await user_repository.get_users(limit=1, after=after)
+            if not users:
+                break
+            seen.append(users[0].id)
+            after = KeysetCursor(created_at=users[0].created_at, id=users[0].id)  # type: ignore[arg-type]
+
+        assert seen == ["a", "b", "c"]
+
     async def test_get_users_returns_correct_users_with_username_contains(
         self,
         user_repository: UserRepository,
@@ -329,6 +577,64 @@ class TestUserRepositoryGetUsers:
         assert user2.id == users[0].id
         assert user3.id == users[1].id
 
+    async def test_get_users_with_username_contains_matches_wildcards_literally(
+        self,
+        user_repository: UserRepository,
+        ensure_clean_db: None,
+    ):
+        user1 = build_new_user(
+            email="first_last@oly.com",
+            password="something!@#12345A",
+            role=UserRole.USER,
+        )
+
+        user2 = build_new_user(
+            email="firstxlast@oly.com",
+            password="something!@#12345A",
+            role=UserRole.USER,
+        )
+
+        await user_repository.save_user(user1)
+        await user_repository.save_user(user2)
+
+        users = await user_repository.get_users(username_contains="t_l")
+
+        assert len(users) == 1
+        assert user1.id == users[0].id
+
+    async def test_get_users_with_role_activation_and_creation_filters(
+        self,
+        user_repository: UserRepository,
+        ensure_clean_db: None,
+    ):
+        users_to_save = [
+            ("a", UserRole.ADMIN, True, datetime(2024, 1, 1)),
+            ("b", UserRole.ADMIN, False, datetime(2024, 1, 2)),
+            ("c", UserRole.USER, True, datetime(2024, 1, 3)),
+            ("d", UserRole.ADMIN, True, datetime(2024, 1, 4)),
+        ]
+        for user_id, role, is_activated, created_at in users_to_save:
+            await user_repository.save_user(
+                SensitiveUser(
+                    id=user_id,
+                    email=f"{user_id}@email.com",
+                    hashed_password="a_hashed_password",
+                    confirmation_token="a_confirmation_token",
+                    role=role,
+                    is_activated=is_activated,
+                    created_at=created_at,
+                )
+            )
+
+        users = await user_repository.get_users(
+            role=UserRole.ADMIN,
+            is_activated=True,
+            created_after=datetime(2024, 1, 1),
+            created_before=datetime(2024, 1, 4),
+        )
+
+        assert [user.id for user in users] == ["a"]
+
     async def test_get_users_returns_correct_users_with_organization_id(
         self,
         user_repository: UserRepository,
@@ -0,0 +1,119 @@
+import json
+from datetime import datetime
+from typing import List
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.apps.auth.repository.users import SQLUserRepository
+from src.lib_auth.roles import UserRole
+from src.lib_utils.pagination import KeysetCursor
+
+ORGANIZATIONS = 50
+USERS = 20_000
+
+SEED_ORGANIZATIONS = """
+INSERT INTO organizations (id, name, role, description)
+SELECT 'org' || i, 'organization ' || i, 'platform_user', 'seeded'
+FROM generate_series(1, :organizations) AS i
+"""
+
+SEED_USERS = """
+INSERT INTO users (
+    id, email, hashed_password, first_name, last_name, is_activated,
+    is_confirmed, confirmation_token, role, organization_id, created_at, updated_at
+)
+SELECT
+    'user' || i, 'user' || i || '@example.com', 'seeded', 'first', 'last',
+    i % 3 = 0, i % 5 = 0, 'seeded', CASE WHEN i % 10 = 0 THEN 'admin' ELSE 'user' END,
+    'org' || (i % :organizations + 1),
+    timestamp '2024-01-01' + make_interval(mins => i), now()
+FROM generate_series(1, :users) AS i
+"""
+
+
+def scanned_relations(plan: dict) -> List[tuple[str, str]]:
+    scans = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if "Relation Name" in node:
+            scans.append((node["Node Type"], node["Relation Name"]))
+        stack.extend(node.get("Plans", []))
+    return scans
+
+
+class TestGetUsersQueryPlans:
+    @pytest.fixture(scope="function")
+    async def seeded_users(self, async_session: AsyncSession, ensure_clean_db: None):
+        await async_session.execute(
+            text(SEED_ORGANIZATIONS), {"organizations": ORGANIZATIONS}
+        )
+        await async_session.execute(
+            text(SEED_USERS), {"users": USERS, "organizations": ORGANIZATIONS}
+        )
+        await async_session.commit()
+        await async_session.execute(text("ANALYZE users"))
+        await async_session.execute(text("ANALYZE organizations"))
+
+    async def explain(self, async_session: AsyncSession, **filters) -> dict:
+        query = SQLUserRepository(async_session).build_get_users_query(
+            limit=50, **filters
+        )
+        sql = query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        result = await async_session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        plan = result.scalar_one()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return plan[0]["Plan"]
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            {"organization_id": "org7"},
+            {
+                "organization_id": "org7",
+                "after": KeysetCursor(created_at=datetime(2024, 1, 5), id="user1"),
+            },
+            {
+                "organization_id": "org7",
+                "created_after": datetime(2024, 1, 3),
+                "created_before": datetime(2024, 1, 6),
+            },
+            {
+                "organization_id": "org7",
+                "role": UserRole.ADMIN,
+                "is_activated": True,
+                "is_confirmed": False,
+            },
+            {
+                "created_after": datetime(2024, 1, 3),
+                "created_before": datetime(2024, 1, 4),
+            },
+            {"after": KeysetCursor(created_at=datetime(2024, 1, 10), id="user1")},
+        ],
+    )
+    async def test_users_are_read_from_an_index(
+        self, async_session: AsyncSession, seeded_users: None, filters: dict
+    ):
+        plan = await self.explain(async_session, **filters)
+
+        users_scans = [
+            node_type
+            for node_type, relation in scanned_relations(plan)
+            if relation == "users"
+        ]
+        assert users_scans
+        assert "Seq Scan" not in users_scans
+
+    async def test_organization_filter_uses_organization_index(
+        self, async_session: AsyncSession, seeded_users: None
+    ):
+        plan = await self.explain(async_session, organization_id="org7")
+
+        assert "index_users_on_organization_id_and_created_at_and_id" in json.dumps(
+            plan
+        )
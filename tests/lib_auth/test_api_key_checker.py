@@ -0,0 +1,58 @@
+import pytest
+
+from src.lib_auth.api_key_checker import (
+    APIEndpoint,
+    APIKey,
+    APIKeyChecker,
+    APIKeyConfig,
+    InvalidAPIKeyError,
+)
+
+
+def build_checker() -> APIKeyChecker:
+    return APIKeyChecker(
+        APIKeyConfig(
+            api_keys=[
+                APIKey(
+                    key="gateway",
+                    allowed_endpoints=[
+                        APIEndpoint(
+                            app="auth", method="POST", endpoint="/v1/tokens/introspect"
+                        )
+                    ],
+                ),
+                APIKey(
+                    key="admin",
+                    allowed_endpoints=[APIEndpoint(app="*", method="*", endpoint="*")],
+                ),
+            ]
+        )
+    )
+
+
+class TestAPIKeyChecker:
+    def test_allowed_endpoint_passes(self):
+        build_checker().check(
+            "gateway",
+            APIEndpoint(app="auth", method="POST", endpoint="/v1/tokens/introspect"),
+        )
+
+    def test_wildcard_endpoint_passes(self):
+        build_checker().check(
+            "admin", APIEndpoint(app="auth", method="GET", endpoint="/v1/users")
+        )
+
+    def test_unknown_key_is_rejected(self):
+        with pytest.raises(InvalidAPIKeyError):
+            build_checker().check(
+                "unknown",
+                APIEndpoint(
+                    app="auth", method="POST", endpoint="/v1/tokens/introspect"
+                ),
+            )
+
+    def test_key_is_rejected_for_other_endpoints(self):
+        with pytest.raises(InvalidAPIKeyError):
+            build_checker().check(
+                "gateway", APIEndpoint(app="auth", method="GET", endpoint="/v1/users")
+            )
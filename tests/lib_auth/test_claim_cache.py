@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from src.lib_auth.claim_cache import VerifiedClaimCache
+from src.lib_auth.jwt import JWTClaim, PayloadClaim
+
+
+def build_claim(jti: str, exp: float | None = None) -> JWTClaim:
+    return JWTClaim(
+        sub="abc",
+        exp=int(exp if exp is not None else time.time() + 3600),
+        iat=int(time.time()),
+        iss="test",
+        jti=jti,
+        custom_claims=PayloadClaim(user_id="abc", role="user"),
+    )
+
+
+class TestVerifiedClaimCache:
+    def test_cached_claim_is_returned(self):
+        cache = VerifiedClaimCache()
+        claim = build_claim("jti-1")
+
+        assert cache.get("token-1") is None
+        cache.put("token-1", claim)
+
+        assert cache.get("token-1") is claim
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_least_recently_used_claim_is_evicted(self):
+        cache = VerifiedClaimCache(max_entries=2)
+        cache.put("token-1", build_claim("jti-1"))
+        cache.put("token-2", build_claim("jti-2"))
+
+        # token-1 becomes the most recently used
+        assert cache.get("token-1")
+        cache.put("token-3", build_claim("jti-3"))
+
+        assert cache.get("token-1")
+        assert cache.get("token-2") is None
+        assert cache.get("token-3")
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["size"] == 2
+
+    def test_claim_is_not_served_past_token_expiry(self):
+        cache = VerifiedClaimCache()
+        cache.put("token-1", build_claim("jti-1", exp=time.time() - 1))
+
+        assert cache.get("token-1") is None
+        assert cache.stats()["expirations"] == 1
+        assert cache.stats()["size"] == 0
+
+    def test_claim_is_not_served_past_ttl(self):
+        cache = VerifiedClaimCache(ttl_seconds=0)
+        cache.put("token-1", build_claim("jti-1"))
+
+        assert cache.get("token-1") is None
+
+    def test_claim_is_not_served_past_not_after(self):
+        cache = VerifiedClaimCache()
+        cache.put("token-1", build_claim("jti-1"), not_after=time.time() - 1)
+        cache.put("token-2", build_claim("jti-2"), not_after=time.time() + 60)
+
+        assert cache.get("token-1") is None
+        assert cache.get("token-2")
+
+    def test_invalidate_jti_removes_claim(self):
+        cache = VerifiedClaimCache()
+        cache.put("token-1", build_claim("jti-1"))
+        cache.put("token-2", build_claim("jti-2"))
+
+        cache.invalidate_jti("jti-1")
+        cache.invalidate_jti("unknown")
+
+        assert cache.get("token-1") is None
+        assert cache.get("token-2")
+        assert cache.stats()["invalidations"] == 1
+
+    def test_clear_removes_all_claims(self):
+        cache = VerifiedClaimCache()
+        cache.put("token-1", build_claim("jti-1"))
+        cache.put("token-2", build_claim("jti-2"))
+
+        cache.clear()
+
+        assert cache.get("token-1") is None
+        assert cache.get("token-2") is None
+        assert cache.stats()["size"] == 0
+
+    def test_max_entries_must_be_positive(self):
+        with pytest.raises(ValueError):
+            VerifiedClaimCache(max_entries=0)
@@ -0,0 +1,91 @@
+import time
+
+from src.lib_auth.claim_cache import VerifiedClaimCache
+from src.lib_auth.introspection import TokenVerifier
+from src.lib_auth.jwt import (
+    JWTAlgorithm,
+    build_jwt_claim,
+    create_jwt_token,
+    make_jwt_decode_service,
+    make_jwt_signing_service,
+)
+from src.lib_auth.revocation import TokenRevocationList
+from tests.test_utils.jwt import generate_test_key_pair
+
+
+class CountingDecodeService:
+    def __init__(self, public_key_pem: str):
+        self.__decode_service = make_jwt_decode_service(
+            JWTAlgorithm.ES256, public_key_pem
+        )
+        self.calls = 0
+
+    def decode(self, jwt: str) -> dict:
+        self.calls += 1
+        return self.__decode_service.decode(jwt)
+
+
+class TestTokenVerifier:
+    def setup_method(self):
+        private_key_pem, public_key_pem = generate_test_key_pair(
+            JWTAlgorithm.ES256, "a_weak_password"
+        )
+        self.signing_service = make_jwt_signing_service(
+            JWTAlgorithm.ES256, private_key_pem, "a_weak_password"
+        )
+        self.decode_service = CountingDecodeService(public_key_pem)
+
+    def create_token(self, user_id: str) -> str:
+        return create_jwt_token(
+            build_jwt_claim(user_id=user_id, role="user", issuer="test"),
+            self.signing_service,
+        )
+
+    def test_introspect_returns_one_result_per_token_in_order(self):
+        verifier = TokenVerifier(self.decode_service)
+        token_1, token_2 = self.create_token("user-1"), self.create_token("user-2")
+
+        introspections = verifier.introspect([token_1, "not-a-token", token_2])
+
+        assert [introspection.active for introspection in introspections] == [
+            True,
+            False,
+            True,
+        ]
+        assert introspections[0].claim.sub == "user-1"  # type: ignore
+        assert introspections[1].claim is None
+        assert introspections[2].claim.sub == "user-2"  # type: ignore
+
+    def test_repeated_tokens_are_verified_once(self):
+        verifier = TokenVerifier(self.decode_service)
+        token = self.create_token("user-1")
+
+        introspections = verifier.introspect([token, token, token])
+
+        assert all(introspection.active for introspection in introspections)
+        assert self.decode_service.calls == 1
+
+    def test_cached_claims_are_not_decoded_again(self):
+        verifier = TokenVerifier(self.decode_service, claim_cache=VerifiedClaimCache())
+        token = self.create_token("user-1")
+
+        verifier.verify(token)
+        verifier.introspect([token])
+
+        assert self.decode_service.calls == 1
+
+    def test_revoked_tokens_are_inactive(self):
+        claim_cache = VerifiedClaimCache()
+        revocation_list = TokenRevocationList()
+        verifier = TokenVerifier(
+            self.decode_service,
+            claim_cache=claim_cache,
+            revocation_list=revocation_list,
+        )
+        token = self.create_token("user-1")
+        claim = verifier.verify(token)
+
+        revocation_list.add(claim.jti, time.time() + 3600)
+
+        # the cached claim must not be served for a revoked token
+        assert verifier.introspect([token])[0].active is False
@@ -0,0 +1,80 @@
+import json
+import time
+
+from src.lib_auth.jwks import JWKSDocument
+from src.lib_auth.jwt import JWTAlgorithm, make_jwt_decode_service
+from src.lib_auth.jwt_keys import JWTKeySet, JWTVerificationKey
+from tests.test_utils.jwt import generate_test_key_pair
+
+
+def build_key(kid: str, not_after: float | None = None) -> JWTVerificationKey:
+    _, public_key_pem = generate_test_key_pair(JWTAlgorithm.EDDSA, "a_password")
+    return JWTVerificationKey(
+        kid=kid,
+        decode_service=make_jwt_decode_service(JWTAlgorithm.EDDSA, public_key_pem),
+        not_after=not_after,
+    )
+
+
+class TestJWKSDocument:
+    def test_document_lists_verification_keys(self):
+        document = JWKSDocument(JWTKeySet([build_key("key-1"), build_key("key-2")]))
+
+        body, etag = document.get()
+
+        keys = json.loads(body)["keys"]
+        assert [key["kid"] for key in keys] == ["key-1", "key-2"]
+        assert all(key["kty"] == "OKP" and key["alg"] == "EdDSA" for key in keys)
+        assert all("d" not in key for key in keys)
+        assert etag.startswith('"') and etag.endswith('"')
+
+    def test_document_is_serialized_once(self):
+        document = JWKSDocument(JWTKeySet([build_key("key-1")]))
+
+        first_body, first_etag = document.get()
+        second_body, second_etag = document.get()
+
+        assert second_body is first_body
+        assert second_etag == first_etag
+
+    def test_document_changes_with_the_key_set(self):
+        key_set = JWTKeySet([build_key("key-1")])
+        document = JWKSDocument(key_set)
+        _, etag = document.get()
+
+        key_set.add_verification_key(build_key("key-2"))
+        body, new_etag = document.get()
+
+        assert new_etag != etag
+        assert len(json.loads(body)["keys"]) == 2
+
+    def test_retired_key_leaves_the_document(self):
+        key = build_key("old", not_after=time.time() + 60)
+        document = JWKSDocument(JWTKeySet([key, build_key("new")]))
+        body, _ = document.get()
+        assert len(json.loads(body)["keys"]) == 2
+
+        key.not_after = time.time() - 1
+        document.invalidate()
+        body, _ = document.get()
+
+        assert [key["kid"] for key in json.loads(body)["keys"]] == ["new"]
+
+    def test_max_age_is_capped_at_the_earliest_retirement(self):
+        document = JWKSDocument(
+            JWTKeySet(
+                [
+                    build_key("old", not_after=time.time() + 120.5),
+                    build_key("older", not_after=time.time() + 60.5),
+                    build_key("new"),
+                ]
+            )
+        )
+
+        assert document.max_age(3600) == 60
+        assert document.max_age(30) == 30
+
+    def test_max_age_without_retiring_keys(self):
+        document = JWKSDocument(JWTKeySet([build_key("key-1")]))
+
+        assert document.max_age(3600) == 3600
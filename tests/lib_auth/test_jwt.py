@@ -0,0 +1,313 @@
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import jwt as pyjwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from src.lib_auth.jwt import (
+    COMPACT_CLAIM_VERSION,
+    JWTAlgorithm,
+    JWTException,
+    RSA256JWTDecodeService,
+    RSA256JWTSigningService,
+    build_jwt_claim,
+    create_jwt_token,
+    decode_and_verify_jwt_token,
+    make_jwt_decode_service,
+    make_jwt_signing_service,
+)
+from tests.test_utils.jwt import generate_test_key_pair
+
+KEY_PASSWORD = "a_test_password"
+DECODES = 300
+
+
+@pytest.fixture(scope="module")
+def key_pair() -> tuple[str, str]:
+    return generate_test_key_pair(JWTAlgorithm.RS256, KEY_PASSWORD)
+
+
+def sign(private_key_pem: str, **payload) -> str:
+    return RSA256JWTSigningService(private_key_pem, KEY_PASSWORD).generate(
+        {"sub": "abc", "exp": int(datetime.now().timestamp()) + 3600, **payload}
+    )
+
+
+class TestRSA256JWTDecodeService:
+    def test_decodes_a_signed_token(self, key_pair: tuple[str, str]):
+        private_key_pem, public_key_pem = key_pair
+
+        payload = RSA256JWTDecodeService(public_key_pem).decode(sign(private_key_pem))
+
+        assert payload["sub"] == "abc"
+
+    def test_expired_token_raises_error(self, key_pair: tuple[str, str]):
+        private_key_pem, public_key_pem = key_pair
+
+        with pytest.raises(JWTException, match="JWT expired"):
+            RSA256JWTDecodeService(public_key_pem).decode(sign(private_key_pem, exp=1))
+
+    def test_tampered_token_raises_error(self, key_pair: tuple[str, str]):
+        private_key_pem, public_key_pem = key_pair
+        header, payload, signature = sign(private_key_pem).split(".")
+        tampered = ".".join([header, payload, signature[::-1]])
+
+        with pytest.raises(JWTException):
+            RSA256JWTDecodeService(public_key_pem).decode(tampered)
+
+    def test_public_key_is_parsed_once(self, key_pair: tuple[str, str], monkeypatch):
+        private_key_pem, public_key_pem = key_pair
+        token = sign(private_key_pem)
+        decode_service = RSA256JWTDecodeService(public_key_pem)
+
+        def load_pem_public_key(*args, **kwargs):
+            raise AssertionError("the public key is parsed again")
+
+        # pyjwt parses a PEM key with its own import of the loader
+        monkeypatch.setattr(serialization, "load_pem_public_key", load_pem_public_key)
+        monkeypatch.setattr(
+            pyjwt.algorithms, "load_pem_public_key", load_pem_public_key
+        )
+        decode_service.decode(token)
+        decode_service.decode(token)
+
+    def test_invalid_public_key_raises_error(self):
+        with pytest.raises(JWTException, match="Cannot load the public key"):
+            RSA256JWTDecodeService("not a pem")
+
+
+class TestJWTAlgorithms:
+    @pytest.mark.parametrize("algorithm", list(JWTAlgorithm))
+    def test_signed_token_is_decoded(self, algorithm: JWTAlgorithm):
+        private_key_pem, public_key_pem = generate_test_key_pair(
+            algorithm, KEY_PASSWORD
+        )
+        token = make_jwt_signing_service(
+            algorithm, private_key_pem, KEY_PASSWORD
+        ).generate({"sub": "abc", "exp": int(datetime.now().timestamp()) + 3600})
+
+        payload = make_jwt_decode_service(algorithm, public_key_pem).decode(token)
+
+        assert payload["sub"] == "abc"
+        assert pyjwt.get_unverified_header(token)["alg"] == algorithm
+
+    @pytest.mark.parametrize("algorithm", [JWTAlgorithm.ES256, JWTAlgorithm.EDDSA])
+    def test_token_is_smaller_than_rs256(self, algorithm: JWTAlgorithm):
+        payload = {"sub": "abc", "exp": int(datetime.now().timestamp()) + 3600}
+
+        def token_bytes(algorithm: JWTAlgorithm) -> int:
+            private_key_pem, _ = generate_test_key_pair(algorithm, KEY_PASSWORD)
+            return len(
+                make_jwt_signing_service(
+                    algorithm, private_key_pem, KEY_PASSWORD
+                ).generate(payload)
+            )
+
+        assert token_bytes(algorithm) < token_bytes(JWTAlgorithm.RS256)
+
+    def test_token_of_another_algorithm_is_rejected(self):
+        private_key_pem, _ = generate_test_key_pair(JWTAlgorithm.ES256, KEY_PASSWORD)
+        _, public_key_pem = generate_test_key_pair(JWTAlgorithm.EDDSA, KEY_PASSWORD)
+        token = make_jwt_signing_service(
+            JWTAlgorithm.ES256, private_key_pem, KEY_PASSWORD
+        ).generate({"sub": "abc"})
+
+        with pytest.raises(JWTException):
+            make_jwt_decode_service(JWTAlgorithm.EDDSA, public_key_pem).decode(token)
+
+    def test_key_of_another_algorithm_raises_error(self):
+        private_key_pem, public_key_pem = generate_test_key_pair(
+            JWTAlgorithm.RS256, KEY_PASSWORD
+        )
+
+        with pytest.raises(JWTException, match="not a ES256 key"):
+            make_jwt_signing_service(JWTAlgorithm.ES256, private_key_pem, KEY_PASSWORD)
+        with pytest.raises(JWTException, match="not a EdDSA key"):
+            make_jwt_decode_service(JWTAlgorithm.EDDSA, public_key_pem)
+
+    def test_ecdsa_key_on_another_curve_raises_error(self):
+        public_key_pem = (
+            ec.generate_private_key(ec.SECP384R1())
+            .public_key()
+            .public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+            .decode()
+        )
+
+        with pytest.raises(JWTException, match="not a ES256 key"):
+            make_jwt_decode_service(JWTAlgorithm.ES256, public_key_pem)
+
+
+@pytest.mark.benchmark
+class TestRSA256JWTDecodeBenchmark:
+    def test_preloaded_key_decode_throughput(self, key_pair: tuple[str, str]):
+        private_key_pem, public_key_pem = key_pair
+        token = sign(private_key_pem)
+
+        # before: the PEM string goes to pyjwt, which parses it on each call
+        start = time.perf_counter()
+        for _ in range(DECODES):
+            pyjwt.decode(token, public_key_pem, algorithms=["RS256"])
+        pem_seconds = time.perf_counter() - start
+
+        decode_service = RSA256JWTDecodeService(public_key_pem)
+        start = time.perf_counter()
+        for _ in range(DECODES):
+            decode_service.decode(token)
+        preloaded_seconds = time.perf_counter() - start
+
+        print(
+            f"\n{DECODES} RS256 decodes: "
+            f"pem per call {DECODES / pem_seconds:.0f}/s, "
+            f"preloaded key {DECODES / preloaded_seconds:.0f}/s"
+        )
+
+        assert preloaded_seconds < pem_seconds
+
+
+@pytest.mark.benchmark
+class TestJWTAlgorithmBenchmark:
+    def test_sign_and_verify_throughput_and_token_size(self):
+        payload = {
+            "sub": "abc",
+            "exp": int(datetime.now().timestamp()) + 3600,
+            "custom_claims": {"user_id": "abc", "role": "user"},
+        }
+        report = {}
+
+        for algorithm in JWTAlgorithm:
+            private_key_pem, public_key_pem = generate_test_key_pair(
+                algorithm, KEY_PASSWORD
+            )
+            signing_service = make_jwt_signing_service(
+                algorithm, private_key_pem, KEY_PASSWORD
+            )
+            decode_service = make_jwt_decode_service(algorithm, public_key_pem)
+
+            start = time.perf_counter()
+            for _ in range(DECODES):
+                token = signing_service.generate(payload)
+            sign_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(DECODES):
+                decode_service.decode(token)
+            verify_seconds = time.perf_counter() - start
+
+            report[algorithm] = (
+                DECODES / sign_seconds,
+                DECODES / verify_seconds,
+                len(token),
+            )
+
+        print()
+        for algorithm, (signs, verifies, token_bytes) in report.items():
+            print(
+                f"{algorithm}: sign {signs:.0f}/s, verify {verifies:.0f}/s, "
+                f"token {token_bytes} bytes"
+            )
+
+        rs256_signs, _, _ = report[JWTAlgorithm.RS256]
+        for algorithm in (JWTAlgorithm.ES256, JWTAlgorithm.EDDSA):
+            signs, _, _ = report[algorithm]
+            assert signs > rs256_signs
+
+
+def build_claim(with_organization: bool = True, with_impersonator: bool = False):
+    return build_jwt_claim(
+        user_id=uuid4().hex,
+        role="user",
+        issuer="test",
+        organization_id=uuid4().hex if with_organization else None,
+        organization_role="platform_user" if with_organization else None,
+        impersonator_user_id=uuid4().hex if with_impersonator else None,
+        impersonator_user_role="admin" if with_impersonator else None,
+        impersonator_organization_id=uuid4().hex if with_impersonator else None,
+        impersonator_organization_role=(
+            "platform_owner" if with_impersonator else None
+        ),
+    )
+
+
+class TestCompactClaims:
+    @pytest.mark.parametrize("with_organization", [True, False])
+    @pytest.mark.parametrize("with_impersonator", [True, False])
+    @pytest.mark.parametrize("compact", [True, False])
+    def test_claim_round_trips(
+        self,
+        key_pair: tuple[str, str],
+        with_organization: bool,
+        with_impersonator: bool,
+        compact: bool,
+    ):
+        private_key_pem, public_key_pem = key_pair
+        claim = build_claim(with_organization, with_impersonator)
+
+        token = create_jwt_token(
+            claim, RSA256JWTSigningService(private_key_pem, KEY_PASSWORD), compact
+        )
+
+        assert (
+            decode_and_verify_jwt_token(token, RSA256JWTDecodeService(public_key_pem))
+            == claim
+        )
+
+    def test_compact_claim_omits_nulls_and_user_id(self):
+        claim = build_claim(with_organization=False)
+
+        compact = claim.as_compact_dict()
+
+        assert compact == {
+            "v": COMPACT_CLAIM_VERSION,
+            "sub": claim.sub,
+            "exp": claim.exp,
+            "iat": claim.iat,
+            "iss": claim.iss,
+            "jti": claim.jti,
+            "rl": "user",
+        }
+
+    def test_jti_is_128_bits(self):
+        assert len(build_claim().jti) == 22
+
+    def test_payload_with_missing_claims_raises_error(self, key_pair: tuple[str, str]):
+        private_key_pem, public_key_pem = key_pair
+        token = sign(private_key_pem, v=COMPACT_CLAIM_VERSION)
+
+        with pytest.raises(JWTException):
+            decode_and_verify_jwt_token(token, RSA256JWTDecodeService(public_key_pem))
+
+
+class TestCompactClaimBenchmark:
+    def test_token_size_and_decode_time(self, key_pair: tuple[str, str]):
+        private_key_pem, public_key_pem = key_pair
+        signing_service = RSA256JWTSigningService(private_key_pem, KEY_PASSWORD)
+        decode_service = RSA256JWTDecodeService(public_key_pem)
+        claim = build_claim()
+        report = {}
+
+        for compact in (False, True):
+            token = create_jwt_token(claim, signing_service, compact)
+
+            start = time.perf_counter()
+            for _ in range(DECODES):
+                decode_and_verify_jwt_token(token, decode_service)
+            seconds = time.perf_counter() - start
+
+            payload_bytes = len(token.split(".")[1])
+            report[compact] = (len(token), payload_bytes, seconds / DECODES)
+
+        print()
+        for compact, (token_bytes, payload_bytes, seconds) in report.items():
+            print(
+                f"{'compact' if compact else 'original'} claims: "
+                f"token {token_bytes} bytes (payload {payload_bytes}), "
+                f"decode and verify {seconds * 1_000_000:.0f}us"
+            )
+
+        assert report[True][0] < report[False][0]
@@ -0,0 +1,128 @@
+import time
+
+import jwt as pyjwt
+import pytest
+
+from src.lib_auth.jwt import (
+    JWTAlgorithm,
+    JWTException,
+    JWTSigningService,
+    jwk_thumbprint,
+    make_jwt_decode_service,
+    make_jwt_signing_service,
+)
+from src.lib_auth.jwt_keys import JWTKeySet, JWTVerificationKey
+from tests.test_utils.jwt import generate_test_key_pair
+
+KEY_PASSWORD = "a_test_password"
+
+
+def build_key(
+    kid: str, not_after: float | None = None
+) -> tuple[JWTVerificationKey, JWTSigningService]:
+    private_key_pem, public_key_pem = generate_test_key_pair(
+        JWTAlgorithm.ES256, KEY_PASSWORD
+    )
+    return (
+        JWTVerificationKey(
+            kid=kid,
+            decode_service=make_jwt_decode_service(JWTAlgorithm.ES256, public_key_pem),
+            not_after=not_after,
+        ),
+        make_jwt_signing_service(JWTAlgorithm.ES256, private_key_pem, KEY_PASSWORD),
+    )
+
+
+class TestJWTKeySet:
+    def test_generated_token_carries_signing_kid(self):
+        key, signing_service = build_key("key-1")
+        key_set = JWTKeySet([key])
+        key_set.set_signing_key("key-1", signing_service)
+
+        token = key_set.generate({"sub": "abc"})
+
+        assert pyjwt.get_unverified_header(token)["kid"] == "key-1"
+        assert key_set.decode(token)["sub"] == "abc"
+
+    def test_tokens_of_previous_key_verify_during_overlap(self):
+        old_key, old_signing_service = build_key("old", not_after=time.time() + 60)
+        new_key, new_signing_service = build_key("new")
+        key_set = JWTKeySet([old_key])
+        key_set.set_signing_key("old", old_signing_service)
+        old_token = key_set.generate({"sub": "old"})
+
+        key_set.add_verification_key(new_key)
+        key_set.set_signing_key("new", new_signing_service)
+        new_token = key_set.generate({"sub": "new"})
+
+        assert key_set.decode(old_token)["sub"] == "old"
+        assert key_set.decode(new_token)["sub"] == "new"
+        assert key_set.key_not_after(old_token) == old_key.not_after
+        assert key_set.key_not_after(new_token) is None
+
+    def test_tokens_of_retired_key_are_rejected(self):
+        key, signing_service = build_key("old")
+        token = signing_service.generate({"sub": "abc"}, headers={"kid": "old"})
+        key.not_after = time.time() - 1
+        key_set = JWTKeySet([key])
+
+        with pytest.raises(JWTException, match="JWT key retired"):
+            key_set.decode(token)
+        assert key_set.verification_keys() == []
+
+    def test_tokens_of_unknown_kid_are_rejected(self):
+        key, _ = build_key("key-1")
+        _, other_signing_service = build_key("key-2")
+        token = other_signing_service.generate({"sub": "abc"}, headers={"kid": "key-2"})
+
+        with pytest.raises(JWTException, match="Unknown JWT key"):
+            JWTKeySet([key]).decode(token)
+
+    def test_tokens_without_kid_use_legacy_kid(self):
+        key, signing_service = build_key("key-1")
+        token = signing_service.generate({"sub": "abc"})
+
+        assert JWTKeySet([key], legacy_kid="key-1").decode(token)["sub"] == "abc"
+        with pytest.raises(JWTException, match="Unknown JWT key"):
+            JWTKeySet([key]).decode(token)
+
+    def test_signing_key_must_be_a_verification_key(self):
+        _, signing_service = build_key("key-1")
+
+        with pytest.raises(JWTException):
+            JWTKeySet().set_signing_key("key-1", signing_service)
+
+    def test_signing_key_cannot_be_removed(self):
+        key, signing_service = build_key("key-1")
+        key_set = JWTKeySet([key])
+        key_set.set_signing_key("key-1", signing_service)
+
+        with pytest.raises(JWTException):
+            key_set.remove_verification_key("key-1")
+
+    def test_subscribers_are_notified_of_changes(self):
+        key_1, signing_service = build_key("key-1")
+        key_2, _ = build_key("key-2")
+        key_set = JWTKeySet([key_1])
+        changes = []
+        key_set.subscribe(lambda: changes.append(True))
+
+        key_set.add_verification_key(key_2)
+        key_set.set_signing_key("key-1", signing_service)
+        key_set.remove_verification_key("key-2")
+
+        assert len(changes) == 3
+
+
+class TestJWKThumbprint:
+    def test_rfc_7638_example(self):
+        # the example key of RFC 7638 section 3.1
+        jwk = {
+            "kty": "RSA",
+            "n": "0vx7agoebGcQSuuPiLJXZptN9nndrQmbXEps2aiAFbWhM78LhWx4cbbfAAtVT86zwu1RK7aPFFxuhDR1L6tSoc_BJECPebWKRXjBZCiFV4n3oknjhMstn64tZ_2W-5JsGY4Hc5n9yBXArwl93lqt7_RN5w6Cf0h4QyQ5v-65YGjQR0_FDW2QvzqY368QQMicAtaSqzs8KJZgnYb9c7d0zgdAZHzu6qMQvRL5hajrn1n91CbOpbISD08qNLyrdkt-bFTWhAI4vMQFh6WeZu0fM4lFd2NcRwr3XPksINHaQ-G_xBniIqbw0Ls1jF44-csFCur-kEgU8awapJzKnqDKgw",
+            "e": "AQAB",
+            "alg": "RS256",
+            "kid": "2011-04-29",
+        }
+
+        assert jwk_thumbprint(jwk) == "NzbLsXh8uDCcd-6MNwXF4W_7noWXFZAfHkxZsRGC9Xs"
@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import scrypt
+
+import pytest
+
+from src.lib_auth import password
+from src.lib_auth.password import (
+    Argon2Parameters,
+    InvalidPasswordException,
+    InvalidPasswordHashException,
+    PasswordHashingBackend,
+    ScryptParameters,
+    async_hash_password,
+    async_verify_password,
+    get_password_hash_parameters,
+    hash_password,
+    make_password_executor,
+    password_needs_rehash,
+    set_password_executor,
+    set_password_hash_parameters,
+    verify_password,
+    warm_password_executor,
+)
+
+PASSWORD = "test_password_123_$$%"
+CHEAP_SCRYPT = ScryptParameters(n=2**10, r=8, p=1)
+CHEAP_ARGON2 = Argon2Parameters(time_cost=1, memory_cost=1024, parallelism=1)
+
+
+@pytest.fixture
+def restore_password_hash_parameters():
+    parameters = get_password_hash_parameters()
+    yield
+    set_password_hash_parameters(parameters)
+
+
+class TestPasswordHashFormat:
+    def test_hash_carries_its_parameters(self):
+        hashed_password = hash_password(PASSWORD, CHEAP_SCRYPT)
+
+        assert hashed_password.startswith("scrypt/n=1024,r=8,p=1/")
+        assert verify_password(PASSWORD, hashed_password)
+
+    def test_legacy_hash_is_verified(self):
+        salt = b"s" * 32
+        key = scrypt(PASSWORD.encode(), salt=salt, n=2**14, r=8, p=1, dklen=64)
+        hashed_password = f"scrypt/{salt.hex()}/{key.hex()}"
+
+        assert verify_password(PASSWORD, hashed_password)
+        with pytest.raises(InvalidPasswordException):
+            verify_password("wrong_password_123_$$%", hashed_password)
+
+    def test_memory_hungry_parameters_are_allowed(self):
+        hashed_password = hash_password(PASSWORD, ScryptParameters(n=2**15, r=8, p=1))
+
+        assert verify_password(PASSWORD, hashed_password)
+
+    @pytest.mark.parametrize(
+        "hashed_password",
+        [
+            "scrypt/abc",
+            "md5/n=1024,r=8,p=1/00/00",
+            "scrypt/n=1024,r=8/00/00",
+            "scrypt/n=1024,r=8,p=1/zz/00",
+        ],
+    )
+    def test_malformed_hash_is_rejected(self, hashed_password: str):
+        with pytest.raises(InvalidPasswordHashException):
+            verify_password(PASSWORD, hashed_password)
+
+    def test_argon2id_hash_is_verified(self):
+        pytest.importorskip("argon2")
+
+        hashed_password = hash_password(PASSWORD, CHEAP_ARGON2)
+
+        assert hashed_password.startswith("argon2id/t=1,m=1024,p=1/")
+        assert verify_password(PASSWORD, hashed_password)
+        with pytest.raises(InvalidPasswordException):
+            verify_password("wrong_password_123_$$%", hashed_password)
+
+
+class TestPasswordNeedsRehash:
+    def test_hash_with_current_parameters_is_kept(
+        self, restore_password_hash_parameters
+    ):
+        set_password_hash_parameters(CHEAP_SCRYPT)
+
+        assert not password_needs_rehash(hash_password(PASSWORD))
+
+    def test_hash_with_other_parameters_needs_rehash(
+        self, restore_password_hash_parameters
+    ):
+        hashed_password = hash_password(PASSWORD, CHEAP_SCRYPT)
+        set_password_hash_parameters(ScryptParameters(n=2**11, r=8, p=1))
+
+        assert password_needs_rehash(hashed_password)
+
+    def test_legacy_hash_needs_rehash_only_when_parameters_differ(
+        self, restore_password_hash_parameters
+    ):
+        legacy_hashed_password = f"scrypt/{'00' * 32}/{'00' * 64}"
+
+        set_password_hash_parameters(ScryptParameters(n=2**14, r=8, p=1))
+        assert not password_needs_rehash(legacy_hashed_password)
+
+        set_password_hash_parameters(CHEAP_SCRYPT)
+        assert password_needs_rehash(legacy_hashed_password)
+
+    def test_hash_with_other_algorithm_needs_rehash(
+        self, restore_password_hash_parameters
+    ):
+        pytest.importorskip("argon2")
+        set_password_hash_parameters(CHEAP_ARGON2)
+
+        assert password_needs_rehash(hash_password(PASSWORD, CHEAP_SCRYPT))
+
+
+class TestAsyncPassword:
+    async def test_async_hash_is_verified(self):
+        hashed_password = await async_hash_password(PASSWORD)
+
+        assert await async_verify_password(PASSWORD, hashed_password)
+        assert verify_password(PASSWORD, hashed_password)
+
+    async def test_async_verify_rejects_wrong_password(self):
+        hashed_password = await async_hash_password(PASSWORD)
+
+        with pytest.raises(InvalidPasswordException):
+            await async_verify_password("wrong_password_123_$$%", hashed_password)
+
+    async def test_process_workers_hash_with_the_current_parameters(
+        self, restore_password_hash_parameters
+    ):
+        set_password_hash_parameters(CHEAP_SCRYPT)
+        executor = make_password_executor(PasswordHashingBackend.PROCESS, max_workers=1)
+        previous_executor = set_password_executor(executor)
+        try:
+            hashed_password = await async_hash_password(PASSWORD)
+        finally:
+            set_password_executor(previous_executor)
+            executor.shutdown()
+
+        assert hashed_password.startswith("scrypt/n=1024,r=8,p=1/")
+
+    async def test_hashes_run_on_the_password_executor(self, monkeypatch):
+        thread_names = []
+
+        def hash_password(password: str, *args) -> str:
+            thread_names.append(threading.current_thread().name)
+            return password
+
+        monkeypatch.setattr(password, "hash_password", hash_password)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="test-password")
+        previous_executor = set_password_executor(executor)
+        try:
+            await async_hash_password(PASSWORD)
+        finally:
+            set_password_executor(previous_executor)
+            executor.shutdown()
+
+        assert thread_names == ["test-password_0"]
+
+    async def test_process_backend_hashes_and_verifies(self):
+        executor = make_password_executor(PasswordHashingBackend.PROCESS, max_workers=2)
+        previous_executor = set_password_executor(executor, max_pending=4)
+        try:
+            await warm_password_executor(executor, max_workers=2)
+            hashed_password = await async_hash_password(PASSWORD)
+
+            assert await async_verify_password(PASSWORD, hashed_password)
+            with pytest.raises(InvalidPasswordException):
+                await async_verify_password("wrong_password_123_$$%", hashed_password)
+        finally:
+            set_password_executor(previous_executor)
+            executor.shutdown()
+
+    async def test_submissions_beyond_max_pending_wait(self, monkeypatch):
+        pending = 0
+        max_pending = 0
+        lock = threading.Lock()
+
+        def hash_password(password: str, *args) -> str:
+            nonlocal pending, max_pending
+            with lock:
+                pending += 1
+                max_pending = max(max_pending, pending)
+            time.sleep(0.01)
+            with lock:
+                pending -= 1
+            return password
+
+        monkeypatch.setattr(password, "hash_password", hash_password)
+        executor = ThreadPoolExecutor(max_workers=4)
+        previous_executor = set_password_executor(executor, max_pending=2)
+        try:
+            await asyncio.gather(*(async_hash_password(PASSWORD) for _ in range(8)))
+        finally:
+            set_password_executor(previous_executor)
+            executor.shutdown()
+
+        assert max_pending == 2
@@ -0,0 +1,113 @@
+from src.lib_auth.password import Argon2Parameters, ScryptParameters
+from src.lib_auth.password_calibration import (
+    CalibrationResult,
+    benchmark_parameters,
+    build_parameter_grid,
+    main,
+    percentile,
+    recommend,
+)
+
+CHEAP_SCRYPT = ScryptParameters(n=2**10, r=8, p=1)
+
+
+def build_result(
+    parameters: ScryptParameters, latencies_in_ms: list[float]
+) -> CalibrationResult:
+    return CalibrationResult(
+        parameters=parameters,
+        concurrency=2,
+        latencies_in_seconds=[latency / 1000 for latency in latencies_in_ms],
+        wall_seconds=1,
+    )
+
+
+class TestPercentile:
+    def test_nearest_rank(self):
+        values = [float(value) for value in range(1, 101)]
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([3.0, 1.0, 2.0], 99) == 3
+
+
+class TestBuildParameterGrid:
+    def test_scrypt_grid_covers_every_combination(self):
+        grid = build_parameter_grid(
+            scrypt_n=[2**10, 2**11],
+            scrypt_r=[8],
+            scrypt_p=[1, 2],
+            argon2_time_cost=[],
+        )
+
+        assert grid == [
+            ScryptParameters(n=2**10, r=8, p=1),
+            ScryptParameters(n=2**10, r=8, p=2),
+            ScryptParameters(n=2**11, r=8, p=1),
+            ScryptParameters(n=2**11, r=8, p=2),
+        ]
+
+    def test_argon2_grid_is_added_when_available(self, monkeypatch):
+        monkeypatch.setattr(
+            "src.lib_auth.password_calibration.is_argon2_available", lambda: True
+        )
+
+        grid = build_parameter_grid(
+            scrypt_n=[],
+            argon2_time_cost=[1],
+            argon2_memory_cost=[1024],
+            argon2_parallelism=[1],
+        )
+
+        assert grid == [Argon2Parameters(time_cost=1, memory_cost=1024, parallelism=1)]
+
+
+class TestBenchmarkParameters:
+    def test_every_sample_is_measured(self):
+        result = benchmark_parameters(CHEAP_SCRYPT, concurrency=2, samples=5)
+
+        assert len(result.latencies_in_seconds) == 5
+        assert result.logins_per_second > 0
+        assert result.peak_memory_bytes == 2 * CHEAP_SCRYPT.memory_bytes()
+
+
+class TestRecommend:
+    def test_costliest_parameters_within_the_target_are_recommended(self):
+        results = [
+            build_result(ScryptParameters(n=2**13), [40, 50]),
+            build_result(ScryptParameters(n=2**14), [90, 110]),
+            build_result(ScryptParameters(n=2**15), [200, 260]),
+        ]
+
+        recommended = recommend(results, target_p99_ms=150)
+
+        assert recommended is not None
+        assert recommended.parameters == ScryptParameters(n=2**14)
+
+    def test_nothing_is_recommended_when_everything_is_too_slow(self):
+        results = [build_result(ScryptParameters(n=2**15), [200, 260])]
+
+        assert recommend(results, target_p99_ms=150) is None
+
+
+class TestMain:
+    def test_prints_a_config_for_the_recommended_parameters(self, capsys):
+        main(
+            [
+                "--target-ms",
+                "10000",
+                "--concurrency",
+                "2",
+                "--samples",
+                "2",
+                "--scrypt-n",
+                "1024,2048",
+                "--argon2-time-cost",
+                "",
+            ]
+        )
+
+        output = capsys.readouterr().out
+        assert "n=1024,r=8,p=1" in output
+        assert "algorithm: scrypt" in output
+        assert "n: 2048" in output
@@ -0,0 +1,40 @@
+import time
+
+from src.lib_auth.revocation import TokenRevocationList
+
+
+class TestTokenRevocationList:
+    def test_revoked_jti_is_revoked(self):
+        revocation_list = TokenRevocationList()
+
+        revocation_list.add("jti-1", time.time() + 60)
+
+        assert revocation_list.is_revoked("jti-1")
+        assert not revocation_list.is_revoked("jti-2")
+
+    def test_revocation_of_expired_token_is_ignored(self):
+        revocation_list = TokenRevocationList()
+
+        revocation_list.add("jti-1", time.time() - 1)
+
+        assert not revocation_list.is_revoked("jti-1")
+
+    def test_prune_drops_expired_revocations(self):
+        revocation_list = TokenRevocationList()
+        revocation_list.add_all(
+            [("expired", time.time() - 1), ("active", time.time() + 60)]
+        )
+
+        revocation_list.prune()
+
+        assert len(revocation_list) == 1
+        assert revocation_list.is_revoked("active")
+
+    def test_list_grows_past_its_capacity(self):
+        revocation_list = TokenRevocationList(capacity=10)
+        expires_at = time.time() + 60
+
+        revocation_list.add_all((f"jti-{i}", expires_at) for i in range(100))
+
+        assert len(revocation_list) == 100
+        assert all(revocation_list.is_revoked(f"jti-{i}") for i in range(100))
@@ -0,0 +1,12 @@
+from src.lib_db.search import contains_pattern
+
+
+class TestContainsPattern:
+    def test_term_is_wrapped_in_wildcards(self):
+        assert contains_pattern("oly") == "%oly%"
+
+    def test_wildcards_are_escaped(self):
+        assert contains_pattern("a_b%c") == "%a\\_b\\%c%"
+
+    def test_escape_character_is_escaped(self):
+        assert contains_pattern("a\\b") == "%a\\\\b%"
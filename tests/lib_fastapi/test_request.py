@@ -0,0 +1,105 @@
+import asyncio
+from ipaddress import ip_network
+
+import pytest
+from fastapi import HTTPException, Request
+
+from src.lib_fastapi.request import (
+    CLIENT_CLOSED_REQUEST,
+    cancel_on_disconnect,
+    get_client_ip,
+)
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = asyncio.Event()
+
+    async def receive(self) -> dict:
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+
+class TestCancelOnDisconnect:
+    async def test_result_is_returned_while_connected(self):
+        async def work() -> str:
+            return "done"
+
+        assert await cancel_on_disconnect(FakeRequest(), work()) == "done"  # type: ignore[arg-type]
+
+    async def test_work_is_cancelled_when_the_client_disconnects(self):
+        request = FakeRequest()
+        cancelled = asyncio.Event()
+
+        async def work() -> str:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "done"
+
+        asyncio.get_running_loop().call_later(0.01, request.disconnected.set)
+        with pytest.raises(HTTPException) as error:
+            await cancel_on_disconnect(request, work())  # type: ignore[arg-type]
+
+        assert error.value.status_code == CLIENT_CLOSED_REQUEST
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    async def test_errors_of_the_work_are_raised(self):
+        async def work() -> str:
+            raise ValueError("failed")
+
+        with pytest.raises(ValueError):
+            await cancel_on_disconnect(FakeRequest(), work())  # type: ignore[arg-type]
+
+
+TRUSTED_PROXIES = [ip_network("10.0.0.0/8"), ip_network("::1")]
+
+
+def build_request(host: str, *forwarded_for: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "client": (host, 123),
+            "headers": [
+                (b"x-forwarded-for", forwarded.encode()) for forwarded in forwarded_for
+            ],
+        }
+    )
+
+
+class TestGetClientIp:
+    def test_direct_client(self):
+        assert get_client_ip(build_request("203.0.113.1"), TRUSTED_PROXIES) == (
+            "203.0.113.1"
+        )
+
+    def test_forwarded_for_is_ignored_from_untrusted_clients(self):
+        request = build_request("203.0.113.1", "198.51.100.7")
+
+        assert get_client_ip(request, TRUSTED_PROXIES) == "203.0.113.1"
+
+    def test_forwarded_for_is_read_from_trusted_proxies(self):
+        request = build_request("10.0.0.1", "198.51.100.7")
+
+        assert get_client_ip(request, TRUSTED_PROXIES) == "198.51.100.7"
+
+    def test_addresses_sent_by_the_client_are_skipped(self):
+        # the client sent "1.2.3.4", the proxies appended the others
+        request = build_request("10.0.0.1", "1.2.3.4, 198.51.100.7", "10.0.0.2")
+
+        assert get_client_ip(request, TRUSTED_PROXIES) == "198.51.100.7"
+
+    def test_ipv6_proxy(self):
+        request = build_request("::1", "2001:db8::1")
+
+        assert get_client_ip(request, TRUSTED_PROXIES) == "2001:db8::1"
+
+    def test_trusted_proxy_without_forwarded_for(self):
+        assert get_client_ip(build_request("10.0.0.1"), TRUSTED_PROXIES) == "10.0.0.1"
+
+    def test_no_trusted_proxies_by_default(self):
+        request = build_request("10.0.0.1", "198.51.100.7")
+
+        assert get_client_ip(request) == "10.0.0.1"
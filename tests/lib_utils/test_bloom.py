@@ -0,0 +1,31 @@
+import pytest
+
+from src.lib_utils.bloom import BloomFilter
+
+
+class TestBloomFilter:
+    def test_added_items_are_found(self):
+        bloom_filter = BloomFilter(capacity=1000)
+        items = [f"item-{i}" for i in range(1000)]
+
+        for item in items:
+            bloom_filter.add(item)
+
+        assert all(item in bloom_filter for item in items)
+
+    def test_false_positive_rate_is_near_error_rate(self):
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom_filter.add(f"item-{i}")
+
+        false_positives = sum(f"other-{i}" in bloom_filter for i in range(10_000))
+
+        assert false_positives < 10_000 * 0.02
+
+    def test_empty_filter_contains_nothing(self):
+        assert "item" not in BloomFilter(capacity=10)
+
+    @pytest.mark.parametrize("capacity,error_rate", [(0, 0.01), (10, 0), (10, 1)])
+    def test_invalid_parameters_raise_error(self, capacity: int, error_rate: float):
+        with pytest.raises(ValueError):
+            BloomFilter(capacity=capacity, error_rate=error_rate)
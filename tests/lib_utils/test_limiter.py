@@ -0,0 +1,127 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.lib_utils.limiter import ConcurrencyLimiter, ConcurrencyLimitExceededError
+
+
+class TestConcurrencyLimiter:
+    async def test_holders_beyond_the_limit_wait(self):
+        limiter = ConcurrencyLimiter(max_concurrency=2)
+        running = 0
+        max_running = 0
+
+        async def hold():
+            nonlocal running, max_running
+            async with limiter.hold():
+                running += 1
+                max_running = max(max_running, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(hold() for _ in range(6)))
+
+        assert max_running == 2
+        assert limiter.in_flight == 0
+        assert limiter.waiting == 0
+
+    async def test_waiters_are_let_in_first_come_first_served(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+        order = []
+
+        async def hold(index: int):
+            async with limiter.hold():
+                order.append(index)
+                await asyncio.sleep(0)
+
+        await limiter.acquire()
+        tasks = [asyncio.create_task(hold(index)) for index in range(3)]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+        assert order == [0, 1, 2]
+
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert limiter.waiting == 0
+        limiter.release()
+        assert limiter.in_flight == 0
+
+    def test_limiter_is_shared_by_event_loops_of_different_threads(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1)
+        lock = threading.Lock()
+        running = 0
+        max_running = 0
+
+        async def hold():
+            nonlocal running, max_running
+            async with limiter.hold():
+                with lock:
+                    running += 1
+                    max_running = max(max_running, running)
+                await asyncio.sleep(0.01)
+                with lock:
+                    running -= 1
+
+        async def hold_many():
+            await asyncio.gather(*(hold() for _ in range(3)))
+
+        threads = [
+            threading.Thread(target=asyncio.run, args=(hold_many(),)) for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max_running == 1
+        assert limiter.in_flight == 0
+
+    def test_max_concurrency_must_be_positive(self):
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(max_concurrency=0)
+
+    async def test_callers_beyond_max_waiting_are_rejected(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_waiting=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(ConcurrencyLimitExceededError):
+            await limiter.acquire()
+
+        limiter.release()
+        await waiter
+        limiter.release()
+        assert limiter.stats()["rejections"] == 1
+
+    async def test_stats_report_queue_depth_and_wait_time(self):
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_waiting=4)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        stats = limiter.stats()
+        assert stats["in_flight"] == 1
+        assert stats["waiting"] == 1
+
+        await asyncio.sleep(0.01)
+        limiter.release()
+        await waiter
+        limiter.release()
+
+        wait_seconds = limiter.stats()["wait_seconds"]
+        assert wait_seconds["count"] == 2
+        assert wait_seconds["sum"] >= 0.01
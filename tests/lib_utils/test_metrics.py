@@ -0,0 +1,27 @@
+import pytest
+
+from src.lib_utils.metrics import Histogram
+
+
+class TestHistogram:
+    def test_observations_are_counted_cumulatively(self):
+        histogram = Histogram(buckets=[0.1, 1.0])
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        assert histogram.as_dict() == {
+            "count": 3,
+            "sum": 5.55,
+            "buckets": {"0.1": 1, "1.0": 2, "+Inf": 3},
+        }
+
+    def test_value_on_upper_bound_falls_in_bucket(self):
+        histogram = Histogram(buckets=[0.1, 1.0])
+        histogram.observe(0.1)
+
+        assert histogram.as_dict()["buckets"]["0.1"] == 1
+
+    def test_unsorted_buckets_raise_error(self):
+        with pytest.raises(ValueError):
+            Histogram(buckets=[1.0, 0.1])
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+import pytest
+
+from src.lib_utils.pagination import (
+    InvalidCursorError,
+    KeysetCursor,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+class TestKeysetCursor:
+    def test_cursor_round_trip(self):
+        cursor = KeysetCursor(
+            created_at=datetime(2024, 4, 13, 14, 59, 8, 123456), id="abc"
+        )
+
+        assert decode_cursor(encode_cursor(cursor)) == cursor
+
+    def test_cursor_is_url_safe(self):
+        cursor = KeysetCursor(created_at=datetime(2024, 4, 13), id="???>>>")
+
+        encoded = encode_cursor(cursor)
+
+        assert "=" not in encoded
+        assert "+" not in encoded
+        assert "/" not in encoded
+
+    @pytest.mark.parametrize("value", ["", "not a cursor", "W10", "WyJhIiwiYiJd"])
+    def test_invalid_cursor_raises_error(self, value: str):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(value)
@@ -0,0 +1,135 @@
+import pytest
+
+from src.lib_utils.rate_limit import (
+    InMemoryRateLimitBackend,
+    RateLimit,
+    RateLimiter,
+    RateLimitExceededError,
+    retry_after_header,
+)
+
+PER_MINUTE = RateLimit(limit=3, window_seconds=60)
+
+
+class FakeClock:
+    def __init__(self, now: float = 6000):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestInMemoryRateLimitBackend:
+    async def test_attempts_up_to_the_limit_are_counted(self):
+        backend = InMemoryRateLimitBackend(clock=FakeClock())
+
+        assert [await backend.hit("key", PER_MINUTE) for _ in range(3)] == [None] * 3
+        assert await backend.hit("key", PER_MINUTE) is not None
+
+    async def test_keys_are_limited_separately(self):
+        backend = InMemoryRateLimitBackend(clock=FakeClock())
+        for _ in range(3):
+            await backend.hit("key", PER_MINUTE)
+
+        assert await backend.hit("other-key", PER_MINUTE) is None
+
+    async def test_previous_window_is_weighted_by_its_overlap(self):
+        clock = FakeClock(6000)
+        backend = InMemoryRateLimitBackend(clock=clock)
+        for _ in range(3):
+            await backend.hit("key", PER_MINUTE)
+
+        # a quarter into the next window, 3 * 0.75 attempts still count
+        clock.now = 6075
+        assert await backend.hit("key", PER_MINUTE) is None
+        assert await backend.hit("key", PER_MINUTE) is not None
+
+    async def test_retry_after_is_when_an_attempt_would_be_counted(self):
+        clock = FakeClock(6000)
+        backend = InMemoryRateLimitBackend(clock=clock)
+        for _ in range(3):
+            await backend.hit("key", PER_MINUTE)
+
+        retry_after_seconds = await backend.hit("key", PER_MINUTE)
+
+        # the full window decays below the limit as soon as the next one starts
+        assert retry_after_seconds == pytest.approx(60)
+        clock.now += retry_after_seconds - 1  # type: ignore[operator]
+        assert await backend.hit("key", PER_MINUTE) is not None
+        clock.now += 2
+        assert await backend.hit("key", PER_MINUTE) is None
+
+    async def test_retry_after_within_the_window_waits_for_the_decay(self):
+        clock = FakeClock(6000)
+        backend = InMemoryRateLimitBackend(clock=clock)
+        for _ in range(3):
+            await backend.hit("key", PER_MINUTE)
+        clock.now = 6070
+        await backend.hit("key", PER_MINUTE)
+
+        # 3 * (1 - elapsed) + 1 drops below 3 a third into the window
+        assert await backend.hit("key", PER_MINUTE) == pytest.approx(10)
+        clock.now = 6081
+        assert await backend.hit("key", PER_MINUTE) is None
+
+    async def test_rejected_attempts_are_not_counted(self):
+        clock = FakeClock(6000)
+        backend = InMemoryRateLimitBackend(clock=clock)
+        for _ in range(10):
+            await backend.hit("key", PER_MINUTE)
+
+        clock.now = 6120
+        assert await backend.hit("key", PER_MINUTE) is None
+
+    async def test_stale_keys_are_dropped(self):
+        clock = FakeClock(6000)
+        backend = InMemoryRateLimitBackend(clock=clock)
+        await backend.hit("key", PER_MINUTE)
+
+        clock.now = 6120
+        await backend.hit("other-key", PER_MINUTE)
+
+        assert len(backend) == 1
+        assert backend.stats()["expirations"] == 1
+
+    async def test_least_recently_hit_keys_are_evicted_beyond_max_keys(self):
+        backend = InMemoryRateLimitBackend(max_keys=2, clock=FakeClock())
+        for key in ["a", "b", "a", "c"]:
+            await backend.hit(key, PER_MINUTE)
+
+        assert len(backend) == 2
+        assert backend.stats()["evictions"] == 1
+        # "b" was dropped, its attempts are forgotten
+        for _ in range(3):
+            assert await backend.hit("b", PER_MINUTE) is None
+
+
+class TestRateLimiter:
+    async def test_exceeded_limit_raises_with_retry_after(self):
+        limiter = RateLimiter(InMemoryRateLimitBackend(clock=FakeClock()))
+        for _ in range(3):
+            await limiter.hit([("key", PER_MINUTE)])
+
+        with pytest.raises(RateLimitExceededError) as error:
+            await limiter.hit([("key", PER_MINUTE)])
+
+        assert error.value.retry_after_seconds > 0
+        assert limiter.stats()["rejections"] == 1
+
+    async def test_later_limits_are_not_counted_once_one_is_exceeded(self):
+        backend = InMemoryRateLimitBackend(clock=FakeClock())
+        limiter = RateLimiter(backend)
+        for _ in range(3):
+            await limiter.hit([("ip", PER_MINUTE)])
+
+        with pytest.raises(RateLimitExceededError):
+            await limiter.hit([("ip", PER_MINUTE), ("email", PER_MINUTE)])
+
+        assert len(backend) == 1
+
+
+class TestRetryAfterHeader:
+    def test_is_rounded_up_to_whole_seconds(self):
+        assert retry_after_header(0.2) == "1"
+        assert retry_after_header(1.5) == "2"
+        assert retry_after_header(0) == "1"
@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+client = TestClient(app)
+
+
+class TestHealth:
+    def test_liveness(self):
+        response = client.get("/health/live")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+
+    def test_readiness_reports_auth_database(self):
+        with TestClient(app) as client_with_lifespan:
+            response = client_with_lifespan.get("/health/ready")
+
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+        assert response.json()["databases"]["auth"]["probe"]["ok"] is True
+
+    def test_metrics_report_verified_claim_cache(self):
+        response = client.get("/health/metrics")
+
+        assert response.status_code == 200
+        assert set(response.json()["auth"]["verified_claim_cache"]) >= {
+            "hits",
+            "misses",
+            "evictions",
+        }
+
+    def test_metrics_report_password_hashing_queue(self):
+        with TestClient(app) as client_with_lifespan:
+            response = client_with_lifespan.get("/health/metrics")
+
+        assert response.status_code == 200
+        assert set(response.json()["auth"]["password_hashing"]) >= {
+            "in_flight",
+            "waiting",
+            "rejections",
+            "wait_seconds",
+        }
+
+    def test_metrics_report_login_rate_limit(self):
+        response = client.get("/health/metrics")
+
+        assert response.status_code == 200
+        # disabled in the test configuration
+        assert response.json()["auth"]["login_rate_limit"] is None
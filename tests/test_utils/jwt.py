@@ -1,8 +1,17 @@
 from datetime import datetime
 from typing import Optional
 
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
 from src.apps.auth.config import get_config
-from src.lib_auth.jwt import JWTClaim, PayloadClaim, RSA256JWTSigningService
+from src.lib_auth.jwt import (
+    JWTAlgorithm,
+    JWTClaim,
+    PayloadClaim,
+    make_jwt_signing_service,
+)
 from src.lib_auth.roles import OrganizationRole, UserRole
 
 
@@ -24,7 +33,9 @@ def generate_test_jwt_token(
     if not private_key or not password:
         raise Exception("Private key or password is empty")
 
-    jwt_signing_service = RSA256JWTSigningService(private_key, password)
+    jwt_signing_service = make_jwt_signing_service(
+        get_config().jwt_algorithm, private_key, password
+    )
 
     jwt = jwt_signing_service.generate(
         JWTClaim(
@@ -45,3 +56,28 @@ def generate_test_jwt_token(
     )
 
     return jwt
+
+
+def generate_test_key_pair(algorithm: JWTAlgorithm, password: str) -> tuple[str, str]:
+    private_key: rsa.RSAPrivateKey | ec.EllipticCurvePrivateKey | Ed25519PrivateKey
+    if algorithm == JWTAlgorithm.RS256:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == JWTAlgorithm.ES256:
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        private_key = Ed25519PrivateKey.generate()
+
+    private_key_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.BestAvailableEncryption(password.encode()),
+    ).decode()
+    public_key_pem = (
+        private_key.public_key()
+        .public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    return private_key_pem, public_key_pem